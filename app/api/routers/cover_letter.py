@@ -11,7 +11,7 @@ import re
 import html as htmllib
 from typing import Any, Dict, Optional
 from fastapi import APIRouter, Request, HTTPException, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.core.auth import get_current_user
 from app.models.user import UserResponse
 
@@ -21,7 +21,7 @@ from app.models.cover_letter import (
     CoverLetterWithTextResumeRequest,
     CoverLetterGenerationResponse,
 )
-from app.services.cover_letter_service import get_job_info
+from app.services.cover_letter_service import get_job_info_async, stream_job_info
 from app.services.user_service import get_user_by_id, get_user_by_email
 from app.utils.pdf_utils import read_pdf_from_bytes
 from app.utils.s3_utils import download_pdf_from_s3, get_s3_client, S3_AVAILABLE
@@ -30,7 +30,9 @@ from app.utils.docx_generator import (
     build_docx_from_components,
     build_docx_from_generation_result,
 )
+from app.utils.background_queue import submit_background
 from app.utils.generation_timing import GenerationTiming
+from app.utils.llm_dispatch import run_in_llm_executor
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -279,7 +281,7 @@ async def handle_job_info(
     try:
         logger.info("Starting get_job_info() for /api/job-info")
         timing.checkpoint("get_job_info_start")
-        result = get_job_info(
+        result = await get_job_info_async(
             llm=request.llm,
             date_input=request.date_input,
             company_name=request.company_name,
@@ -301,14 +303,17 @@ async def handle_job_info(
         payload = _normalize_generation_response(result, request)
         logger.info("Starting DOCX attachment for /api/job-info")
         timing.checkpoint("docx_attach_start")
-        _attach_docx_to_payload(payload, request, current_user=current_user)
+        await run_in_llm_executor(
+            _attach_docx_to_payload, payload, request, current_user=current_user
+        )
         timing.checkpoint("docx_attach_done")
         logger.info("DOCX attachment completed for /api/job-info")
         # Docx-only contract: return docx + hints + optional content; no markdown/html
         payload.pop("html", None)
         payload.pop("markdown", None)
-        _write_client_payload_log(payload)
+        submit_background(_write_client_payload_log, dict(payload))
         timing.checkpoint("response_ready")
+        timing.finish()
         if settings.ENABLE_GENERATION_TIMING_CHART:
             logger.info("\n%s", timing.chart())
         logger.info("handle_job_info completed, returning payload")
@@ -325,6 +330,104 @@ async def handle_job_info(
         )
 
 
+def _sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Events message with a JSON data line."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.post("/job-info/stream")
+async def handle_job_info_stream(
+    request: JobInfoRequest, current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Streaming variant of /api/job-info (Server-Sent Events).
+
+    Events:
+    - token: {"text": "..."} raw completion chunks as the LLM produces them
+      (a cached result is replayed as a single chunk)
+    - field: {"name": "...", "value": ...} a top-level field of the LLM's JSON reply (e.g.
+      content, document_xml) as soon as it is complete, before normalization
+    - final: the same payload /api/job-info returns (content, docxBase64, docxTemplateHints)
+    - error: {"detail": "..."} if generation fails after the stream has started
+
+    Validation, user and personality profile errors are returned as normal HTTP errors before
+    the stream starts.
+    """
+    logger.info(
+        f"Received streaming job info request for LLM: {request.llm}, Company: {request.company_name}"
+    )
+    timing = GenerationTiming(
+        enabled=settings.ENABLE_GENERATION_TIMING_CHART,
+        flow_name="cover_letter:/api/job-info/stream",
+        client_start_ms=request.client_generate_start_ms,
+    )
+    timing.checkpoint("request_received")
+    timing.checkpoint("get_job_info_start")
+    events = stream_job_info(
+        llm=request.llm,
+        date_input=request.date_input,
+        company_name=request.company_name,
+        hiring_manager=request.hiring_manager,
+        ad_source=request.ad_source,
+        resume=request.resume,
+        jd=request.jd,
+        additional_instructions=request.additional_instructions,
+        tone=request.tone,
+        address=request.address,
+        phone_number=request.phone_number,
+        user_id=request.user_id,
+        user_email=request.user_email,
+        current_user=current_user,
+        timing=timing,
+    )
+    # Wait for the first event so setup errors still map to HTTP status codes
+    try:
+        first_event = await events.__anext__()
+    except HTTPException:
+        logger.error("HTTPException in /api/job-info/stream pipeline", exc_info=True)
+        raise
+    except Exception as e:
+        logger.error("Unexpected error in /api/job-info/stream pipeline: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error while generating cover letter",
+        )
+    timing.checkpoint("first_event")
+
+    async def event_source():
+        kind, value = first_event
+        try:
+            while kind in ("token", "field"):
+                yield _sse_event(kind, {"text": value} if kind == "token" else value)
+                kind, value = await events.__anext__()
+            timing.checkpoint("get_job_info_done")
+            payload = _normalize_generation_response(value, request)
+            timing.checkpoint("docx_attach_start")
+            await run_in_llm_executor(
+                _attach_docx_to_payload, payload, request, current_user=current_user
+            )
+            timing.checkpoint("docx_attach_done")
+            payload.pop("html", None)
+            payload.pop("markdown", None)
+            submit_background(_write_client_payload_log, dict(payload))
+            timing.checkpoint("response_ready")
+            timing.finish()
+            if settings.ENABLE_GENERATION_TIMING_CHART:
+                logger.info("\n%s", timing.chart())
+            yield _sse_event("final", payload)
+        except Exception as e:
+            logger.error("Error while streaming /api/job-info/stream: %s", e, exc_info=True)
+            yield _sse_event(
+                "error", {"detail": "Internal server error while generating cover letter"}
+            )
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/cover-letter/generate-with-text-resume", response_model=CoverLetterGenerationResponse)
 async def generate_cover_letter_with_text_resume(
     request: CoverLetterWithTextResumeRequest,
@@ -358,7 +461,7 @@ async def generate_cover_letter_with_text_resume(
         timing.checkpoint("get_job_info_start")
         # Pass resume_text directly as resume to get_job_info
         # Set is_plain_text=True to skip file processing (S3, local files, base64)
-        result = get_job_info(
+        result = await get_job_info_async(
             llm=request.llm,
             date_input=request.date_input,
             company_name=request.company_name,
@@ -381,13 +484,16 @@ async def generate_cover_letter_with_text_resume(
         payload = _normalize_generation_response(result, request)
         logger.info("Starting DOCX attachment for /api/cover-letter/generate-with-text-resume")
         timing.checkpoint("docx_attach_start")
-        _attach_docx_to_payload(payload, request, current_user=current_user)
+        await run_in_llm_executor(
+            _attach_docx_to_payload, payload, request, current_user=current_user
+        )
         timing.checkpoint("docx_attach_done")
         logger.info("DOCX attachment completed for /api/cover-letter/generate-with-text-resume")
         payload.pop("html", None)
         payload.pop("markdown", None)
-        _write_client_payload_log(payload)
+        submit_background(_write_client_payload_log, dict(payload))
         timing.checkpoint("response_ready")
+        timing.finish()
         if settings.ENABLE_GENERATION_TIMING_CHART:
             logger.info("\n%s", timing.chart())
         logger.info("generate_cover_letter_with_text_resume completed, returning payload")
@@ -510,7 +616,7 @@ async def handle_chat(
                     },
                 )
             timing.checkpoint("get_job_info_start")
-            result = get_job_info(
+            result = await get_job_info_async(
                 llm=job_request.llm,
                 date_input=job_request.date_input,
                 company_name=job_request.company_name,
@@ -530,12 +636,15 @@ async def handle_chat(
             timing.checkpoint("get_job_info_done")
             payload = _normalize_generation_response(result, job_request)
             timing.checkpoint("docx_attach_start")
-            _attach_docx_to_payload(payload, job_request, current_user=current_user)
+            await run_in_llm_executor(
+                _attach_docx_to_payload, payload, job_request, current_user=current_user
+            )
             timing.checkpoint("docx_attach_done")
             payload.pop("html", None)
             payload.pop("markdown", None)
-            _write_client_payload_log(payload)
+            submit_background(_write_client_payload_log, dict(payload))
             timing.checkpoint("response_ready")
+            timing.finish()
             if settings.ENABLE_GENERATION_TIMING_CHART:
                 logger.info("\n%s", timing.chart())
             return payload
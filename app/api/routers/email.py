@@ -31,6 +31,7 @@ from app.services.user_service import (
     create_user_from_registration_data,
 )
 from app.utils.redis_utils import delete_registration_data, delete_verification_session
+from app.core.principal_cache import invalidate_principal
 from app.db.mongodb import get_collection, is_connected
 from app.utils.password import hash_password
 from app.utils.user_helpers import USERS_COLLECTION
@@ -285,6 +286,7 @@ async def reset_password_endpoint(request: ResetPasswordRequest):
             }
         }
     )
+    invalidate_principal(user.id)
     
     logger.info(f"Password reset via email for user {user.id}")
     
@@ -338,6 +340,7 @@ async def change_password_endpoint(request: ChangePasswordRequest):
             "$unset": {"verification_code": ""}
         }
     )
+    invalidate_principal(user.id)
     
     logger.info(f"Password changed via email for user {user.id}")
     
@@ -5,7 +5,7 @@ import logging
 import base64
 import re
 from typing import Optional, List, Dict, Any
-from fastapi import APIRouter, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, HTTPException, status, Request
 from fastapi.responses import JSONResponse, Response, HTMLResponse, PlainTextResponse, FileResponse
 from botocore.exceptions import ClientError
 
@@ -29,6 +29,7 @@ from app.utils.s3_utils import (
     S3_AVAILABLE,
 )
 from app.utils.pdf_utils import read_pdf_from_bytes, read_pdf_markdown_from_bytes
+from app.utils.resume_text_cache import delete_s3_sidecar, move_s3_sidecar, pre_extract_s3_pdf
 from app.services.user_service import get_user_by_email
 from app.core.config import settings
 from app.db.mongodb import is_connected
@@ -399,8 +400,8 @@ async def list_files(user_id: Optional[str] = None, user_email: Optional[str] =
 
 
 @router.post("/upload")
-async def upload_file(request: FileUploadRequest):
-    """Upload a file to S3 bucket on behalf of the user"""
+async def upload_file(request: FileUploadRequest, background_tasks: BackgroundTasks):
+    """Upload a file to S3 bucket on behalf of the user (text is extracted in the background)"""
     if not S3_AVAILABLE:
         raise HTTPException(
             status_code=503,
@@ -462,7 +463,7 @@ async def upload_file(request: FileUploadRequest):
         if not bucket_name:
             raise HTTPException(status_code=500, detail="S3 bucket name not configured")
         
-        s3_client.put_object(
+        put_response = s3_client.put_object(
             Bucket=bucket_name,
             Key=s3_key,
             Body=file_bytes,
@@ -470,6 +471,9 @@ async def upload_file(request: FileUploadRequest):
         )
 
         logger.info(f"Uploaded file to S3: {s3_key} ({len(file_bytes)} bytes)")
+        # Extract text/markdown after the response so generations can skip the PDF download
+        etag = (put_response.get("ETag") or "").strip('"') or None
+        background_tasks.add_task(pre_extract_s3_pdf, bucket_name, s3_key, file_bytes, etag)
         return {
             "success": True,
             "key": s3_key,
@@ -492,7 +496,7 @@ async def upload_file(request: FileUploadRequest):
 
 
 @router.put("/rename")
-async def rename_file(request: FileRenameRequest):
+async def rename_file(request: FileRenameRequest, background_tasks: BackgroundTasks):
     """Rename a file in S3 bucket"""
     if not S3_AVAILABLE:
         raise HTTPException(
@@ -568,6 +572,7 @@ async def rename_file(request: FileRenameRequest):
             CopySource=copy_source, Bucket=bucket_name, Key=new_key
         )
         s3_client.delete_object(Bucket=bucket_name, Key=request.oldKey)
+        background_tasks.add_task(move_s3_sidecar, bucket_name, request.oldKey, new_key)
 
         logger.info(f"Renamed file from {request.oldKey} to {new_key}")
         return {
@@ -592,7 +597,7 @@ async def rename_file(request: FileRenameRequest):
 
 
 @router.delete("/delete")
-async def delete_file_endpoint(request: FileDeleteRequest):
+async def delete_file_endpoint(request: FileDeleteRequest, background_tasks: BackgroundTasks):
     """Delete a file from S3 bucket"""
     if not S3_AVAILABLE:
         raise HTTPException(
@@ -637,6 +642,7 @@ async def delete_file_endpoint(request: FileDeleteRequest):
             raise HTTPException(status_code=500, detail="S3 bucket name not configured")
         
         s3_client.delete_object(Bucket=bucket_name, Key=request.key)
+        background_tasks.add_task(delete_s3_sidecar, bucket_name, request.key)
 
         logger.info(f"Deleted file from S3: {request.key}")
         return {"success": True, "message": "File deleted successfully"}
@@ -1,10 +1,14 @@
 """
 Job URL analysis API routes
 """
+import json
 import logging
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
-from app.models.job import JobURLAnalysisRequest
+from app.core.config import settings
+from app.models.job import JobURLAnalysisRequest, JobURLBatchAnalysisRequest
+from app.utils.job_url_batch import analyze_job_urls
 
 # Import the analyzer function
 try:
@@ -60,3 +64,49 @@ async def analyze_job_url_endpoint(request: JobURLAnalysisRequest):
             status_code=500, detail=f"Failed to fetch or analyze job URL: {str(e)}"
         )
 
+
+@router.post("/analyze/batch")
+async def analyze_job_urls_batch_endpoint(request: JobURLBatchAnalysisRequest):
+    """
+    Analyze several job posting URLs concurrently, streaming results as NDJSON.
+
+    Each line is a JSON object. One {"type": "result", "index", "url", "status", ...} line is
+    sent per URL as soon as its analysis finishes (completion order; "index" is the URL's
+    position in the request). status is "ok" or "failed" with "result" holding the same
+    payload /api/job-url/analyze returns, or "error" / "timeout" with an "error" message.
+    A final {"type": "summary", ...} line carries the counts.
+
+    Concurrency is capped per process and per job board (JOB_URL_BATCH_* settings). URLs still
+    unfinished at the batch timeout are reported as "timeout" so the client keeps everything
+    that did complete.
+    """
+    if not JOB_URL_ANALYZER_AVAILABLE:
+        raise HTTPException(
+            status_code=500,
+            detail="Job URL analyzer module not available"
+        )
+    if len(request.urls) > settings.JOB_URL_BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many URLs: at most {settings.JOB_URL_BATCH_MAX_URLS} per batch",
+        )
+
+    async def analyze(url: str):
+        return await analyze_job_url(
+            url=url,
+            user_id=request.user_id,
+            user_email=request.user_email,
+            use_chatgpt_fallback=True,
+        )
+
+    async def lines():
+        urls = [str(url) for url in request.urls]
+        async for item in analyze_job_urls(urls, analyze, request.timeout_seconds):
+            yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
@@ -9,6 +9,7 @@ from fastapi import APIRouter, File, HTTPException, UploadFile, status, Depends
 from app.core.auth import enforce_integration_auth_if_configured, get_current_user
 from app.models.user import UserResponse
 from app.models.pdf import GeneratePDFRequest, PrintPreviewPDFRequest, PrintTemplateRequest
+from app.services.libreoffice_pool import LibreOfficePoolBusyError
 
 logger = logging.getLogger(__name__)
 
@@ -114,7 +115,8 @@ async def generate_pdf_endpoint(request: GeneratePDFRequest):
 
         # Generate PDF (lazy import so router registers even if pdf_service fails at import)
         from app.services.pdf_service import generate_pdf_from_markdown
-        pdf_base64, cache_hit = generate_pdf_from_markdown(
+        pdf_base64, cache_hit = await asyncio.to_thread(
+            generate_pdf_from_markdown,
             request.markdownContent,
             print_props_dict,
             user_id=request.user_id,
@@ -132,6 +134,8 @@ async def generate_pdf_endpoint(request: GeneratePDFRequest):
 
     except HTTPException:
         raise
+    except LibreOfficePoolBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         error_msg = f"Failed to generate PDF: {str(e)}"
         logger.error(error_msg)
@@ -199,7 +203,8 @@ async def print_preview_pdf_endpoint(request: PrintPreviewPDFRequest):
                 return_debug=True,
             )
         else:
-            pdf_base64, cache_hit = generate_pdf_from_markdown(
+            pdf_base64, cache_hit = await asyncio.to_thread(
+                generate_pdf_from_markdown,
                 request.markdownContent,
                 print_props_dict,
                 user_id=request.user_id,
@@ -216,6 +221,8 @@ async def print_preview_pdf_endpoint(request: PrintPreviewPDFRequest):
         }
     except HTTPException:
         raise
+    except LibreOfficePoolBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         error_msg = f"Failed to generate Print Preview PDF: {str(e)}"
         logger.error(error_msg)
@@ -257,6 +264,8 @@ async def docx_to_pdf_endpoint(file: UploadFile = File(..., description=".docx f
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except LibreOfficePoolBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except RuntimeError as e:
         logger.error("Docx to PDF conversion error: %s", e)
         raise HTTPException(status_code=500, detail=f"Conversion failed: {str(e)}")
@@ -23,6 +23,7 @@ from app.services.verification_service import (
     clear_verification_code,
 )
 from app.services.user_service import get_user_by_email, get_user_by_id
+from app.core.principal_cache import invalidate_principal
 from app.db.mongodb import get_collection, is_connected
 from app.utils.password import hash_password, validate_strong_password
 from app.utils.user_helpers import USERS_COLLECTION
@@ -272,6 +273,7 @@ async def reset_password_endpoint(request: ResetPasswordRequest):
             "$unset": {"verification_code": ""}
         }
     )
+    invalidate_principal(user.id)
     
     logger.info(f"Password reset for user {user.id}")
     
@@ -325,6 +327,7 @@ async def change_password_endpoint(request: ChangePasswordRequest):
             "$unset": {"verification_code": ""}
         }
     )
+    invalidate_principal(user.id)
     
     logger.info(f"Password changed for user {user.id}")
     
@@ -375,6 +378,7 @@ async def complete_registration_endpoint(request: CompleteRegistrationRequest):
             "$unset": {"verification_code": ""}
         }
     )
+    invalidate_principal(user.id)
     
     logger.info(f"Registration completed for user {user.id}")
     
@@ -10,6 +10,7 @@ from pydantic import BaseModel
 from bson import ObjectId
 
 from app.core.auth import get_current_user, _verify_token
+from app.core.principal_cache import invalidate_principal
 from app.core.config import settings
 from app.db.mongodb import get_collection, is_connected
 from app.utils.user_helpers import USERS_COLLECTION
@@ -168,6 +169,7 @@ async def set_sms_opt_endpoint(
         {"_id": ObjectId(current_user.id)},
         {"$set": {"SMSOpt": sms_opt, "SMSOptDate": datetime.utcnow()}},
     )
+    invalidate_principal(current_user.id)
     return get_user_by_id(current_user.id)
 
 
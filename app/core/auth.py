@@ -17,6 +17,7 @@ from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.core.config import settings
+from app.core.principal_cache import get_principal
 from app.models.user import UserResponse
 from app.services.user_service import get_user_by_id
 
@@ -188,7 +189,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = get_user_by_id(user_id)
+    user = get_principal(user_id, get_user_by_id)
     if not user.isActive:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
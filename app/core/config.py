@@ -2,6 +2,7 @@
 Application configuration and settings
 """
 import os
+import tempfile
 from pathlib import Path
 from typing import List, Optional
 from dotenv import load_dotenv
@@ -43,6 +44,12 @@ class Settings:
     MONGODB_URI: Optional[str] = os.getenv("MONGODB_URI")
     MONGODB_DB_NAME: str = os.getenv("MONGODB_DB_NAME", "CoverLetter")
     MONGODB_COLLECTION_NAME: str = os.getenv("MONGODB_COLLECTION_NAME", "users")
+    # MongoClient pool sizing and server monitoring (health flag refresh interval)
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+    MONGODB_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "0"))
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "0"))
+    MONGODB_HEARTBEAT_FREQUENCY_MS: int = int(os.getenv("MONGODB_HEARTBEAT_FREQUENCY_MS", "10000"))
     
     # API Keys
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
@@ -89,6 +96,13 @@ class Settings:
     REDIS_PASSWORD: Optional[str] = os.getenv("REDIS_PASSWORD")
     REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
     REDIS_SSL: bool = os.getenv("REDIS_SSL", "false").lower() == "true"
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    REDIS_HEALTH_CHECK_INTERVAL_SECONDS: int = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL_SECONDS", "30"))
+    # After a failed connect, fail fast for this long instead of retrying the 5 s connect per call
+    REDIS_RECONNECT_COOLDOWN_SECONDS: float = float(os.getenv("REDIS_RECONNECT_COOLDOWN_SECONDS", "15"))
+    # Cache circuit breaker: open after N consecutive Redis failures, probe again after the reset timeout
+    CACHE_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("CACHE_BREAKER_FAILURE_THRESHOLD", "3"))
+    CACHE_BREAKER_RESET_SECONDS: float = float(os.getenv("CACHE_BREAKER_RESET_SECONDS", "30"))
     REDIS_API_KEY: Optional[str] = os.getenv("REDIS_API_KEY")
 
     # Zoho Mail API + legacy SMTP
@@ -159,9 +173,108 @@ class Settings:
     # Cover-letter generation feature flags (Word-integration compatibility)
     USE_TEMPLATE_IN_PROMPT: bool = os.getenv("USE_TEMPLATE_IN_PROMPT", "false").lower() == "true"
     USE_DOCX_COMPONENTS: bool = os.getenv("USE_DOCX_COMPONENTS", "false").lower() == "true"
+    # How often prompt assets (system_prompt.json, templates/) are checked for changes (app/utils/prompt_assembly.py)
+    PROMPT_RELOAD_CHECK_SECONDS: float = float(os.getenv("PROMPT_RELOAD_CHECK_SECONDS", "5"))
+    # Order prompts as system prompt + resume first so providers can reuse that prefix from their
+    # prompt cache (Anthropic cache_control, OpenAI/xAI prefix caching); false = legacy layout
+    PROMPT_CACHE_ENABLED: bool = os.getenv("PROMPT_CACHE_ENABLED", "true").lower() == "true"
+    # Explicit Gemini context caches (billed storage per hour) for the system prompt + resume prefix
+    GEMINI_CONTEXT_CACHE_ENABLED: bool = os.getenv("GEMINI_CONTEXT_CACHE_ENABLED", "false").lower() == "true"
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS: int = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600"))
     LLM_MAX_OUTPUT_TOKENS: int = int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "8124"))
     ENFORCE_STRONG_PASSWORDS: bool = os.getenv("ENFORCE_STRONG_PASSWORDS", "false").lower() == "true"
     ENABLE_GENERATION_TIMING_CHART: bool = os.getenv("ENABLE_GENERATION_TIMING_CHART", "true").lower() == "true"
+    # Per-stage generation metrics on /metrics (app/utils/metrics.py) and optional OTel spans
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    OTEL_TRACES_ENABLED: bool = os.getenv("OTEL_TRACES_ENABLED", "false").lower() == "true"
+    OTEL_SERVICE_NAME: str = os.getenv("OTEL_SERVICE_NAME", "cover-letter-api")
+    # Threads available for blocking generation work (one in-flight generation per thread)
+    LLM_DISPATCH_MAX_WORKERS: int = int(os.getenv("LLM_DISPATCH_MAX_WORKERS", "32"))
+    # Hedged requests to the "fallbackModel" from llms-config.json (app/utils/llm_router.py)
+    LLM_HEDGING_ENABLED: bool = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_SECONDS", "8"))
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "1"))
+    LLM_HEDGE_MAX_DELAY_SECONDS: float = float(os.getenv("LLM_HEDGE_MAX_DELAY_SECONDS", "30"))
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    # Error rate at which a model is treated as failing (hedged at once, skipped as a fallback)
+    LLM_HEDGE_ERROR_RATE: float = float(os.getenv("LLM_HEDGE_ERROR_RATE", "0.5"))
+    # Rolling window of per-model time-to-first-token and error samples
+    LLM_ROUTER_WINDOW_SIZE: int = int(os.getenv("LLM_ROUTER_WINDOW_SIZE", "200"))
+    LLM_ROUTER_WINDOW_SECONDS: float = float(os.getenv("LLM_ROUTER_WINDOW_SECONDS", "600"))
+    # Base URL for the xAI chat completions API (override to point at a local stub for load tests)
+    XAI_API_BASE_URL: str = os.getenv("XAI_API_BASE_URL", "https://api.x.ai/v1")
+    # Optional overrides for the OpenAI / Anthropic API endpoints (e.g. a proxy or local stub)
+    OPENAI_BASE_URL: Optional[str] = os.getenv("OPENAI_BASE_URL") or None
+    ANTHROPIC_BASE_URL: Optional[str] = os.getenv("ANTHROPIC_BASE_URL") or None
+    # Shared provider HTTP pools (see app/utils/llm_clients.py)
+    LLM_HTTP_MAX_CONNECTIONS: int = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+    LLM_HTTP_MAX_KEEPALIVE: int = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "32"))
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "120"))
+    LLM_HTTP_TIMEOUT_SECONDS: float = float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "600"))
+    LLM_CLIENT_MAX_RETRIES: int = int(os.getenv("LLM_CLIENT_MAX_RETRIES", "2"))
+    LLM_WARM_CONNECTIONS: bool = os.getenv("LLM_WARM_CONNECTIONS", "true").lower() == "true"
+    # Coalesce identical in-flight generations (in-process, and across workers via a Redis lock)
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    SINGLE_FLIGHT_DISTRIBUTED: bool = os.getenv("SINGLE_FLIGHT_DISTRIBUTED", "true").lower() == "true"
+    SINGLE_FLIGHT_LOCK_TTL_SECONDS: float = float(os.getenv("SINGLE_FLIGHT_LOCK_TTL_SECONDS", "180"))
+    SINGLE_FLIGHT_WAIT_SECONDS: float = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "180"))
+    # Default limits for bounded in-process caches (app/utils/local_cache.py), per cache
+    LOCAL_CACHE_MAX_ENTRIES: int = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "2048"))
+    LOCAL_CACHE_MAX_BYTES: int = int(os.getenv("LOCAL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    LOCAL_CACHE_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("LOCAL_CACHE_SWEEP_INTERVAL_SECONDS", "60"))
+    # Extracted resume text, content-addressed by SHA-256 of the PDF bytes (Redis + local disk)
+    RESUME_TEXT_CACHE_TTL_SECONDS: int = int(os.getenv("RESUME_TEXT_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+    RESUME_TEXT_CACHE_DIR: str = os.getenv("RESUME_TEXT_CACHE_DIR", str(_ROOT / ".cache" / "resume_text"))
+    # PDF text extraction engine chain (app/utils/pdf_extraction.py) and page-parallel extraction
+    PDF_TEXT_ENGINES: str = os.getenv("PDF_TEXT_ENGINES", "pymupdf,pypdf2")
+    PDF_PARALLEL_PAGE_THRESHOLD: int = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "32"))
+    PDF_PARALLEL_WORKERS: int = int(os.getenv("PDF_PARALLEL_WORKERS", str(min(4, os.cpu_count() or 1))))
+    # Verified-principal cache for get_current_user (app/core/principal_cache.py)
+    PRINCIPAL_CACHE_ENABLED: bool = os.getenv("PRINCIPAL_CACHE_ENABLED", "true").lower() == "true"
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+    # Write-behind queue for response-independent side effects (app/utils/background_queue.py)
+    BACKGROUND_QUEUE_WORKERS: int = int(os.getenv("BACKGROUND_QUEUE_WORKERS", "2"))
+    BACKGROUND_QUEUE_MAX_SIZE: int = int(os.getenv("BACKGROUND_QUEUE_MAX_SIZE", "1000"))
+    BACKGROUND_QUEUE_OVERFLOW: str = os.getenv("BACKGROUND_QUEUE_OVERFLOW", "drop")
+    BACKGROUND_QUEUE_DRAIN_TIMEOUT_SECONDS: float = float(os.getenv("BACKGROUND_QUEUE_DRAIN_TIMEOUT_SECONDS", "10"))
+    # Async job page fetcher and URL-normalized page cache (app/utils/page_fetcher.py)
+    PAGE_FETCH_TIMEOUT_SECONDS: float = float(os.getenv("PAGE_FETCH_TIMEOUT_SECONDS", "10"))
+    PAGE_FETCH_MAX_CONNECTIONS: int = int(os.getenv("PAGE_FETCH_MAX_CONNECTIONS", "50"))
+    PAGE_FETCH_KEEPALIVE_SECONDS: float = float(os.getenv("PAGE_FETCH_KEEPALIVE_SECONDS", "30"))
+    PAGE_FETCH_PER_HOST_LIMIT: int = int(os.getenv("PAGE_FETCH_PER_HOST_LIMIT", "4"))
+    PAGE_FETCH_HTTP2: bool = os.getenv("PAGE_FETCH_HTTP2", "true").lower() == "true"
+    PAGE_CACHE_FRESH_SECONDS: float = float(os.getenv("PAGE_CACHE_FRESH_SECONDS", "900"))
+    PAGE_CACHE_TTL_SECONDS: int = int(os.getenv("PAGE_CACHE_TTL_SECONDS", str(24 * 3600)))
+    PAGE_CACHE_L1_MAX_ENTRIES: int = int(os.getenv("PAGE_CACHE_L1_MAX_ENTRIES", "256"))
+    PAGE_CACHE_L1_MAX_BYTES: int = int(os.getenv("PAGE_CACHE_L1_MAX_BYTES", str(32 * 1024 * 1024)))
+    # Shared job URL analysis results (app/utils/job_extraction_cache.py)
+    JOB_EXTRACTION_CACHE_ENABLED: bool = os.getenv("JOB_EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+    JOB_EXTRACTION_FRESH_SECONDS: int = int(os.getenv("JOB_EXTRACTION_FRESH_SECONDS", str(6 * 3600)))
+    JOB_EXTRACTION_STALE_SECONDS: int = int(os.getenv("JOB_EXTRACTION_STALE_SECONDS", str(3 * 24 * 3600)))
+    JOB_EXTRACTION_STALE_WHILE_REVALIDATE: bool = (
+        os.getenv("JOB_EXTRACTION_STALE_WHILE_REVALIDATE", "true").lower() == "true"
+    )
+    JOB_EXTRACTION_NEGATIVE_TTL_SECONDS: int = int(os.getenv("JOB_EXTRACTION_NEGATIVE_TTL_SECONDS", "120"))
+    # Job page distillation before LLM extraction (app/utils/job_html_distiller.py)
+    JOB_HTML_DISTILL_ENABLED: bool = os.getenv("JOB_HTML_DISTILL_ENABLED", "true").lower() == "true"
+    JOB_DISTILL_MAX_CHARS: int = int(os.getenv("JOB_DISTILL_MAX_CHARS", "60000"))
+    JOB_LD_SKIP_LLM: bool = os.getenv("JOB_LD_SKIP_LLM", "true").lower() == "true"
+    JOB_LD_MIN_DESCRIPTION_CHARS: int = int(os.getenv("JOB_LD_MIN_DESCRIPTION_CHARS", "200"))
+    # Batch job URL analysis, /api/job-url/analyze/batch (app/utils/job_url_batch.py)
+    JOB_URL_BATCH_MAX_URLS: int = int(os.getenv("JOB_URL_BATCH_MAX_URLS", "50"))
+    JOB_URL_BATCH_CONCURRENCY: int = int(os.getenv("JOB_URL_BATCH_CONCURRENCY", "8"))
+    JOB_URL_BATCH_PER_HOST_LIMIT: int = int(os.getenv("JOB_URL_BATCH_PER_HOST_LIMIT", "2"))
+    JOB_URL_BATCH_TIMEOUT_SECONDS: float = float(os.getenv("JOB_URL_BATCH_TIMEOUT_SECONDS", "120"))
+    # Warm LibreOffice conversion pool (app/services/libreoffice_pool.py)
+    LIBREOFFICE_BINARY: str = os.getenv("LIBREOFFICE_BINARY", "soffice")
+    LIBREOFFICE_POOL_SIZE: int = int(os.getenv("LIBREOFFICE_POOL_SIZE", "2"))
+    LIBREOFFICE_MAX_QUEUE: int = int(os.getenv("LIBREOFFICE_MAX_QUEUE", "16"))
+    LIBREOFFICE_JOB_TIMEOUT_SECONDS: float = float(os.getenv("LIBREOFFICE_JOB_TIMEOUT_SECONDS", "120"))
+    LIBREOFFICE_MAX_JOBS_PER_WORKER: int = int(os.getenv("LIBREOFFICE_MAX_JOBS_PER_WORKER", "200"))
+    LIBREOFFICE_START_TIMEOUT_SECONDS: float = float(os.getenv("LIBREOFFICE_START_TIMEOUT_SECONDS", "30"))
+    LIBREOFFICE_PROFILE_DIR: str = os.getenv(
+        "LIBREOFFICE_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "lo_pool")
+    )
 
 
 # Global settings instance
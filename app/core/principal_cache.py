@@ -0,0 +1,144 @@
+"""
+Short-TTL cache of verified principals for get_current_user.
+
+Authenticated requests used to cost a Mongo ping plus a find_one before any work started. The
+resolved UserResponse is now cached per token subject (user id) for PRINCIPAL_CACHE_TTL_SECONDS.
+
+Every entry is stamped with the user's version at the time it was loaded. invalidate_principal()
+bumps the version locally and publishes the user id on a Redis channel; a background subscriber
+in every worker bumps its own copy, so a stale entry is rejected on its next read everywhere.
+The version is captured before the Mongo read, so a load that races with an invalidation is
+never served. If Redis is unavailable, other workers fall back to the TTL.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.models.user import UserResponse
+from app.utils.local_cache import LocalCache
+from app.utils.redis_utils import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+_INVALIDATION_CHANNEL = "principal:invalidate"
+_MAX_TRACKED_VERSIONS = 50_000
+
+_cache = LocalCache("principals", default_ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+_versions: Dict[str, int] = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stale": 0, "invalidations": 0, "remote_invalidations": 0}
+_subscriber_started = False
+
+
+def _bump(field: str) -> None:
+    with _lock:
+        _stats[field] += 1
+
+
+def _current_version(user_id: str) -> int:
+    with _lock:
+        return _versions.get(user_id, 0)
+
+
+def _bump_version(user_id: str) -> None:
+    with _lock:
+        if len(_versions) >= _MAX_TRACKED_VERSIONS:
+            # Resetting versions is only safe together with dropping every stamped entry
+            _versions.clear()
+            _cache.clear()
+        _versions[user_id] = _versions.get(user_id, 0) + 1
+    _cache.delete(user_id)
+
+
+def _subscriber_loop() -> None:
+    while True:
+        pubsub = None
+        try:
+            pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(_INVALIDATION_CHANNEL)
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    user_id = message.get("data")
+                    if isinstance(user_id, bytes):
+                        user_id = user_id.decode("utf-8", errors="ignore")
+                    _bump_version(str(user_id))
+                    _bump("remote_invalidations")
+        except Exception as e:
+            logger.debug(f"Principal invalidation subscriber error: {e}")
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+        time.sleep(max(1.0, settings.REDIS_RECONNECT_COOLDOWN_SECONDS))
+
+
+def _ensure_subscriber() -> None:
+    global _subscriber_started
+    with _lock:
+        if _subscriber_started:
+            return
+        _subscriber_started = True
+    threading.Thread(target=_subscriber_loop, name="principal-invalidation", daemon=True).start()
+
+
+def get_principal(user_id: str, loader: Callable[[str], UserResponse]) -> UserResponse:
+    """
+    Return the user for a verified token subject, loading it with loader() on a miss.
+
+    Args:
+        user_id: Token "sub" claim
+        loader: Fetches the user from the database (e.g. get_user_by_id)
+
+    Returns:
+        A copy of the cached UserResponse (callers may mutate it)
+    """
+    if not settings.PRINCIPAL_CACHE_ENABLED:
+        return loader(user_id)
+    _ensure_subscriber()
+
+    version = _current_version(user_id)
+    entry = _cache.get(user_id)
+    if entry is not None:
+        cached_version, user = entry
+        if cached_version == version:
+            _bump("hits")
+            return user.model_copy(deep=True)
+        _bump("stale")
+    _bump("misses")
+
+    user = loader(user_id)
+    _cache.set(user_id, (version, user.model_copy(deep=True)))
+    return user
+
+
+def invalidate_principal(user_id: Optional[Any]) -> None:
+    """
+    Drop the cached principal for a user in this worker and, via Redis, in all others.
+
+    Call after any write that changes fields exposed on UserResponse.
+    """
+    if not user_id:
+        return
+    user_id = str(user_id)
+    _bump_version(user_id)
+    _bump("invalidations")
+    try:
+        get_redis_client().publish(_INVALIDATION_CHANNEL, user_id)
+    except Exception as e:
+        logger.debug(f"Could not broadcast principal invalidation for {user_id}: {e}")
+
+
+def get_principal_cache_stats() -> Dict[str, Any]:
+    with _lock:
+        snapshot: Dict[str, Any] = dict(_stats)
+    lookups = snapshot["hits"] + snapshot["misses"]
+    snapshot["hit_ratio"] = round(snapshot["hits"] / lookups, 4) if lookups else 0.0
+    snapshot["entries"] = len(_cache)
+    return snapshot
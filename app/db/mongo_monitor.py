@@ -0,0 +1,206 @@
+"""
+MongoDB connection-state and pool monitoring built on PyMongo's event listeners.
+
+is_connected() used to send a ping before nearly every query. Instead, the driver's own server
+monitoring (SDAM) keeps us informed: its monitor threads heartbeat every server every
+MONGODB_HEARTBEAT_FREQUENCY_MS and publish topology changes, from which a cached health flag is
+derived (a writable server is known). Reading the flag costs nothing.
+
+The same listeners collect pool statistics (connections checked out, threads waiting for a
+connection, created/closed connections, pool clears) and a per-command latency histogram.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the command latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class _CommandStats:
+    __slots__ = ("count", "failures", "total_ms", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, duration_ms: float, failed: bool) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        if failed:
+            self.failures += 1
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile (None = above the last bound)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else None
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "histogram": {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class MongoMonitor(
+    monitoring.TopologyListener,
+    monitoring.ConnectionPoolListener,
+    monitoring.CommandListener,
+):
+    """Single listener object registered on the MongoClient (event_listeners=[monitor])."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._healthy = False
+        self._topology_type = "Unknown"
+        self._last_error: Optional[str] = None
+        self._pool = {
+            "checked_out": 0,
+            "waiting": 0,
+            "connections": 0,
+            "created": 0,
+            "closed": 0,
+            "checkout_failures": 0,
+            "pool_clears": 0,
+        }
+        self._commands: Dict[str, _CommandStats] = {}
+
+    # --- health -------------------------------------------------------------------------
+
+    @property
+    def healthy(self) -> bool:
+        return self._healthy
+
+    def mark(self, healthy: bool, error: Optional[str] = None) -> None:
+        """Set the flag directly (initial ping on connect, or client closed)."""
+        with self._lock:
+            self._healthy = healthy
+            if error:
+                self._last_error = error
+
+    def opened(self, event) -> None:
+        pass
+
+    def description_changed(self, event) -> None:
+        description = event.new_description
+        healthy = description.has_writable_server()
+        with self._lock:
+            changed = healthy != self._healthy
+            self._healthy = healthy
+            self._topology_type = description.topology_type_name
+            errors = [str(s.error) for s in description.server_descriptions().values() if s.error]
+            if errors:
+                self._last_error = errors[0]
+        if changed:
+            log = logger.info if healthy else logger.warning
+            log(f"MongoDB topology is now {'healthy' if healthy else 'unavailable'} "
+                f"({description.topology_type_name})")
+
+    def closed(self, event) -> None:
+        self.mark(False)
+
+    # --- connection pool ----------------------------------------------------------------
+
+    def _pool_bump(self, field: str, delta: int = 1) -> None:
+        with self._lock:
+            self._pool[field] = max(0, self._pool[field] + delta)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        self._pool_bump("pool_clears")
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self._pool["connections"] += 1
+            self._pool["created"] += 1
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self._pool["connections"] = max(0, self._pool["connections"] - 1)
+            self._pool["closed"] += 1
+
+    def connection_check_out_started(self, event) -> None:
+        self._pool_bump("waiting")
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._lock:
+            self._pool["waiting"] = max(0, self._pool["waiting"] - 1)
+            self._pool["checkout_failures"] += 1
+
+    def connection_checked_out(self, event) -> None:
+        with self._lock:
+            self._pool["waiting"] = max(0, self._pool["waiting"] - 1)
+            self._pool["checked_out"] += 1
+
+    def connection_checked_in(self, event) -> None:
+        self._pool_bump("checked_out", -1)
+
+    # --- commands -----------------------------------------------------------------------
+
+    def _record(self, event, failed: bool) -> None:
+        duration_ms = event.duration_micros / 1000.0
+        with self._lock:
+            stats = self._commands.get(event.command_name)
+            if stats is None:
+                stats = self._commands[event.command_name] = _CommandStats()
+            stats.record(duration_ms, failed)
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        self._record(event, failed=False)
+
+    def failed(self, event) -> None:
+        self._record(event, failed=True)
+
+    # --- stats --------------------------------------------------------------------------
+
+    def stats(self, max_pool_size: Optional[int] = None) -> Dict[str, Any]:
+        with self._lock:
+            pool: Dict[str, Any] = dict(self._pool)
+            commands = {name: s.snapshot() for name, s in sorted(self._commands.items())}
+            snapshot: Dict[str, Any] = {
+                "healthy": self._healthy,
+                "topology_type": self._topology_type,
+                "last_error": self._last_error,
+            }
+        if max_pool_size is not None:
+            pool["max_pool_size"] = max_pool_size
+        snapshot["pool"] = pool
+        snapshot["commands"] = commands
+        return snapshot
+
@@ -5,15 +5,18 @@ import re
 import logging
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, ConfigurationError
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from app.core.config import settings
+from app.db.mongo_monitor import MongoMonitor
 
 logger = logging.getLogger(__name__)
 
 # Global MongoDB client and database instances
 mongodb_client: Optional[MongoClient] = None
 mongodb_db = None
+# Driver event listener: cached connection health, pool and command latency stats
+mongodb_monitor = MongoMonitor()
 
 
 def connect_to_mongodb() -> bool:
@@ -31,14 +34,26 @@ def connect_to_mongodb() -> bool:
     
     try:
         # Create MongoDB client
+        pool_kwargs: Dict[str, Any] = {
+            "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+            "heartbeatFrequencyMS": settings.MONGODB_HEARTBEAT_FREQUENCY_MS,
+        }
+        if settings.MONGODB_MAX_IDLE_TIME_MS:
+            pool_kwargs["maxIdleTimeMS"] = settings.MONGODB_MAX_IDLE_TIME_MS
+        if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS:
+            pool_kwargs["waitQueueTimeoutMS"] = settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
         mongodb_client = MongoClient(
             settings.MONGODB_URI,
             serverSelectionTimeoutMS=5000,  # 5 second timeout
             connectTimeoutMS=10000,  # 10 second connection timeout
+            event_listeners=[mongodb_monitor],
+            **pool_kwargs,
         )
         
         # Test the connection
         mongodb_client.admin.command('ping')
+        mongodb_monitor.mark(True)
         
         # Check if database name is in connection string
         uri_db_match = re.search(r'mongodb\+srv://[^/]+/([^?]+)', settings.MONGODB_URI)
@@ -56,6 +71,7 @@ def connect_to_mongodb() -> bool:
         
     except ConnectionFailure as e:
         logger.error(f"Failed to connect to MongoDB Atlas: {e}")
+        mongodb_monitor.mark(False, str(e))
         mongodb_client = None
         mongodb_db = None
         return False
@@ -83,6 +99,7 @@ def close_mongodb_connection() -> None:
         finally:
             mongodb_client = None
             mongodb_db = None
+            mongodb_monitor.mark(False)
 
 
 def get_database():
@@ -114,17 +131,34 @@ def is_connected() -> bool:
     """
     Check if MongoDB is connected
     
+    Reads the health flag maintained by the driver's server monitoring (no round trip).
+    
     Returns:
         True if connected, False otherwise
     """
     if mongodb_client is None:
         logger.debug("MongoDB client is None - not connected")
         return False
-    
+    return mongodb_monitor.healthy
+
+
+def ping_mongodb() -> bool:
+    """Round-trip ping (for health checks that must confirm the server answers right now)."""
+    if mongodb_client is None:
+        return False
     try:
         mongodb_client.admin.command('ping')
+        mongodb_monitor.mark(True)
         return True
     except Exception as e:
         logger.debug(f"MongoDB ping failed: {e}")
+        mongodb_monitor.mark(False, str(e))
         return False
 
+
+def get_mongodb_stats() -> Dict[str, Any]:
+    """Connection health, pool usage and per-command latency histograms."""
+    stats = mongodb_monitor.stats(max_pool_size=settings.MONGODB_MAX_POOL_SIZE)
+    stats["client"] = mongodb_client is not None
+    return stats
+
@@ -31,6 +31,14 @@ import logging
 from app.core.config import settings, get_cors_origins
 from app.core.logging_config import setup_logging
 from app.db.mongodb import connect_to_mongodb, close_mongodb_connection
+from app.utils.llm_dispatch import shutdown_llm_executor
+from app.utils.llm_router import shutdown_llm_router
+from app.utils.background_queue import shutdown_background_queue
+from app.utils.llm_clients import init_llm_clients, close_llm_clients
+from app.utils.page_fetcher import close_page_fetcher
+from app.utils.pdf_extraction import shutdown_pdf_pool
+from app.services.libreoffice_pool import shutdown_libreoffice_pool
+from app.utils.redis_utils import close_redis_client
 from app.api.routers import users
 
 # Setup logging
@@ -44,10 +52,19 @@ async def lifespan(app: FastAPI):
     """Lifespan event handler for startup and shutdown"""
     # Startup
     connect_to_mongodb()
+    init_llm_clients()
     
     yield
     
     # Shutdown
+    shutdown_llm_executor(wait=False)
+    shutdown_llm_router()
+    shutdown_background_queue()
+    close_llm_clients()
+    await close_page_fetcher()
+    shutdown_pdf_pool()
+    shutdown_libreoffice_pool()
+    close_redis_client()
     close_mongodb_connection()
 
 
@@ -133,17 +150,61 @@ async def root():
     }
 
 
+# /api/health stats sections: (key, module, collector). Each is imported and called on its own
+# so one failing subsystem doesn't hide the others.
+_HEALTH_STATS = (
+    ("llm_clients", "app.utils.llm_clients", "get_llm_client_stats"),
+    ("llm_dispatch", "app.utils.llm_dispatch", "get_llm_dispatch_stats"),
+    ("llm_router", "app.utils.llm_router", "get_llm_router_stats"),
+    ("generation_single_flight", "app.services.cover_letter_service", "get_generation_single_flight_stats"),
+    ("local_caches", "app.utils.local_cache", "get_local_cache_stats"),
+    ("caches", "app.utils.tiered_cache", "get_tiered_cache_stats"),
+    ("resume_text_cache", "app.utils.resume_text_cache", "get_resume_text_cache_stats"),
+    ("page_fetcher", "app.utils.page_fetcher", "get_page_fetcher_stats"),
+    ("job_extraction_cache", "app.utils.job_extraction_cache", "get_job_extraction_cache_stats"),
+    ("job_html_distiller", "app.utils.job_html_distiller", "get_job_html_distiller_stats"),
+    ("job_url_batch", "app.utils.job_url_batch", "get_job_url_batch_stats"),
+    ("libreoffice_pool", "app.services.libreoffice_pool", "get_libreoffice_pool_stats"),
+    ("principal_cache", "app.core.principal_cache", "get_principal_cache_stats"),
+    ("mongodb_stats", "app.db.mongodb", "get_mongodb_stats"),
+    ("background_queue", "app.utils.background_queue", "get_background_queue_stats"),
+    ("prompt_assembly", "app.utils.prompt_assembly", "get_prompt_assembly_stats"),
+)
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    from app.db.mongodb import is_connected, get_collection, get_database
+    import asyncio
+    from importlib import import_module
+    from app.db.mongodb import (
+        get_collection,
+        get_database,
+        is_connected,
+        ping_mongodb,
+    )
+    from app.utils.redis_utils import redis_health_check
     from app.utils.user_helpers import USERS_COLLECTION
     
+    # The MongoDB and Redis probes are blocking round trips: keep them off the event loop
+    mongodb_ok, redis_health = await asyncio.gather(
+        asyncio.to_thread(ping_mongodb), asyncio.to_thread(redis_health_check)
+    )
     health_info = {
         "status": "healthy",
-        "mongodb": "connected" if is_connected() else "disconnected"
+        "mongodb": "connected" if mongodb_ok else "disconnected",
+        "redis": redis_health,
     }
     
+    stats_errors = {}
+    for key, module, collector in _HEALTH_STATS:
+        try:
+            health_info[key] = getattr(import_module(module), collector)()
+        except Exception as e:
+            stats_errors[key] = str(e)
+    if stats_errors:
+        health_info["stats_errors"] = stats_errors
+    
     # Add detailed database info if connected
     if is_connected():
         try:
@@ -190,3 +251,12 @@ async def health_check():
     
     return health_info
 
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus scrape endpoint (per-stage generation latency histograms)"""
+    from fastapi.responses import PlainTextResponse
+    from app.utils.metrics import render_prometheus
+
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -36,6 +36,7 @@ from app.models.pdf import (
 
 from app.models.job import (
     JobURLAnalysisRequest,
+    JobURLBatchAnalysisRequest,
 )
 
 __all__ = [
@@ -66,4 +67,5 @@ __all__ = [
     "GeneratePDFRequest",
     # Job models
     "JobURLAnalysisRequest",
+    "JobURLBatchAnalysisRequest",
 ]
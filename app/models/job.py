@@ -1,8 +1,8 @@
 """
 Job URL analysis related Pydantic models
 """
-from pydantic import BaseModel, HttpUrl
-from typing import Optional
+from pydantic import BaseModel, Field, HttpUrl
+from typing import List, Optional
 
 
 class JobURLAnalysisRequest(BaseModel):
@@ -10,3 +10,10 @@ class JobURLAnalysisRequest(BaseModel):
     user_id: Optional[str] = None
     user_email: Optional[str] = None
 
+
+class JobURLBatchAnalysisRequest(BaseModel):
+    urls: List[HttpUrl] = Field(..., min_length=1)
+    user_id: Optional[str] = None
+    user_email: Optional[str] = None
+    # Seconds before unfinished URLs are reported as timed out (capped by JOB_URL_BATCH_TIMEOUT_SECONDS)
+    timeout_seconds: Optional[float] = Field(default=None, gt=0)
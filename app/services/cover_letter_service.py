@@ -2,6 +2,7 @@
 Cover letter generation service
 """
 
+import asyncio
 import os
 import json
 import datetime
@@ -9,9 +10,7 @@ import base64
 import logging
 import re
 import hashlib
-import time
-from datetime import timedelta
-from typing import Optional, Any, Dict
+from typing import Optional, Any, AsyncIterator, Callable, Dict, Iterable, Iterator, Tuple
 
 from fastapi import HTTPException, status  # type: ignore[import-untyped]
 from dotenv import dotenv_values
@@ -28,119 +27,73 @@ except ImportError:
 from app.core.config import settings
 from app.models.user import UserResponse
 from app.utils.html_normalizer import html_p_to_br, collapse_br_pairs, double_break_after_groups
-from app.utils.template_loader import get_template_for_profile
-from app.utils.pdf_utils import read_pdf_from_bytes, read_pdf_file
-from app.utils.s3_utils import download_pdf_from_s3, S3_AVAILABLE
-from app.utils.redis_utils import get_redis_client
+from app.utils.prompt_assembly import (
+    TONE_PREFIX,
+    build_chat_messages,
+    build_claude_content,
+    build_claude_system,
+    build_critical_instructions,
+    build_full_text_prompt,
+    build_override_instructions,
+    get_system_prompt,
+    split_full_text_prompt,
+)
+from app.utils.background_queue import submit_background
+from app.utils.resume_text_cache import extract_pdf_text_cached, get_s3_pdf_text
+from app.utils.s3_utils import S3_AVAILABLE
 from app.utils.generation_timing import GenerationTiming
+from app.utils.metrics import LLM_PROMPT_TOKENS_TOTAL
+from app.utils.llm_dispatch import run_in_llm_executor
+from app.utils.llm_router import get_llm_router
+from app.utils.single_flight import SingleFlight
+from app.utils.streaming_json import StreamingJSONParser
+from app.utils.tiered_cache import TieredCache
+from app.utils.llm_clients import (
+    get_anthropic_client,
+    get_gemini_cached_model,
+    get_gemini_model,
+    get_openai_client,
+    get_xai_http_client,
+)
 # from app.utils.docx_generator import insert_line_breaks_in_long_paragraphs
 from app.utils.llm_utils import (
-    load_system_prompt,
+    llm_metric_label,
     normalize_llm_name,
     get_oc_info,
 )
 from app.services.user_service import (
     get_user_by_id,
     get_user_by_email,
-    increment_llm_usage_count,
-    decrement_generation_credits,
+    record_generation_usage,
 )
 
 logger = logging.getLogger(__name__)
 
 # Cache TTLs (seconds)
-_RESUME_CACHE_TTL_SECONDS = 30 * 60
 _RESULT_CACHE_TTL_SECONDS = 10 * 60
 _USER_PROFILE_CACHE_TTL_SECONDS = 5 * 60
 
-# Local fallback caches when Redis is unavailable
-_local_resume_cache: Dict[str, tuple[float, str]] = {}
-_local_result_cache: Dict[str, tuple[float, Dict[str, Any]]] = {}
-_local_user_profile_cache: Dict[str, tuple[float, Dict[str, Any]]] = {}
+# Two-tier caches (in-process L1 + Redis L2 behind a circuit breaker). Profiles keep a short
+# L1 TTL because other workers may refresh them in Redis. Resume text is cached by PDF content
+# hash in app.utils.resume_text_cache.
+_result_cache = TieredCache("cover_letter_result", ttl_seconds=_RESULT_CACHE_TTL_SECONDS)
+_user_profile_cache = TieredCache(
+    "cover_letter_user_profile", ttl_seconds=_USER_PROFILE_CACHE_TTL_SECONDS, l1_ttl_seconds=60
+)
+
+# Identical in-flight generations (same result cache key) share one upstream LLM call
+_result_single_flight = SingleFlight(
+    "cover_letter_result",
+    lock_ttl_seconds=settings.SINGLE_FLIGHT_LOCK_TTL_SECONDS,
+    wait_timeout_seconds=settings.SINGLE_FLIGHT_WAIT_SECONDS,
+    distributed=settings.SINGLE_FLIGHT_DISTRIBUTED,
+)
 
 
 def _sha256_text(value: str) -> str:
     return hashlib.sha256(value.encode("utf-8")).hexdigest()
 
 
-def _redis_get_text(key: str) -> Optional[str]:
-    try:
-        client = get_redis_client()
-        raw = client.get(key)
-        return raw if isinstance(raw, str) else None
-    except Exception:
-        return None
-
-
-def _redis_set_text(key: str, value: str, ttl_seconds: int) -> None:
-    try:
-        client = get_redis_client()
-        client.setex(key, timedelta(seconds=ttl_seconds), value)
-    except Exception:
-        return
-
-
-def _redis_get_json(key: str) -> Optional[Dict[str, Any]]:
-    try:
-        client = get_redis_client()
-        raw = client.get(key)
-        if not raw:
-            return None
-        return json.loads(raw)
-    except Exception:
-        return None
-
-
-def _redis_set_json(key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
-    try:
-        client = get_redis_client()
-        client.setex(key, timedelta(seconds=ttl_seconds), json.dumps(value, default=str))
-    except Exception:
-        return
-
-
-def _redis_delete(key: str) -> None:
-    try:
-        client = get_redis_client()
-        client.delete(key)
-    except Exception:
-        return
-
-
-def _local_get_text(cache: Dict[str, tuple[float, str]], key: str) -> Optional[str]:
-    item = cache.get(key)
-    if not item:
-        return None
-    expires_at, value = item
-    if expires_at <= time.time():
-        cache.pop(key, None)
-        return None
-    return value
-
-
-def _local_set_text(cache: Dict[str, tuple[float, str]], key: str, value: str, ttl_seconds: int) -> None:
-    cache[key] = (time.time() + ttl_seconds, value)
-
-
-def _local_get_json(
-    cache: Dict[str, tuple[float, Dict[str, Any]]], key: str
-) -> Optional[Dict[str, Any]]:
-    item = cache.get(key)
-    if not item:
-        return None
-    expires_at, value = item
-    if expires_at <= time.time():
-        cache.pop(key, None)
-        return None
-    return dict(value)
-
-
-def _local_set_json(
-    cache: Dict[str, tuple[float, Dict[str, Any]]], key: str, value: Dict[str, Any], ttl_seconds: int
-) -> None:
-    cache[key] = (time.time() + ttl_seconds, dict(value))
-
-
 def _user_to_cache_payload(user: Optional[UserResponse]) -> Optional[Dict[str, Any]]:
     if not user:
         return None
@@ -166,14 +119,7 @@ def _get_cached_user_profile(
     key = _resolve_user_profile_cache_key(user_id, user_email)
     if not key:
         return None
-    redis_key = f"cache:{key}"
-    cached = _redis_get_json(redis_key)
-    if cached:
-        return cached
-    cached_local = _local_get_json(_local_user_profile_cache, key)
-    if cached_local:
-        return cached_local
-    return None
+    return _user_profile_cache.get_json(key)
 
 
 def _set_cached_user_profile(
@@ -182,28 +128,7 @@ def _set_cached_user_profile(
     key = _resolve_user_profile_cache_key(user_id, user_email)
     if not key:
         return
-    redis_key = f"cache:{key}"
-    _redis_set_json(redis_key, payload, _USER_PROFILE_CACHE_TTL_SECONDS)
-    _local_set_json(_local_user_profile_cache, key, payload, _USER_PROFILE_CACHE_TTL_SECONDS)
-
-
-def _build_resume_cache_key(user_id: Optional[str], resume: str, is_plain_text: bool) -> str:
-    source = "text" if is_plain_text else "file"
-    return f"cover_letter:resume:{source}:{user_id or 'anon'}:{_sha256_text(resume or '')}"
-
-
-def _get_cached_resume_text(cache_key: str) -> Optional[str]:
-    redis_key = f"cache:{cache_key}"
-    cached = _redis_get_text(redis_key)
-    if cached:
-        return cached
-    return _local_get_text(_local_resume_cache, cache_key)
-
-
-def _set_cached_resume_text(cache_key: str, value: str) -> None:
-    redis_key = f"cache:{cache_key}"
-    _redis_set_text(redis_key, value, _RESUME_CACHE_TTL_SECONDS)
-    _local_set_text(_local_resume_cache, cache_key, value, _RESUME_CACHE_TTL_SECONDS)
+    _user_profile_cache.set_json(key, payload)
 
 
 def _build_result_cache_key(payload: Dict[str, Any]) -> str:
@@ -212,26 +137,20 @@ def _build_result_cache_key(payload: Dict[str, Any]) -> str:
 
 
 def _get_cached_result(cache_key: str) -> Optional[Dict[str, Any]]:
-    redis_key = f"cache:{cache_key}"
-    cached = _redis_get_json(redis_key)
-    if cached:
-        if _is_error_result(cached):
-            _redis_delete(redis_key)
-            return None
-        return cached
-    cached_local = _local_get_json(_local_result_cache, cache_key)
-    if cached_local and _is_error_result(cached_local):
-        _local_result_cache.pop(cache_key, None)
+    cached = _result_cache.get_json(cache_key)
+    if cached and _is_error_result(cached):
+        _result_cache.delete(cache_key)
         return None
-    return cached_local
+    return cached
 
 
 def _set_cached_result(cache_key: str, value: Dict[str, Any]) -> None:
     if _is_error_result(value):
         return
-    redis_key = f"cache:{cache_key}"
-    _redis_set_json(redis_key, value, _RESULT_CACHE_TTL_SECONDS)
-    _local_set_json(_local_result_cache, cache_key, value, _RESULT_CACHE_TTL_SECONDS)
+    # Written synchronously, not via the background queue: the single-flight leader releases
+    # its lock and notifies waiters in other workers as soon as generation returns, and they
+    # read this entry. set_json copies the value, so later mutation by callers is harmless.
+    _result_cache.set_json(cache_key, value)
 
 
 def _is_error_result(payload: Dict[str, Any]) -> bool:
@@ -258,19 +177,15 @@ def _record_generation_usage(
         return
 
     normalized_llm = normalize_llm_name(llm)
-    try:
-        increment_llm_usage_count(usage_user_id, normalized_llm)
-        logger.info(
-            f"Incremented LLM usage count for {normalized_llm} (user_id: {usage_user_id})"
-        )
-    except Exception as e:
-        logger.warning(f"Failed to increment LLM usage count: {e}")
-
-    try:
-        decrement_generation_credits(usage_user_id)
-        logger.info(f"Decremented generation credits for user {usage_user_id} (if applicable)")
-    except Exception as e:
-        logger.warning(f"Failed to decrement generation credits: {e}")
+    # One atomic find_one_and_update, off the response path. Credit accounting must not be
+    # lost, so it runs inline if the queue is full.
+    submit_background(
+        record_generation_usage,
+        usage_user_id,
+        normalized_llm,
+        label="record_generation_usage",
+        overflow="inline",
+    )
 
 
 def _resolve_xai_api_key() -> Optional[str]:
@@ -471,35 +386,7 @@ def _write_llm_response_log(llm: str, response_text: str) -> None:
         logger.warning("Could not write LLM response log: %s", e)
 
 
-# Try to import LLM libraries
-try:
-    from openai import OpenAI
-
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-
-try:
-    import anthropic
-
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-
-try:
-    import google.generativeai as genai
-
-    GOOGLE_AVAILABLE = True
-except ImportError:
-    GOOGLE_AVAILABLE = False
-
-try:
-    import requests
-
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
-
+# Provider SDKs are imported by app.utils.llm_clients; Ollama is called directly
 try:
     import ollama
 
@@ -507,9 +394,6 @@ try:
 except ImportError:
     OLLAMA_AVAILABLE = False
 
-# Load system message
-system_message = load_system_prompt()
-
 # Model names - defaults, can be overridden by config
 gpt_model = "gpt-5.2"
 claude_model = "claude-sonnet-4-20250514"
@@ -527,7 +411,7 @@ except Exception as e:
     logger.debug(f"Failed to load GPT model from config, using default: {e}")
 
 
-def get_job_info(
+def _prepare_generation(
     llm: str,
     date_input: str,
     company_name: str,
@@ -546,13 +430,10 @@ def get_job_info(
     timing: Optional[GenerationTiming] = None,
 ):
     """
-    Generate cover letter based on job information using specified LLM.
-    Returns a dictionary with 'markdown' and 'html' fields.
+    Resolve resume text and personality profile and build the prompt pieces for a generation.
 
-    Args:
-        user_id: Optional user ID to access custom personality profiles
-        user_email: Optional user email to access custom personality profiles
-        is_plain_text: If True, skip all file processing (S3, local files, base64) and treat resume as plain text
+    Returns a dict consumed by _call_llm() and _run_generation(); raises HTTPException for
+    missing users or profiles.
     """
     # Reuse already-resolved authenticated user when available.
     if current_user:
@@ -571,10 +452,7 @@ def get_job_info(
         today_date = today_date_iso
 
     # Check if resume is a file path, S3 key, or base64 data
-    resume_cache_key = _build_resume_cache_key(user_id, resume, is_plain_text)
-    resume_content = _get_cached_resume_text(resume_cache_key) or resume
-    if resume_content != resume:
-        logger.info("Resume cache hit for user %s", user_id or "anon")
+    resume_content = resume
 
     # If explicitly marked as plain text, skip all file processing
     if is_plain_text:
@@ -590,7 +468,7 @@ def get_job_info(
             # Verify it's a PDF by checking the header
             if pdf_bytes.startswith(b"%PDF"):
                 logger.info("Detected base64 encoded PDF data, decoding...")
-                resume_content = read_pdf_from_bytes(pdf_bytes)
+                resume_content = extract_pdf_text_cached(pdf_bytes)
                 logger.info("Successfully decoded and extracted text from base64 PDF")
             else:
                 # Not base64 PDF, treat as regular text
@@ -641,10 +519,9 @@ def get_job_info(
 
                         s3_path = f"s3://{settings.AWS_S3_BUCKET}/{s3_key}"
 
-                        logger.info(f"Downloading PDF from S3: {s3_path}")
-                        pdf_bytes = download_pdf_from_s3(s3_path)
-                        resume_content = read_pdf_from_bytes(pdf_bytes)
-                        logger.info("Successfully downloaded and extracted text from S3 PDF")
+                        logger.info(f"Reading PDF from S3: {s3_path}")
+                        resume_content = get_s3_pdf_text(s3_path)
+                        logger.info("Successfully extracted text from S3 PDF")
                     except Exception as e:
                         logger.warning(
                             f"Failed to download from S3: {str(e)}. Will try local file paths."
@@ -710,7 +587,8 @@ def get_job_info(
                     logger.debug(f"Trying PDF path: {normalized_path}")
                     if os.path.exists(normalized_path) and os.path.isfile(normalized_path):
                         logger.info(f"Found PDF at: {normalized_path}, reading content")
-                        resume_content = read_pdf_file(normalized_path)
+                        with open(normalized_path, "rb") as pdf_file:
+                            resume_content = extract_pdf_text_cached(pdf_file.read())
                         found = True
                         break
 
@@ -731,8 +609,6 @@ def get_job_info(
                     )
                 resume_content = resume
 
-    if resume_content:
-        _set_cached_resume_text(resume_cache_key, resume_content)
     if timing:
         timing.checkpoint("resume_processed")
 
@@ -882,96 +758,15 @@ def get_job_info(
     if timing:
         timing.checkpoint("personality_profile_loaded")
 
-    # Build personality instruction - make it prominent and direct
-    critical_instructions = f"""
-=== PERSONALITY PROFILE INSTRUCTION - CRITICAL ===
-YOU MUST FOLLOW THIS PERSONALITY PROFILE EXACTLY:
-{selected_profile}
-
-Apply this personality throughout the entire cover letter. This instruction takes precedence over default writing styles.
-=== END PERSONALITY PROFILE INSTRUCTION ===
-"""
+    # Personality, template structure, typography baseline and DOCX components instructions
+    # (precompiled fragments, see app/utils/prompt_assembly.py)
+    critical_instructions = build_critical_instructions(
+        selected_profile, matched_profile_name or tone, user_ctx
+    )
     logger.info(
-        f"Personality instruction prepared ({len(critical_instructions)} chars): {selected_profile[:100]}..."
+        f"Critical instructions prepared ({len(critical_instructions)} chars): {selected_profile[:100]}..."
     )
 
-    # Build template structure instruction - align letter layout with template (pinned: set USE_TEMPLATE_IN_PROMPT=false to revert)
-    template_instruction = ""
-    if settings.USE_TEMPLATE_IN_PROMPT:
-        template_content = get_template_for_profile(matched_profile_name or tone)
-        if template_content:
-            template_instruction = f"""
-=== TEMPLATE STRUCTURE - MATCH LINE BREAKS EXACTLY ===
-Your "content" output MUST follow this template line-for-line so paragraph and line breaks are consistent.
-
-RULES:
-- Each non-blank line in the template = one line in your content (use one newline (\\n) after it before the next line).
-- Each blank line in the template = exactly two newlines (\\n\\n) in your content — that is the paragraph separator.
-- Do not merge lines or skip blank lines. The number of lines and blank lines in your output must match the template.
-
-TEMPLATE (copy its structure; replace placeholders with real data):
----
-{template_content}
----
-
-Placeholders: <<date>>, <<name>>, <<phone>>, <<email>>, <<address>>, <<city, state, zip>>, <<hiring manager>>, <<company name>>, <<company address>>, <<position title>>, <<salutation>>, <<body paragraph>> (repeat for each body paragraph), <<complimentary close>> — replace with actual resume/job data. Generate the right number of <<body paragraph>> blocks.
-=== END TEMPLATE STRUCTURE ===
-"""
-            logger.info("Template structure instruction added to prompt (USE_TEMPLATE_IN_PROMPT=true)")
-    if not template_instruction and not settings.USE_TEMPLATE_IN_PROMPT:
-        logger.debug("Template omitted from prompt (USE_TEMPLATE_IN_PROMPT=false)")
-    critical_instructions = critical_instructions + template_instruction
-
-    # Typography baseline: when user selects a non-default font, pass as baseline for body; LLM may vary for lists/tables
-    user_preferences = user_ctx.get("preferences") if isinstance(user_ctx, dict) else {}
-    if isinstance(user_preferences, dict) and user_preferences:
-        app_settings = user_preferences.get("appSettings", {})
-        if isinstance(app_settings, dict):
-            print_props = app_settings.get("printProperties", {})
-            if isinstance(print_props, dict) and print_props:
-                use_default_fonts = print_props.get("useDefaultFonts", False)
-                font_family = print_props.get("fontFamily", "Times New Roman")
-                font_size = print_props.get("fontSize", 12)
-                line_height = print_props.get("lineHeight", 1.6)
-                is_default_font = (
-                    font_family and str(font_family).strip().lower() == "default"
-                )
-                if not is_default_font and not use_default_fonts:
-                    typography_instruction = f"""
-=== TYPOGRAPHY BASELINE ===
-Use font-family '{font_family}', font-size {font_size}pt, and line-height {line_height} as the baseline for main body text.
-You may creatively vary font size, color, and style for lists, tables, headings, and key phrases using inline HTML (e.g. <span style='font-size:14pt'>, <span style='color:#c00000'>). The baseline applies to the main letter content; lists and tables can use different sizes for visual hierarchy.
-=== END TYPOGRAPHY BASELINE ===
-"""
-                    critical_instructions = critical_instructions + typography_instruction
-                    logger.info(
-                        f"Added typography baseline to prompt: fontFamily={font_family}, fontSize={font_size}pt"
-                    )
-
-    # When USE_DOCX_COMPONENTS: ask LLM to return document as three OOXML components (word/document.xml, numbering.xml, styles.xml)
-    if getattr(settings, "USE_DOCX_COMPONENTS", False):
-        docx_components_instruction = """
-=== OUTPUT FORMAT: DOCX AS XML COMPONENTS (required when this section is present) ===
-Return a JSON object with exactly three string fields. The values must be valid XML for a Word document.
-
-1. "document_xml": Full content of word/document.xml.
-   Root: <w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body> ... </w:body></w:document>
-   - Ordinary paragraph: <w:p><w:r><w:t>Your text here</w:t></w:r></w:p>
-   - BULLET LISTS (mandatory): Do NOT put bullet characters (•, -, *, etc.) inside <w:t>. For every bullet list item you MUST use this exact structure so the document gets proper hanging indents:
-     <w:p><w:pPr><w:numPr><w:ilvl w:val="0"/><w:numId w:val="1"/></w:numPr></w:pPr><w:r><w:t>List item text only</w:t></w:r></w:p>
-     The <w:numPr> block (with ilvl 0 and numId 1) is what makes Word show the bullet and hanging indent. The text inside <w:t> must be the list item content only—no leading bullet character.
-   - End the body with <w:sectPr/> before </w:body>.
-
-2. "numbering_xml": (optional) Full content of word/numbering.xml. If you omit or leave empty, the system uses a default (numId 1 = bullet with hanging indent).
-
-3. "styles_xml": (optional) Full content of word/styles.xml. If you omit or leave empty, the system uses a default.
-
-Escape quotes inside JSON strings (use \\" for a literal quote). Newlines inside the XML strings are allowed.
-=== END DOCX COMPONENTS ===
-"""
-        critical_instructions = critical_instructions + docx_components_instruction
-        logger.info("DOCX components output format added to prompt (USE_DOCX_COMPONENTS=true)")
-
     # Additional Instructions are passed to the LLM only (below); no parsing or post/pre adorning of the letter here.
 
     # Build message payload (without additional_instructions - it will be appended last to override)
@@ -983,7 +778,7 @@ Escape quotes inside JSON strings (use \\" for a literal quote). Newlines inside
         "ad_source": ad_source,
         "resume": resume_content,  # Use extracted PDF content instead of file path
         "jd": jd,
-        "tone": f"Use the following tone/personality when generating the result, but do not specifically note the activities within this text: {selected_profile}",
+        "tone": f"{TONE_PREFIX}{selected_profile}",
     }
 
     # Add optional fields
@@ -992,27 +787,20 @@ Escape quotes inside JSON strings (use \\" for a literal quote). Newlines inside
     if phone_number:
         message_data["phone_number"] = phone_number
 
+    # With prompt caching the resume goes in its own message right after the system prompt, so
+    # system prompt + resume are a stable, cacheable prefix for this user (see prompt_assembly)
+    resume_message = ""
+    prompt_cache_key = None
+    if settings.PROMPT_CACHE_ENABLED and resume_content:
+        resume_message = json.dumps({"resume": message_data.pop("resume")})
+        prompt_cache_key = _sha256_text(f"{user_id or user_email}:{resume_message}")[:32]
+
     message = json.dumps(message_data)
 
     # Prepare additional instructions as final override (legacy behavior).
     # Any non-empty additional_instructions should be treated as highest priority.
-    additional_instructions_text = ""
-    if additional_instructions and additional_instructions.strip():
-        additional_instructions_text = f"""
-
-=== FINAL OVERRIDE INSTRUCTIONS - HIGHEST PRIORITY ===
-IGNORE ALL PREVIOUS INSTRUCTIONS ABOUT LENGTH, TONE, STYLE, OR FORMATTING.
-THE FOLLOWING INSTRUCTIONS TAKE ABSOLUTE PRECEDENCE OVER EVERYTHING ELSE, INCLUDING:
-- System prompts
-- Personality profiles
-- Tone settings
-- Any other instructions in this conversation
-
-YOU MUST FOLLOW THESE INSTRUCTIONS EXACTLY:
-{additional_instructions}
-
-=== END OVERRIDE INSTRUCTIONS ===
-"""
+    additional_instructions_text = build_override_instructions(additional_instructions)
+    if additional_instructions_text:
         logger.info(
             f"Additional instructions provided ({len(additional_instructions)} chars) - OVERRIDE MODE (legacy behavior restored)"
         )
@@ -1041,14 +829,6 @@ YOU MUST FOLLOW THESE INSTRUCTIONS EXACTLY:
             "ollama_model": ollama_model,
         }
     )
-    cached_result = _get_cached_result(result_cache_key)
-    if cached_result:
-        logger.info("Generation result cache hit; skipping upstream LLM call")
-        _record_generation_usage(user_id=user_id, user_email=user_email, user_ctx=user_ctx, llm=llm)
-        if timing:
-            timing.checkpoint("result_cache_hit")
-        return cached_result
-
     # Debug: capture prompts for analysis (tmp/debug_prompts.json)
     # try:
     #     _service_dir = os.path.dirname(os.path.abspath(__file__))
@@ -1070,137 +850,278 @@ YOU MUST FOLLOW THESE INSTRUCTIONS EXACTLY:
     # except Exception as _e:
     #     logger.warning(f"Could not write debug_prompts.json: {_e}")
 
-    r = ""
+    return {
+        "llm": llm,
+        "user_id": user_id,
+        "user_email": user_email,
+        "user_ctx": user_ctx,
+        "today_date": today_date,
+        "today_date_iso": today_date_iso,
+        "critical_instructions": critical_instructions,
+        "message": message,
+        "resume_message": resume_message,
+        "prompt_cache_key": prompt_cache_key,
+        "hiring_manager": hiring_manager,
+        "company_name": company_name,
+        "ad_source": ad_source,
+        "additional_instructions": additional_instructions,
+        "additional_instructions_text": additional_instructions_text,
+        "result_cache_key": result_cache_key,
+    }
 
-    try:
-        if timing:
-            timing.checkpoint("llm_call_start")
-        # Map model names to display names for compatibility
-        if llm == "Gemini" or llm == "gemini-2.5-flash":
-            # Include personality instruction prominently at the start
-            msg = f"{system_message}{critical_instructions}. {message}. Hiring Manager: {hiring_manager}. Company Name: {company_name}. Ad Source: {ad_source}{additional_instructions_text}"
-            if additional_instructions_text:
-                if "OVERRIDE" in additional_instructions_text:
-                    logger.debug(
-                        "Additional instructions appended to Gemini prompt (OVERRIDE MODE)"
-                    )
-                else:
-                    logger.debug(
-                        "Additional instructions appended to Gemini prompt (ENHANCEMENT MODE)"
-                    )
-            if not GOOGLE_AVAILABLE or not settings.GEMINI_API_KEY:
-                raise ValueError("Google Generative AI not available or API key not set")
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            model = genai.GenerativeModel("gemini-2.5-flash")
-
-            # Configure generation to ensure complete JSON response
-            generation_config = {
-                "temperature": 0.7,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": settings.LLM_MAX_OUTPUT_TOKENS,
-            }
 
-            _log_prompt_length(llm, full_text=msg)
-            _write_llm_prompt_log(llm, full_text=msg)
-            response = model.generate_content(contents=msg, generation_config=generation_config)
-            r = response.text
-            logger.info(f"Gemini response length: {len(r)} characters")
-
-        elif llm == "ChatGPT" or llm == gpt_model or llm == "gpt-4.1":
-            if not OPENAI_AVAILABLE or not settings.OPENAI_API_KEY:
-                raise ValueError("OpenAI not available or API key not set")
-            client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            messages = [
-                {"role": "system", "content": system_message},
-                {
-                    "role": "user",
-                    "content": critical_instructions.strip(),
-                },  # Add personality instruction as separate, prominent message
-            ]
-            messages.extend(
-                [
-                    {"role": "user", "content": message},
-                    {"role": "user", "content": f"Hiring Manager: {hiring_manager}"},
-                    {"role": "user", "content": f"Company Name: {company_name}"},
-                    {"role": "user", "content": f"Ad Source: {ad_source}"},
-                ]
-            )
-            # Append additional instructions last as a separate message
-            if additional_instructions_text:
-                messages.append({"role": "user", "content": additional_instructions_text.strip()})
-                if "OVERRIDE" in additional_instructions_text:
-                    logger.debug(
-                        "Additional instructions appended to ChatGPT messages (OVERRIDE MODE)"
-                    )
-                else:
-                    logger.debug(
-                        "Additional instructions appended to ChatGPT messages (ENHANCEMENT MODE)"
-                    )
-            # Keep completion cap bounded for letter generation latency.
-            _log_prompt_length(llm, messages=messages)
-            _write_llm_prompt_log(llm, messages=messages)
-            if gpt_model == "gpt-5.2":
-                response = client.chat.completions.create(
-                    model=gpt_model,
-                    messages=messages,
-                    max_completion_tokens=settings.LLM_MAX_OUTPUT_TOKENS,  # GPT-5.2 uses max_completion_tokens
+def _collect_stream(chunks: Iterable[Optional[str]], on_token: Callable[[str], None]) -> str:
+    """Forward non-empty provider chunks to on_token and return the joined completion."""
+    parts = []
+    for chunk in chunks:
+        if chunk:
+            parts.append(chunk)
+            on_token(chunk)
+    return "".join(parts)
+
+
+def _iter_sse_deltas(
+    lines: Iterable[str], usage: Optional[Dict[str, Any]] = None
+) -> Iterator[Optional[str]]:
+    """
+    Yield delta text from an OpenAI-compatible chat completions SSE stream (xAI).
+
+    The usage object of the final chunk (sent with stream_options.include_usage) is copied
+    into usage when given.
+    """
+    for line in lines:
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+        except json.JSONDecodeError:
+            continue
+        if usage is not None and chunk.get("usage"):
+            usage.update(chunk["usage"])
+        for choice in chunk.get("choices") or []:
+            yield (choice.get("delta") or {}).get("content")
+
+
+def _iter_openai_deltas(chunks: Iterable[Any], usage: Dict[str, Any]) -> Iterator[Optional[str]]:
+    """Yield delta text from an OpenAI SDK stream, copying the final usage chunk into usage."""
+    for chunk in chunks:
+        if chunk.usage is not None:
+            usage.update(chunk.usage.model_dump())
+        if chunk.choices:
+            yield chunk.choices[0].delta.content
+
+
+def _iter_gemini_text(chunks: Iterable[Any], usage: Dict[str, Any]) -> Iterator[Optional[str]]:
+    """Yield text from a Gemini stream, keeping the latest usage_metadata in usage."""
+    for chunk in chunks:
+        usage_metadata = getattr(chunk, "usage_metadata", None)
+        if usage_metadata:
+            usage["usage_metadata"] = usage_metadata
+        yield chunk.text
+
+
+def _record_prompt_usage(
+    llm: str,
+    prompt_tokens: Optional[int],
+    cached_tokens: Optional[int] = 0,
+    cache_write_tokens: Optional[int] = 0,
+) -> None:
+    """Count provider-reported prompt tokens, including prompt-cache reads and writes."""
+    if prompt_tokens is None:
+        return
+    cached_tokens = cached_tokens or 0
+    cache_write_tokens = cache_write_tokens or 0
+    label = llm_metric_label(llm)
+    LLM_PROMPT_TOKENS_TOTAL.inc(prompt_tokens, llm=label, kind="prompt")
+    LLM_PROMPT_TOKENS_TOTAL.inc(cached_tokens, llm=label, kind="cached")
+    if cache_write_tokens:
+        LLM_PROMPT_TOKENS_TOTAL.inc(cache_write_tokens, llm=label, kind="cache_write")
+    logger.info(
+        f"{llm} prompt tokens: {prompt_tokens} (cached: {cached_tokens}, "
+        f"cache write: {cache_write_tokens})"
+    )
+
+
+def _record_chat_usage(llm: str, usage: Optional[Dict[str, Any]]) -> None:
+    """Prompt token counts from an OpenAI-compatible usage object (OpenAI, xAI)."""
+    if not usage:
+        return
+    details = usage.get("prompt_tokens_details") or {}
+    _record_prompt_usage(llm, usage.get("prompt_tokens"), details.get("cached_tokens"))
+
+
+def _record_gemini_usage(llm: str, usage_metadata: Any) -> None:
+    if usage_metadata is None:
+        return
+    _record_prompt_usage(
+        llm,
+        getattr(usage_metadata, "prompt_token_count", None),
+        getattr(usage_metadata, "cached_content_token_count", 0),
+    )
+
+
+def _record_claude_usage(llm: str, usage: Any) -> None:
+    """Anthropic reports uncached input, cache reads and cache writes separately."""
+    if usage is None:
+        return
+    cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+    _record_prompt_usage(llm, usage.input_tokens + cache_read + cache_write, cache_read, cache_write)
+
+
+def _call_llm(gen: Dict[str, Any], on_token: Optional[Callable[[str], None]] = None) -> str:
+    """
+    Send the prepared prompt to the selected provider and return the raw completion text.
+
+    When on_token is given the provider's streaming API is used and each text chunk is passed
+    to on_token as it arrives; the joined text is still returned.
+    """
+    llm = gen["llm"]
+    additional_instructions_text = gen["additional_instructions_text"]
+
+    # Map model names to display names for compatibility
+    if llm == "Gemini" or llm == "gemini-2.5-flash":
+        # Include personality instruction prominently at the start
+        msg = build_full_text_prompt(gen)
+        if additional_instructions_text:
+            if "OVERRIDE" in additional_instructions_text:
+                logger.debug(
+                    "Additional instructions appended to Gemini prompt (OVERRIDE MODE)"
                 )
             else:
-                response = client.chat.completions.create(
-                    model=gpt_model,
-                    messages=messages,
-                    max_tokens=16000,  # Older GPT models use max_tokens
+                logger.debug(
+                    "Additional instructions appended to Gemini prompt (ENHANCEMENT MODE)"
                 )
-            r = response.choices[0].message.content
+        # Prefix caching is implicit on Gemini 2.5; an explicit context cache for the system
+        # prompt + resume is opt-in because its storage is billed
+        contents = msg
+        model = None
+        if settings.GEMINI_CONTEXT_CACHE_ENABLED and gen.get("resume_message"):
+            model = get_gemini_cached_model(
+                "gemini-2.5-flash", get_system_prompt(), gen["resume_message"]
+            )
+            if model is not None:
+                contents = split_full_text_prompt(gen)[1]
+        if model is None:
+            model = get_gemini_model("gemini-2.5-flash")
+        if model is None:
+            raise ValueError("Google Generative AI not available or API key not set")
+
+        # Configure generation to ensure complete JSON response
+        generation_config = {
+            "temperature": 0.7,
+            "top_p": 0.95,
+            "top_k": 40,
+            "max_output_tokens": settings.LLM_MAX_OUTPUT_TOKENS,
+        }
 
-        elif llm == "Grok" or llm == xai_model or llm == "grok-4-fast-reasoning":
-            xai_api_key = _resolve_xai_api_key()
-            if not REQUESTS_AVAILABLE or not xai_api_key:
-                logger.error(
-                    "Grok prerequisites failed (requests_available=%s, xai_key_set=%s)",
-                    REQUESTS_AVAILABLE,
-                    bool(xai_api_key),
+        _log_prompt_length(llm, full_text=msg)
+        submit_background(_write_llm_prompt_log, llm, full_text=msg)
+        if on_token:
+            chunks = model.generate_content(
+                contents=contents, generation_config=generation_config, stream=True
+            )
+            usage: Dict[str, Any] = {}
+            r = _collect_stream(_iter_gemini_text(chunks, usage), on_token)
+            _record_gemini_usage(llm, usage.get("usage_metadata"))
+        else:
+            response = model.generate_content(contents=contents, generation_config=generation_config)
+            r = response.text
+            _record_gemini_usage(llm, getattr(response, "usage_metadata", None))
+        logger.info(f"Gemini response length: {len(r)} characters")
+
+    elif llm == "ChatGPT" or llm == gpt_model or llm == "gpt-4.1":
+        client = get_openai_client()
+        if client is None:
+            raise ValueError("OpenAI not available or API key not set")
+        # Personality instruction as a separate, prominent message; additional instructions last
+        messages = build_chat_messages(gen)
+        if additional_instructions_text:
+            if "OVERRIDE" in additional_instructions_text:
+                logger.debug(
+                    "Additional instructions appended to ChatGPT messages (OVERRIDE MODE)"
                 )
-                raise ValueError("XAI API not available or API key not set")
-            # Use HTTP API (xai SDK has different API structure)
-            headers = {
-                "Authorization": f"Bearer {xai_api_key}",
-                "Content-Type": "application/json",
-            }
-            messages_list = [
-                {"role": "system", "content": system_message},
-                {
-                    "role": "user",
-                    "content": critical_instructions.strip(),
-                },  # Add personality instruction as separate, prominent message
-            ]
-            messages_list.extend(
-                [
-                    {"role": "user", "content": message},
-                    {"role": "user", "content": f"Hiring Manager: {hiring_manager}"},
-                    {"role": "user", "content": f"Company Name: {company_name}"},
-                    {"role": "user", "content": f"Ad Source: {ad_source}"},
-                ]
+            else:
+                logger.debug(
+                    "Additional instructions appended to ChatGPT messages (ENHANCEMENT MODE)"
+                )
+        # Keep completion cap bounded for letter generation latency.
+        _log_prompt_length(llm, messages=messages)
+        submit_background(_write_llm_prompt_log, llm, messages=messages)
+        if gpt_model == "gpt-5.2":
+            completion_limit = {"max_completion_tokens": settings.LLM_MAX_OUTPUT_TOKENS}  # GPT-5.2 uses max_completion_tokens
+        else:
+            completion_limit = {"max_tokens": 16000}  # Older GPT models use max_tokens
+        # Prefix caching is automatic; the key routes a user's requests to the same cache
+        if gen.get("prompt_cache_key"):
+            completion_limit["prompt_cache_key"] = gen["prompt_cache_key"]
+        if on_token:
+            usage = {}
+            # Closing the stream early (e.g. a cancelled hedge attempt) drops the connection
+            with client.chat.completions.create(
+                model=gpt_model,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                **completion_limit,
+            ) as chunks:
+                r = _collect_stream(_iter_openai_deltas(chunks, usage), on_token)
+            _record_chat_usage(llm, usage)
+        else:
+            response = client.chat.completions.create(
+                model=gpt_model, messages=messages, **completion_limit
+            )
+            r = response.choices[0].message.content
+            _record_chat_usage(llm, response.usage.model_dump() if response.usage else None)
+
+    elif llm == "Grok" or llm == xai_model or llm == "grok-4-fast-reasoning":
+        xai_api_key = _resolve_xai_api_key()
+        xai_client = get_xai_http_client()
+        if xai_client is None or not xai_api_key:
+            logger.error(
+                "Grok prerequisites failed (http_client_available=%s, xai_key_set=%s)",
+                xai_client is not None,
+                bool(xai_api_key),
             )
-            # Append additional instructions last
-            if additional_instructions_text:
-                messages_list.append(
-                    {"role": "user", "content": additional_instructions_text.strip()}
+            raise ValueError("XAI API not available or API key not set")
+        # Use HTTP API (xai SDK has different API structure)
+        headers = {
+            "Authorization": f"Bearer {xai_api_key}",
+            "Content-Type": "application/json",
+        }
+        if gen.get("prompt_cache_key"):
+            # Requests with the same conversation id are routed to the server holding their cache
+            headers["x-grok-conv-id"] = gen["prompt_cache_key"]
+        # Personality instruction as a separate, prominent message; additional instructions last
+        messages_list = build_chat_messages(gen)
+        if additional_instructions_text:
+            if "OVERRIDE" in additional_instructions_text:
+                logger.debug(
+                    "Additional instructions appended to Grok messages (OVERRIDE MODE)"
                 )
-                if "OVERRIDE" in additional_instructions_text:
-                    logger.debug(
-                        "Additional instructions appended to Grok messages (OVERRIDE MODE)"
-                    )
-                else:
-                    logger.debug(
-                        "Additional instructions appended to Grok messages (ENHANCEMENT MODE)"
-                    )
-            _log_prompt_length(llm, messages=messages_list)
-            _write_llm_prompt_log(llm, messages=messages_list)
-            data = {"model": xai_model, "messages": messages_list}
-            response = requests.post(
-                "https://api.x.ai/v1/chat/completions",
+            else:
+                logger.debug(
+                    "Additional instructions appended to Grok messages (ENHANCEMENT MODE)"
+                )
+        _log_prompt_length(llm, messages=messages_list)
+        submit_background(_write_llm_prompt_log, llm, messages=messages_list)
+        data = {"model": xai_model, "messages": messages_list}
+        if on_token:
+            data["stream"] = True
+            data["stream_options"] = {"include_usage": True}
+            usage = {}
+            with xai_client.stream(
+                "POST", "chat/completions", json=data, headers=headers, timeout=3600
+            ) as response:
+                response.raise_for_status()
+                r = _collect_stream(_iter_sse_deltas(response.iter_lines(), usage), on_token)
+            _record_chat_usage(llm, usage)
+        else:
+            response = xai_client.post(
+                "chat/completions",
                 json=data,
                 headers=headers,
                 timeout=3600,
@@ -1208,188 +1129,174 @@ YOU MUST FOLLOW THESE INSTRUCTIONS EXACTLY:
             response.raise_for_status()
             result = response.json()
             r = result["choices"][0]["message"]["content"]
+            _record_chat_usage(llm, result.get("usage"))
+
+    elif llm == "OCI" or llm == "oci-generative-ai":
+        # Include personality instruction prominently at the start
+        full_prompt = build_full_text_prompt(gen)
+        _log_prompt_length(llm, full_text=full_prompt)
+        submit_background(_write_llm_prompt_log, llm, full_text=full_prompt)
+        r = get_oc_info(full_prompt)
+        logger.info(f"OCI response received ({len(r)} characters)")
+        if on_token:
+            # OCI has no streaming API here; forward the whole completion as one chunk
+            on_token(r)
+
+    elif llm == "Llama" or llm == ollama_model or llm == "llama3.2":
+        if not OLLAMA_AVAILABLE:
+            raise ImportError(
+                "ollama library is not installed. Please install it with: pip install ollama"
+            )
 
-        elif llm == "OCI" or llm == "oci-generative-ai":
-            # Include personality instruction prominently at the start
-            full_prompt = f"{system_message}{critical_instructions}. {message}. Hiring Manager: {hiring_manager}. Company Name: {company_name}. Ad Source: {ad_source}{additional_instructions_text}"
-            _log_prompt_length(llm, full_text=full_prompt)
-            _write_llm_prompt_log(llm, full_text=full_prompt)
-            r = get_oc_info(full_prompt)
-            logger.info(f"OCI response received ({len(r)} characters)")
-
-        elif llm == "Llama" or llm == ollama_model or llm == "llama3.2":
-            if not OLLAMA_AVAILABLE:
-                raise ImportError(
-                    "ollama library is not installed. Please install it with: pip install ollama"
+        # The message data already includes the personality profile (tone field); Llama gets
+        # no separate context lines, additional instructions last
+        messages = build_chat_messages(gen, include_context=False)
+        if additional_instructions_text:
+            if "OVERRIDE" in additional_instructions_text:
+                logger.debug(
+                    "Additional instructions appended to Llama messages (OVERRIDE MODE)"
                 )
-
-            # Use the same message_data that includes the personality profile (tone field)
-            # This ensures the personality profile description is included in Llama prompts
-            message_llama = (
-                message  # Use the original message which includes the tone/personality profile
-            )
-            messages = [
-                {"role": "system", "content": system_message},
-                {
-                    "role": "user",
-                    "content": critical_instructions.strip(),
-                },  # Add personality instruction as separate, prominent message
-            ]
-            messages.append({"role": "user", "content": message_llama})
-            # Append additional instructions last
-            if additional_instructions_text:
-                messages.append({"role": "user", "content": additional_instructions_text.strip()})
-                if "OVERRIDE" in additional_instructions_text:
-                    logger.debug(
-                        "Additional instructions appended to Llama messages (OVERRIDE MODE)"
-                    )
-                else:
-                    logger.debug(
-                        "Additional instructions appended to Llama messages (ENHANCEMENT MODE)"
-                    )
-            _log_prompt_length(llm, messages=messages)
-            _write_llm_prompt_log(llm, messages=messages)
+            else:
+                logger.debug(
+                    "Additional instructions appended to Llama messages (ENHANCEMENT MODE)"
+                )
+        _log_prompt_length(llm, messages=messages)
+        submit_background(_write_llm_prompt_log, llm, messages=messages)
+        if on_token:
+            chunks = ollama.chat(model=ollama_model, messages=messages, stream=True)
+            r = _collect_stream((c["message"]["content"] for c in chunks), on_token)
+        else:
             response = ollama.chat(model=ollama_model, messages=messages)
             r = response["message"]["content"]
 
-        elif llm == "Claude" or llm == claude_model or llm == "claude-sonnet-4-20250514":
-            if not ANTHROPIC_AVAILABLE or not settings.ANTHROPIC_API_KEY:
-                raise ValueError("Anthropic not available or API key not set")
-            client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-            content_list = [
-                {
-                    "type": "text",
-                    "text": critical_instructions.strip(),
-                },  # Add personality instruction as separate, prominent message
-            ]
-            content_list.extend(
-                [
-                    {"type": "text", "text": message},
-                    {"type": "text", "text": f"Hiring Manager: {hiring_manager}"},
-                    {"type": "text", "text": f"Company Name: {company_name}"},
-                    {"type": "text", "text": f"Ad Source: {ad_source}"},
-                ]
-            )
-            # Append additional instructions last
-            if additional_instructions_text:
-                content_list.append({"type": "text", "text": additional_instructions_text.strip()})
-                if "OVERRIDE" in additional_instructions_text:
-                    logger.debug(
-                        "Additional instructions appended to Claude messages (OVERRIDE MODE)"
-                    )
-                else:
-                    logger.debug(
-                        "Additional instructions appended to Claude messages (ENHANCEMENT MODE)"
-                    )
-            messages = [{"role": "user", "content": content_list}]
-            _log_prompt_length(llm, system=system_message, user_content_list=content_list)
-            _write_llm_prompt_log(
-                llm, system=system_message, user_content_list=content_list
-            )
-            response = client.messages.create(
-                model=claude_model,
-                system=system_message,
-                messages=messages,
-                max_tokens=settings.LLM_MAX_OUTPUT_TOKENS,
-                temperature=1,
-            )
-            r = response.content[0].text
+    elif llm == "Claude" or llm == claude_model or llm == "claude-sonnet-4-20250514":
+        client = get_anthropic_client()
+        if client is None:
+            raise ValueError("Anthropic not available or API key not set")
+        # Personality instruction as a separate, prominent block; additional instructions last
+        content_list = build_claude_content(gen)
+        system_message = get_system_prompt()
+        if additional_instructions_text:
+            if "OVERRIDE" in additional_instructions_text:
+                logger.debug(
+                    "Additional instructions appended to Claude messages (OVERRIDE MODE)"
+                )
+            else:
+                logger.debug(
+                    "Additional instructions appended to Claude messages (ENHANCEMENT MODE)"
+                )
+        messages = [{"role": "user", "content": content_list}]
+        _log_prompt_length(llm, system=system_message, user_content_list=content_list)
+        submit_background(
+            _write_llm_prompt_log, llm, system=system_message, user_content_list=content_list
+        )
+        claude_kwargs = dict(
+            model=claude_model,
+            # cache_control blocks when prompt caching is on (system prompt + resume prefix)
+            system=build_claude_system(gen),
+            messages=messages,
+            max_tokens=settings.LLM_MAX_OUTPUT_TOKENS,
+            temperature=1,
+        )
+        if on_token:
+            with client.messages.stream(**claude_kwargs) as stream:
+                r = _collect_stream(stream.text_stream, on_token)
+                _record_claude_usage(llm, stream.get_final_message().usage)
         else:
-            raise ValueError(f"Unsupported LLM: {llm}")
+            response = client.messages.create(**claude_kwargs)
+            r = response.content[0].text
+            _record_claude_usage(llm, response.usage)
+    else:
+        raise ValueError(f"Unsupported LLM: {llm}")
+    return r
+
+
+def _call_llm_routed(
+    gen: Dict[str, Any], on_token: Optional[Callable[[str], None]] = None
+) -> Tuple[str, str]:
+    """
+    _call_llm(), hedged to the configured fallback model when LLM_HEDGING_ENABLED
+    (app/utils/llm_router.py).
+
+    Returns:
+        (completion text, model that produced it)
+    """
+    if not settings.LLM_HEDGING_ENABLED:
+        return _call_llm(gen, on_token=on_token), gen["llm"]
+    return get_llm_router().call(
+        gen["llm"],
+        lambda llm, token: _call_llm(dict(gen, llm=llm), on_token=token),
+        on_token=on_token,
+    )
+
+
+def _tee_to_parser(
+    on_token: Callable[[str], None], parser: StreamingJSONParser
+) -> Callable[[str], None]:
+    """Token callback that forwards each chunk to on_token and feeds it to parser."""
+
+    def forward(chunk: str) -> None:
+        on_token(chunk)
+        parser.feed(chunk)
+
+    return forward
+
+
+def _run_generation(
+    gen: Dict[str, Any],
+    timing: Optional[GenerationTiming] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    on_field: Optional[Callable[[str, Any], None]] = None,
+) -> Dict[str, Any]:
+    """Call the LLM for a prepared generation, then parse, normalize and cache the result."""
+    llm = gen["llm"]
+    user_id = gen["user_id"]
+    user_email = gen["user_email"]
+    user_ctx = gen["user_ctx"]
+    today_date = gen["today_date"]
+    today_date_iso = gen["today_date_iso"]
+    additional_instructions = gen["additional_instructions"]
+    result_cache_key = gen["result_cache_key"]
+
+    r = ""
+    parser: Optional[StreamingJSONParser] = None
+    stream_token: Optional[Callable[[str], None]] = None
+    if on_token:
+        # Parse while streaming so top-level fields reach on_field as soon as they are complete
+        parser = StreamingJSONParser(on_field=on_field)
+        stream_token = _tee_to_parser(on_token, parser)
+
+    try:
+        if timing:
+            timing.checkpoint("llm_call_start")
+        r, served_by = _call_llm_routed(gen, on_token=stream_token)
         if timing:
             timing.checkpoint("llm_call_done")
+        if served_by != llm:
+            # A hedged request to the fallback model answered first
+            llm = served_by
+            if timing:
+                timing.set_labels(llm=llm_metric_label(served_by))
 
-        _write_llm_response_log(llm, r)
+        submit_background(_write_llm_response_log, llm, r)
 
         _record_generation_usage(user_id=user_id, user_email=user_email, user_ctx=user_ctx, llm=llm)
         if timing:
             timing.checkpoint("usage_updates_done")
 
-        # Clean and parse the response
-        logger.info("Cleaning and parsing LLM response text")
-        r = r.replace("```json", "").replace("```", "").strip()
-
-        # Try to extract JSON if it's embedded in text
-        # Look for JSON object boundaries
-        start_idx = r.find("{")
-        end_idx = r.rfind("}")
-
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-            # Extract just the JSON portion
-            json_str = r[start_idx : end_idx + 1]
+        # Parse the response in one pass (ignores ``` fences and surrounding prose, recovers a
+        # truncated reply); a streamed response was already parsed as its chunks arrived
+        logger.info("Parsing JSON from LLM response")
+        if parser is None:
+            parser = StreamingJSONParser()
+            parser.feed(r)
+        json_r = parser.finish()
+        if parser.truncated:
+            logger.warning(
+                f"LLM response JSON was incomplete; recovered fields: {sorted(json_r)}"
+            )
         else:
-            json_str = r
-
-        logger.info("Attempting to parse JSON from LLM response")
-        try:
-            json_r = json.loads(json_str)
             logger.info("JSON parse of LLM response succeeded")
-        except json.JSONDecodeError as e:
-            # If parsing fails, try to fix common issues
-            logger.warning(f"Initial JSON parse failed: {e}, attempting to fix...")
-
-            # Fix 1: Look for the last complete JSON object (balanced braces)
-            brace_count = 0
-            last_valid_end = -1
-            for i, char in enumerate(json_str):
-                if char == "{":
-                    brace_count += 1
-                elif char == "}":
-                    brace_count -= 1
-                    if brace_count == 0:
-                        last_valid_end = i
-                        break
-
-            if last_valid_end > 0:
-                try:
-                    json_r = json.loads(json_str[: last_valid_end + 1])
-                    logger.info("Successfully fixed truncated JSON (balanced braces)")
-                except json.JSONDecodeError:
-                    json_r = None
-            else:
-                json_r = None
-
-            # Fix 2: If still no parse (e.g. unterminated string), recover "content" or "markdown" from start
-            if json_r is None and ("Unterminated string" in str(e) or "Expecting" in str(e)):
-                content_match = re.search(r'"content"\s*:\s*"', json_str)
-                markdown_match = re.search(r'"markdown"\s*:\s*"', json_str)
-                if content_match:
-                    value_start = content_match.end()
-                    raw_content = json_str[value_start:]
-                    escaped = (
-                        raw_content.replace("\\", "\\\\")
-                        .replace('"', '\\"')
-                        .replace("\n", "\\n")
-                        .replace("\r", "\\r")
-                    )
-                    try:
-                        fixed_str = '{"content": "' + escaped + '"}'
-                        json_r = json.loads(fixed_str)
-                        logger.info("Recovered from unterminated string: using content")
-                    except json.JSONDecodeError:
-                        pass
-                if json_r is None and markdown_match:
-                    value_start = markdown_match.end()
-                    raw_markdown = json_str[value_start:]
-                    # Escape for JSON: backslash and quote first, then newlines
-                    escaped = (
-                        raw_markdown.replace("\\", "\\\\")
-                        .replace('"', '\\"')
-                        .replace("\n", "\\n")
-                        .replace("\r", "\\r")
-                    )
-                    try:
-                        fixed_str = '{"markdown": "' + escaped + '", "html": ""}'
-                        json_r = json.loads(fixed_str)
-                        logger.info(
-                            "Recovered from unterminated string: using markdown content, html empty"
-                        )
-                    except json.JSONDecodeError:
-                        pass
-
-            if json_r is None:
-                logger.warning("JSON parse still failed after all fix attempts; re-raising error")
-                raise e
 
         # Docx components flow: LLM returns document_xml, numbering_xml, styles_xml (when USE_DOCX_COMPONENTS)
         doc_xml = json_r.get("document_xml")
@@ -1414,7 +1321,7 @@ YOU MUST FOLLOW THESE INSTRUCTIONS EXACTLY:
                 logger.info("Removed 'content ' prefix from LLM response")
             if today_date_iso and today_date and today_date != today_date_iso:
                 letter_content = letter_content.replace(today_date_iso, today_date)
-            _write_additional_instructions_debug(additional_instructions, letter_content)
+            submit_background(_write_additional_instructions_debug, additional_instructions, letter_content)
             result_payload = {"content": letter_content}
             if timing:
                 timing.checkpoint("response_parsed")
@@ -1506,3 +1413,155 @@ YOU MUST FOLLOW THESE INSTRUCTIONS EXACTLY:
         result_payload = {"content": error_msg, "markdown": error_msg, "html": error_html}
         _set_cached_result(result_cache_key, result_payload)
         return result_payload
+
+
+
+
+def get_job_info(
+    llm: str,
+    date_input: str,
+    company_name: str,
+    hiring_manager: str,
+    ad_source: str,
+    resume: str,
+    jd: str,
+    additional_instructions: str,
+    tone: str,
+    address: str = "",
+    phone_number: str = "",
+    user_id: Optional[str] = None,
+    user_email: Optional[str] = None,
+    is_plain_text: bool = False,
+    current_user: Optional[UserResponse] = None,
+    timing: Optional[GenerationTiming] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    on_field: Optional[Callable[[str, Any], None]] = None,
+):
+    """
+    Generate cover letter based on job information using specified LLM.
+    Returns a dictionary with 'markdown' and 'html' fields.
+
+    Args:
+        user_id: Optional user ID to access custom personality profiles
+        user_email: Optional user email to access custom personality profiles
+        is_plain_text: If True, skip all file processing (S3, local files, base64) and treat resume as plain text
+        on_token: Optional callback for streaming; receives completion text chunks as the provider
+            produces them (a cached result is replayed as a single chunk)
+        on_field: Optional callback for streaming; receives (name, value) for each top-level
+            field of the LLM's JSON reply once the field is complete (a cached result's fields
+            are replayed)
+    """
+    gen = _prepare_generation(
+        llm=llm,
+        date_input=date_input,
+        company_name=company_name,
+        hiring_manager=hiring_manager,
+        ad_source=ad_source,
+        resume=resume,
+        jd=jd,
+        additional_instructions=additional_instructions,
+        tone=tone,
+        address=address,
+        phone_number=phone_number,
+        user_id=user_id,
+        user_email=user_email,
+        is_plain_text=is_plain_text,
+        current_user=current_user,
+        timing=timing,
+    )
+
+    if timing:
+        timing.set_labels(llm=llm_metric_label(llm))
+    cached_result = _get_cached_result(gen["result_cache_key"])
+    if cached_result:
+        logger.info("Generation result cache hit; skipping upstream LLM call")
+        if timing:
+            timing.set_labels(cache="hit")
+        _record_generation_usage(
+            user_id=gen["user_id"], user_email=gen["user_email"], user_ctx=gen["user_ctx"], llm=llm
+        )
+        if timing:
+            timing.checkpoint("result_cache_hit")
+        if on_token:
+            on_token(json.dumps(cached_result, ensure_ascii=False))
+        _replay_fields(cached_result, on_field)
+        return cached_result
+
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return _run_generation(gen, timing=timing, on_token=on_token, on_field=on_field)
+
+    result_cache_key = gen["result_cache_key"]
+    result, shared = _result_single_flight.do(
+        result_cache_key,
+        lambda: _run_generation(gen, timing=timing, on_token=on_token, on_field=on_field),
+        lookup=lambda: _get_cached_result(result_cache_key),
+    )
+    if shared:
+        # Another request made the LLM call; account for this one like a cache hit
+        _record_generation_usage(
+            user_id=gen["user_id"], user_email=gen["user_email"], user_ctx=gen["user_ctx"], llm=llm
+        )
+        if timing:
+            timing.set_labels(cache="shared")
+            timing.checkpoint("single_flight_shared")
+        if on_token:
+            on_token(json.dumps(result, ensure_ascii=False))
+        _replay_fields(result, on_field)
+    return result
+
+
+def _replay_fields(result: Dict[str, Any], on_field: Optional[Callable[[str, Any], None]]) -> None:
+    if on_field:
+        for name, value in result.items():
+            on_field(name, value)
+
+
+def get_generation_single_flight_stats() -> Dict[str, Any]:
+    """Counters for coalesced generations (deduplicated = upstream LLM calls avoided)."""
+    return _result_single_flight.stats()
+
+
+async def get_job_info_async(**kwargs: Any) -> Dict[str, Any]:
+    """
+    Async entry point for get_job_info().
+
+    Runs the blocking generation pipeline on the bounded LLM executor so the event loop
+    keeps serving other requests while the provider call is in flight. Accepts the same
+    keyword arguments as get_job_info().
+    """
+    return await run_in_llm_executor(get_job_info, **kwargs)
+
+
+async def stream_job_info(**kwargs: Any) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming entry point for get_job_info().
+
+    Yields ("token", text) for each completion chunk as the provider produces it and
+    ("field", {"name": ..., "value": ...}) for each top-level field of the reply once it is
+    complete, then a single ("result", payload) with the parsed result. Generation runs on the bounded LLM executor and
+    chunks are handed back to the event loop through a queue. Exceptions from get_job_info()
+    (e.g. HTTPException for a missing profile) propagate to the consumer.
+
+    If the consumer stops early the generation still completes in the background and its result
+    is cached as usual.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_token(chunk: str) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, ("token", chunk))
+
+    def on_field(name: str, value: Any) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, ("field", {"name": name, "value": value}))
+
+    task = asyncio.ensure_future(
+        run_in_llm_executor(get_job_info, on_token=on_token, on_field=on_field, **kwargs)
+    )
+    # Chunks are scheduled before the executor future resolves, so "done" always arrives last
+    task.add_done_callback(lambda _t: queue.put_nowait(("done", None)))
+    while True:
+        kind, value = await queue.get()
+        if kind == "done":
+            break
+        yield kind, value
+    yield "result", task.result()
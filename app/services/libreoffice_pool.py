@@ -0,0 +1,432 @@
+"""
+Pool of long-lived LibreOffice workers for document → PDF conversion.
+
+Each worker owns an isolated user-profile directory, so concurrent conversions never collide
+on the shared default profile. When the Python UNO bridge is importable (python3-uno), a
+worker is a persistent `soffice --headless` process listening on a private pipe and every job
+is a load/store over UNO, with no per-job startup cost. Without UNO, a worker runs
+`soffice --convert-to pdf` per job against its own already-initialised profile, which still
+avoids profile creation and lock contention.
+
+Jobs wait for a free worker in a bounded queue (LIBREOFFICE_MAX_QUEUE; beyond that
+LibreOfficePoolBusyError is raised), are killed after LIBREOFFICE_JOB_TIMEOUT_SECONDS, and
+workers are recycled after LIBREOFFICE_MAX_JOBS_PER_WORKER jobs or when their process dies.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import uno  # type: ignore[import-not-found]
+    from com.sun.star.beans import PropertyValue  # type: ignore[import-not-found]
+
+    UNO_AVAILABLE = True
+except ImportError:
+    uno = None
+    PropertyValue = None
+    UNO_AVAILABLE = False
+
+# Export filter per input type (HTML opens in Writer/Web)
+_PDF_FILTERS = {
+    ".html": "writer_web_pdf_Export",
+    ".htm": "writer_web_pdf_Export",
+}
+_DEFAULT_PDF_FILTER = "writer_pdf_Export"
+
+
+class LibreOfficePoolBusyError(RuntimeError):
+    """Raised when the conversion queue is full or no worker became free in time."""
+
+
+class _WorkerCrashed(Exception):
+    """The worker's soffice process died or stopped answering (job may be retried)."""
+
+
+def _not_installed_error() -> FileNotFoundError:
+    return FileNotFoundError(
+        "LibreOffice (soffice) is not installed. Required for PDF conversion "
+        "(e.g. apt install libreoffice-writer)."
+    )
+
+
+def _props(**values: Any) -> tuple:
+    return tuple(PropertyValue(Name=k, Value=v) for k, v in values.items())
+
+
+class LibreOfficeWorker:
+    """One soffice instance (UNO mode) or one isolated profile (CLI mode)."""
+
+    def __init__(self, index: int, binary: str, profile_root: str) -> None:
+        self.index = index
+        self.binary = binary
+        self.profile_dir = Path(profile_root) / f"worker-{os.getpid()}-{index}"
+        self.pipe_name = f"lo_pool_{os.getpid()}_{index}"
+        self.jobs = 0
+        self.starts = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._desktop = None
+        self._timed_out = False
+
+    @property
+    def profile_url(self) -> str:
+        return self.profile_dir.resolve().as_uri()
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> None:
+        """Start soffice and connect over UNO (no-op in CLI mode or when already running)."""
+        if not UNO_AVAILABLE or (self.running and self._desktop is not None):
+            return
+        self.stop()
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            self._process = subprocess.Popen(
+                [
+                    self.binary,
+                    "--headless",
+                    "--invisible",
+                    "--nologo",
+                    "--nodefault",
+                    "--norestore",
+                    "--nolockcheck",
+                    f"-env:UserInstallation={self.profile_url}",
+                    f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext",
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError:
+            raise _not_installed_error()
+
+        local_ctx = uno.getComponentContext()
+        resolver = local_ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_ctx
+        )
+        deadline = time.monotonic() + settings.LIBREOFFICE_START_TIMEOUT_SECONDS
+        while True:
+            try:
+                ctx = resolver.resolve(
+                    f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"
+                )
+                self._desktop = ctx.ServiceManager.createInstanceWithContext(
+                    "com.sun.star.frame.Desktop", ctx
+                )
+                break
+            except Exception as e:
+                if not self.running or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError(f"LibreOffice worker {self.index} failed to start: {e}")
+                time.sleep(0.25)
+        self.jobs = 0
+        self.starts += 1
+        logger.info(f"LibreOffice worker {self.index} started (pid {self._process.pid})")
+
+    def stop(self) -> None:
+        self._desktop = None
+        process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def kill(self) -> None:
+        """Called by the job watchdog when a conversion exceeds its timeout."""
+        self._timed_out = True
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+
+    def convert(self, input_path: Path, output_path: Path, timeout: float) -> None:
+        """Convert input_path to PDF at output_path."""
+        self.jobs += 1
+        if UNO_AVAILABLE:
+            self._convert_uno(input_path, output_path, timeout)
+        else:
+            self._convert_cli(input_path, output_path, timeout)
+        if not output_path.exists():
+            raise RuntimeError("LibreOffice did not produce a PDF file")
+
+    def _convert_uno(self, input_path: Path, output_path: Path, timeout: float) -> None:
+        self.start()
+        self._timed_out = False
+        watchdog = threading.Timer(timeout, self.kill)
+        watchdog.daemon = True
+        watchdog.start()
+        document = None
+        try:
+            document = self._desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(str(input_path)), "_blank", 0, _props(Hidden=True)
+            )
+            if document is None:
+                raise RuntimeError(f"LibreOffice could not open {input_path.name}")
+            pdf_filter = _PDF_FILTERS.get(input_path.suffix.lower(), _DEFAULT_PDF_FILTER)
+            document.storeToURL(
+                uno.systemPathToFileUrl(str(output_path)), _props(FilterName=pdf_filter)
+            )
+        except RuntimeError:
+            raise
+        except Exception as e:
+            if self._timed_out:
+                raise TimeoutError("conversion timed out")
+            if not self.running:
+                raise _WorkerCrashed(str(e))
+            raise RuntimeError(f"LibreOffice conversion failed: {e}")
+        finally:
+            watchdog.cancel()
+            if document is not None:
+                try:
+                    document.close(True)
+                except Exception:
+                    pass
+
+    def _convert_cli(self, input_path: Path, output_path: Path, timeout: float) -> None:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            subprocess.run(
+                [
+                    self.binary,
+                    f"-env:UserInstallation={self.profile_url}",
+                    "--headless",
+                    "--norestore",
+                    "--convert-to",
+                    "pdf",
+                    "--outdir",
+                    str(output_path.parent),
+                    str(input_path),
+                ],
+                check=True,
+                capture_output=True,
+                timeout=timeout,
+                cwd=str(output_path.parent),
+            )
+        except FileNotFoundError:
+            raise _not_installed_error()
+        except subprocess.TimeoutExpired:
+            raise TimeoutError("conversion timed out")
+        except subprocess.CalledProcessError as e:
+            logger.error("LibreOffice conversion failed: %s %s", e.stderr, e.stdout)
+            raise RuntimeError(
+                f"LibreOffice conversion failed: {e.stderr.decode() if e.stderr else str(e)}"
+            )
+
+    def remove_profile(self) -> None:
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+
+class LibreOfficePool:
+    """Bounded pool of LibreOfficeWorker instances with queue and latency metrics."""
+
+    def __init__(
+        self,
+        *,
+        size: int,
+        max_queue: int,
+        job_timeout: float,
+        max_jobs_per_worker: int,
+        binary: str,
+        profile_root: str,
+    ) -> None:
+        self.size = max(1, size)
+        self.max_queue = max(0, max_queue)
+        self.job_timeout = job_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._workers: List[LibreOfficeWorker] = [
+            LibreOfficeWorker(i, binary, profile_root) for i in range(self.size)
+        ]
+        self._idle: "queue.Queue[LibreOfficeWorker]" = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._busy = 0
+        self._counters = {
+            "jobs": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "recycled": 0,
+            "crashes": 0,
+        }
+        self._latencies: Deque[float] = deque(maxlen=500)
+        self._waits: Deque[float] = deque(maxlen=500)
+
+    def _bump(self, field: str) -> None:
+        with self._lock:
+            self._counters[field] += 1
+
+    def _acquire(self) -> LibreOfficeWorker:
+        with self._lock:
+            if self._idle.empty() and self._waiting >= self.max_queue:
+                self._counters["rejected"] += 1
+                raise LibreOfficePoolBusyError("PDF conversion queue is full, try again shortly")
+            self._waiting += 1
+        started = time.monotonic()
+        try:
+            worker = self._idle.get(timeout=self.job_timeout)
+        except queue.Empty:
+            self._bump("rejected")
+            raise LibreOfficePoolBusyError("Timed out waiting for a PDF conversion worker")
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        with self._lock:
+            self._busy += 1
+            self._waits.append(time.monotonic() - started)
+        return worker
+
+    def _release(self, worker: LibreOfficeWorker, recycle: bool) -> None:
+        if recycle or worker.jobs >= self.max_jobs_per_worker > 0:
+            worker.stop()
+            worker.jobs = 0
+            self._bump("recycled")
+        with self._lock:
+            self._busy -= 1
+        self._idle.put(worker)
+
+    def convert(self, data: bytes, filename: str, timeout: Optional[float] = None) -> bytes:
+        """
+        Convert a document to PDF on a pooled worker.
+
+        Args:
+            data: Document bytes (.docx, .html, ...)
+            filename: Input file name; its extension selects the import/export filters
+            timeout: Per-job timeout in seconds (defaults to LIBREOFFICE_JOB_TIMEOUT_SECONDS)
+
+        Returns:
+            PDF bytes
+
+        Raises:
+            FileNotFoundError: If LibreOffice (soffice) is not installed
+            LibreOfficePoolBusyError: If the queue is full
+            RuntimeError: If conversion fails or times out
+        """
+        timeout = timeout or self.job_timeout
+        worker = self._acquire()
+        started = time.monotonic()
+        recycle = False
+        try:
+            with tempfile.TemporaryDirectory(prefix="lo_pool_job_") as tmpdir:
+                input_path = Path(tmpdir) / filename
+                input_path.write_bytes(data)
+                output_path = input_path.with_suffix(".pdf")
+                try:
+                    worker.convert(input_path, output_path, timeout)
+                except _WorkerCrashed as e:
+                    # soffice died under us: restart it and retry the job once
+                    self._bump("crashes")
+                    logger.warning(f"LibreOffice worker {worker.index} crashed ({e}), restarting")
+                    worker.stop()
+                    worker.convert(input_path, output_path, timeout)
+                pdf_bytes = output_path.read_bytes()
+            self._bump("jobs")
+            return pdf_bytes
+        except TimeoutError:
+            recycle = True
+            self._bump("timeouts")
+            raise RuntimeError(f"PDF conversion of {filename} timed out after {timeout:.0f}s")
+        except (FileNotFoundError, RuntimeError, _WorkerCrashed) as e:
+            recycle = not worker.running and UNO_AVAILABLE
+            self._bump("failures")
+            if isinstance(e, _WorkerCrashed):
+                raise RuntimeError(f"LibreOffice worker crashed: {e}")
+            raise
+        finally:
+            with self._lock:
+                self._latencies.append(time.monotonic() - started)
+            self._release(worker, recycle)
+
+    def shutdown(self) -> None:
+        for worker in self._workers:
+            worker.stop()
+            worker.remove_profile()
+
+    def stats(self) -> Dict[str, Any]:
+        def _pct(values: List[float], q: float) -> float:
+            if not values:
+                return 0.0
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+
+        with self._lock:
+            latencies = list(self._latencies)
+            waits = list(self._waits)
+            snapshot: Dict[str, Any] = dict(self._counters)
+            snapshot.update(
+                {
+                    "mode": "uno" if UNO_AVAILABLE else "cli",
+                    "workers": self.size,
+                    "busy": self._busy,
+                    "queue_depth": self._waiting,
+                    "max_queue": self.max_queue,
+                    "running_processes": sum(1 for w in self._workers if w.running),
+                    # UNO mode: soffice launches; far fewer than jobs means workers stay warm
+                    "process_starts": sum(w.starts for w in self._workers),
+                }
+            )
+        snapshot["latency_ms"] = {"p50": _pct(latencies, 0.5), "p95": _pct(latencies, 0.95)}
+        snapshot["queue_wait_ms"] = {"p50": _pct(waits, 0.5), "p95": _pct(waits, 0.95)}
+        return snapshot
+
+
+_pool: Optional[LibreOfficePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_libreoffice_pool() -> LibreOfficePool:
+    """Process-wide pool, created on first use (workers start lazily on their first job)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if not UNO_AVAILABLE:
+                logger.warning(
+                    "LibreOffice UNO bridge not importable (install python3-uno for this "
+                    "interpreter); PDF conversion starts one soffice process per job"
+                )
+            _pool = LibreOfficePool(
+                size=settings.LIBREOFFICE_POOL_SIZE,
+                max_queue=settings.LIBREOFFICE_MAX_QUEUE,
+                job_timeout=settings.LIBREOFFICE_JOB_TIMEOUT_SECONDS,
+                max_jobs_per_worker=settings.LIBREOFFICE_MAX_JOBS_PER_WORKER,
+                binary=settings.LIBREOFFICE_BINARY,
+                profile_root=settings.LIBREOFFICE_PROFILE_DIR,
+            )
+        return _pool
+
+
+def convert_to_pdf(data: bytes, filename: str, timeout: Optional[float] = None) -> bytes:
+    """Convert document bytes to PDF using the shared pool (see LibreOfficePool.convert)."""
+    return get_libreoffice_pool().convert(data, filename, timeout)
+
+
+def get_libreoffice_pool_stats() -> Dict[str, Any]:
+    with _pool_lock:
+        pool = _pool
+    if pool is None:
+        return {"mode": "uno" if UNO_AVAILABLE else "cli", "started": False}
+    return pool.stats()
+
+
+def shutdown_libreoffice_pool() -> None:
+    """Stop all soffice workers (called from the app lifespan on shutdown)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
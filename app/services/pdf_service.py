@@ -9,8 +9,6 @@ import base64
 import io
 import os
 import re
-import subprocess
-import tempfile
 import json
 import zipfile
 from io import BytesIO
@@ -20,6 +18,7 @@ from typing import Dict, Optional, Union, Tuple
 import requests
 
 from app.core.config import settings
+from app.services.libreoffice_pool import convert_to_pdf
 
 logger = logging.getLogger(__name__)
 
@@ -539,7 +538,7 @@ def log_docx_highlight_and_background_xml(docx_bytes: bytes) -> None:
 
 def convert_docx_to_pdf(docx_bytes: bytes) -> bytes:
     """
-    Convert a .docx document to PDF using LibreOffice headless.
+    Convert a .docx document to PDF using the warm LibreOffice worker pool.
     Preserves formatting from the .docx (direct conversion, no HTML pipeline).
 
     Requires LibreOffice to be installed (e.g. apt-get install libreoffice-writer on Linux,
@@ -560,95 +559,32 @@ def convert_docx_to_pdf(docx_bytes: bytes) -> bytes:
 
     log_docx_highlight_and_background_xml(docx_bytes)
 
-    # Use a single temp directory for both input and output
-    with tempfile.TemporaryDirectory(prefix="docx2pdf_") as tmpdir:
-        tmpdir_path = Path(tmpdir)
-        docx_path = tmpdir_path / "document.docx"
-        docx_path.write_bytes(docx_bytes)
-
-        # LibreOffice: --headless --convert-to pdf --outdir <dir> <file>
-        # Output will be <dir>/document.pdf
-        try:
-            subprocess.run(
-                [
-                    "soffice",
-                    "--headless",
-                    "--convert-to",
-                    "pdf",
-                    "--outdir",
-                    str(tmpdir_path),
-                    str(docx_path),
-                ],
-                check=True,
-                capture_output=True,
-                timeout=120,
-                cwd=str(tmpdir_path),
-            )
-        except FileNotFoundError:
-            logger.error(
-                "LibreOffice (soffice) not found. Install it for docx→PDF (e.g. apt install libreoffice-writer)."
-            )
-            raise FileNotFoundError(
-                "LibreOffice (soffice) is not installed. Required for docx to PDF conversion."
-            )
-        except subprocess.TimeoutExpired:
-            raise RuntimeError("Docx to PDF conversion timed out")
-        except subprocess.CalledProcessError as e:
-            logger.error("LibreOffice conversion failed: %s %s", e.stderr, e.stdout)
-            raise RuntimeError(f"Docx to PDF conversion failed: {e.stderr.decode() if e.stderr else str(e)}")
-
-        pdf_path = tmpdir_path / "document.pdf"
-        if not pdf_path.exists():
-            raise RuntimeError("LibreOffice did not produce a PDF file")
-
-        return pdf_path.read_bytes()
+    try:
+        return convert_to_pdf(docx_bytes, "document.docx")
+    except FileNotFoundError:
+        logger.error(
+            "LibreOffice (soffice) not found. Install it for docx→PDF (e.g. apt install libreoffice-writer)."
+        )
+        raise FileNotFoundError(
+            "LibreOffice (soffice) is not installed. Required for docx to PDF conversion."
+        )
 
 
 def _generate_pdf_via_libreoffice_html(html_doc: str) -> bytes:
     """
-    Generate PDF from full HTML document using LibreOffice headless.
-    Writes HTML to a temp file and runs: soffice --headless --convert-to pdf --outdir <dir> file.html
+    Generate PDF from full HTML document using the warm LibreOffice worker pool.
 
     Requires LibreOffice (soffice) on PATH.
     """
-    with tempfile.TemporaryDirectory(prefix="pdf_libreoffice_") as tmpdir:
-        tmpdir_path = Path(tmpdir)
-        html_path = tmpdir_path / "document.html"
-        html_path.write_text(html_doc, encoding="utf-8")
-        try:
-            subprocess.run(
-                [
-                    "soffice",
-                    "--headless",
-                    "--convert-to",
-                    "pdf",
-                    "--outdir",
-                    str(tmpdir_path),
-                    str(html_path),
-                ],
-                check=True,
-                capture_output=True,
-                timeout=120,
-                cwd=str(tmpdir_path),
-            )
-        except FileNotFoundError:
-            logger.error(
-                "LibreOffice (soffice) not found. Install it (e.g. apt install libreoffice-writer)."
-            )
-            raise FileNotFoundError(
-                "LibreOffice (soffice) is not installed. Required for PDF generation."
-            )
-        except subprocess.TimeoutExpired:
-            raise RuntimeError("HTML to PDF conversion timed out")
-        except subprocess.CalledProcessError as e:
-            logger.error("LibreOffice HTML→PDF failed: %s %s", e.stderr, e.stdout)
-            raise RuntimeError(
-                f"LibreOffice HTML to PDF failed: {e.stderr.decode() if e.stderr else str(e)}"
-            )
-        pdf_path = tmpdir_path / "document.pdf"
-        if not pdf_path.exists():
-            raise RuntimeError("LibreOffice did not produce a PDF file")
-        return pdf_path.read_bytes()
+    try:
+        return convert_to_pdf(html_doc.encode("utf-8"), "document.html")
+    except FileNotFoundError:
+        logger.error(
+            "LibreOffice (soffice) not found. Install it (e.g. apt install libreoffice-writer)."
+        )
+        raise FileNotFoundError(
+            "LibreOffice (soffice) is not installed. Required for PDF generation."
+        )
 
 
 NUTRIENT_PDF_URL = "https://api.nutrient.io/processor/generate_pdf"
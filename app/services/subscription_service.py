@@ -17,8 +17,10 @@ except ImportError:
     stripe = None  # type: ignore[assignment]
 
 from app.core.config import settings
+from app.core.principal_cache import invalidate_principal
 from app.db.mongodb import get_collection, is_connected
 from app.utils.user_helpers import USERS_COLLECTION
+from app.utils.local_cache import LocalCache
 from app.models.subscription import SubscriptionResponse
 
 logger = logging.getLogger(__name__)
@@ -26,10 +28,11 @@ logger = logging.getLogger(__name__)
 # Stripe API version - must be consistent across all endpoints
 STRIPE_API_VERSION = "2023-10-16"
 
-# Simple in-memory cache for Stripe products/prices
-_stripe_plans_cache: Optional[Dict] = None
-_stripe_plans_cache_time: Optional[datetime] = None
-_stripe_plans_cache_ttl: timedelta = timedelta(minutes=5)  # Cache for 5 minutes
+# In-memory cache for Stripe products/prices
+_STRIPE_PLANS_CACHE_KEY = "plans"
+_stripe_plans_cache = LocalCache(
+    "stripe_plans", max_entries=1, default_ttl=timedelta(minutes=5).total_seconds()
+)
 
 
 def _get_stripe_module():
@@ -191,6 +194,7 @@ def get_user_subscription(user_id: str) -> SubscriptionResponse:
 
                 if update_doc:
                     collection.update_one({"_id": user_id_obj}, {"$set": update_doc})
+                    invalidate_principal(user_id)
         except Exception as e:
             logger.warning(
                 "Could not sync subscription state from Stripe for user %s: %s",
@@ -242,6 +246,7 @@ def get_user_subscription(user_id: str) -> SubscriptionResponse:
                             {"_id": user_id_obj},
                             {"$set": {"subscriptionProductId": product_id}}
                         )
+                        invalidate_principal(user_id)
                     else:
                         logger.warning(f"Could not extract product ID from subscription {subscription_id}")
                 else:
@@ -340,6 +345,7 @@ def update_user_subscription(
     if result.matched_count == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
+    invalidate_principal(user_id)
     logger.info(f"Updated subscription for user {user_id}")
 
 
@@ -1581,18 +1587,12 @@ def get_subscription_plans(force_refresh: bool = False) -> dict:
     Returns:
         Dictionary with 'plans' list containing plan information
     """
-    global _stripe_plans_cache, _stripe_plans_cache_time
-
     # Check cache first (unless force refresh)
-    if (
-        not force_refresh
-        and _stripe_plans_cache is not None
-        and _stripe_plans_cache_time is not None
-    ):
-        cache_age = datetime.now() - _stripe_plans_cache_time
-        if cache_age < _stripe_plans_cache_ttl:
-            logger.debug(f"Returning cached plans (age: {cache_age.total_seconds():.1f}s)")
-            return _stripe_plans_cache
+    if not force_refresh:
+        cached_plans = _stripe_plans_cache.get(_STRIPE_PLANS_CACHE_KEY)
+        if cached_plans is not None:
+            logger.debug("Returning cached plans")
+            return cached_plans
 
     # Try to fetch dynamically from Stripe
     plans = []
@@ -1671,7 +1671,6 @@ def get_subscription_plans(force_refresh: bool = False) -> dict:
 
     # Update cache
     result = {"plans": plans}
-    _stripe_plans_cache = result
-    _stripe_plans_cache_time = datetime.now()
+    _stripe_plans_cache.set(_STRIPE_PLANS_CACHE_KEY, result)
 
     return result
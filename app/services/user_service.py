@@ -11,6 +11,7 @@ import hashlib
 from datetime import datetime
 from typing import Dict, Optional, Any
 from bson import ObjectId
+from pymongo import ReturnDocument
 from fastapi import HTTPException, status
 
 from app.models.user import (
@@ -21,6 +22,7 @@ from app.models.user import (
     UserLoginResponse,
 )
 from app.core.config import settings
+from app.core.principal_cache import invalidate_principal
 from app.db.mongodb import get_collection, is_connected
 from app.utils.password import hash_password, verify_password, validate_strong_password
 from app.utils.user_helpers import (
@@ -654,6 +656,7 @@ def update_user(user_id: str, updates: UserUpdateRequest) -> UserResponse:
                 detail="User not found"
             )
         
+        invalidate_principal(user_id)
         # Return updated user
         updated_user = collection.find_one({"_id": user_id_obj})
         logger.info(f"User updated: {user_id}")
@@ -692,6 +695,7 @@ def delete_user(user_id: str) -> Dict:
         )
     
     result = collection.delete_one({"_id": user_id_obj})
+    invalidate_principal(user_id)
     
     if result.deleted_count == 0:
         raise HTTPException(
@@ -853,6 +857,7 @@ def increment_llm_usage_count(user_id: str, llm_name: str) -> bool:
         )
         
         if result.matched_count > 0:
+            invalidate_principal(user_id)
             updated_user = collection.find_one({"_id": user_id_obj})
             if updated_user and "llm_counts" in updated_user:
                 count = updated_user["llm_counts"].get(llm_name, 0)
@@ -870,60 +875,87 @@ def increment_llm_usage_count(user_id: str, llm_name: str) -> bool:
         return False
 
 
-def decrement_generation_credits(user_id: str) -> bool:
+def record_generation_usage(user_id: str, llm_name: str) -> Optional[int]:
     """
-    Decrement generation credits for free users if the field exists.
-    This is best-effort and intentionally non-fatal for generation flow.
+    Record one generation in a single round trip.
+
+    Replaces increment_llm_usage_count() plus a separate credit decrement (up to five reads and
+    writes) with one find_one_and_update using an update pipeline (MongoDB 4.2+), so the
+    per-model count, last_llm_used and the conditional credit decrement are applied atomically.
+    This is the only place generation credits are spent: they are decremented only when the
+    field is tracked, the subscription is not active and the balance is positive.
+
+    Args:
+        user_id: User ID
+        llm_name: Normalized LLM name
+
+    Returns:
+        Remaining generation credits after the update, or None if credits are not tracked for
+        the user or the update could not be applied
     """
     if not is_connected():
-        logger.warning("Database connection unavailable. Cannot decrement generation credits.")
-        return False
+        logger.warning("Database connection unavailable. Cannot record generation usage.")
+        return None
 
     collection = get_collection(USERS_COLLECTION)
     if collection is None:
-        logger.warning("Failed to access users collection. Cannot decrement generation credits.")
-        return False
+        logger.warning("Failed to access users collection. Cannot record generation usage.")
+        return None
 
     try:
         user_id_obj = ObjectId(user_id)
     except Exception:
         logger.warning(f"Invalid user ID format: {user_id}")
-        return False
-
-    try:
-        user = collection.find_one({"_id": user_id_obj})
-        if not user:
-            logger.warning(f"User {user_id} not found. Cannot decrement generation credits.")
-            return False
-
-        # Only apply to free users when generation_credits is tracked.
-        if "generation_credits" not in user:
-            logger.debug(f"User {user_id} has no generation_credits field; skipping decrement.")
-            return True
-
-        subscription_status = str(user.get("subscriptionStatus", "")).lower()
-        if subscription_status == "active":
-            logger.debug(f"User {user_id} has active subscription; skipping credit decrement.")
-            return True
+        return None
 
-        current_credits = int(user.get("generation_credits", 0) or 0)
-        if current_credits <= 0:
-            logger.info(f"User {user_id} has no remaining generation credits.")
-            return True
+    # Same (dotted) path increment_llm_usage_count() uses, so existing counters keep counting
+    counter_field = llm_name.lstrip("$") or "unknown"
+    credits = "$generation_credits"
+    pipeline = [
+        {
+            "$set": {
+                f"llm_counts.{counter_field}": {
+                    "$add": [{"$ifNull": [f"$llm_counts.{counter_field}", 0]}, 1]
+                },
+                "last_llm_used": llm_name,
+                "dateUpdated": datetime.utcnow(),
+                # Evaluates to "missing" when the field is absent, which leaves it absent
+                "generation_credits": {
+                    "$cond": [
+                        {
+                            "$and": [
+                                {"$ne": [{"$type": credits}, "missing"]},
+                                {"$ne": [{"$toLower": {"$ifNull": ["$subscriptionStatus", ""]}}, "active"]},
+                                {"$gt": [credits, 0]},
+                            ]
+                        },
+                        {"$subtract": [credits, 1]},
+                        credits,
+                    ]
+                },
+            }
+        }
+    ]
 
-        result = collection.update_one(
-            {"_id": user_id_obj, "generation_credits": {"$gt": 0}},
-            {"$inc": {"generation_credits": -1}, "$set": {"dateUpdated": datetime.utcnow()}},
+    try:
+        updated = collection.find_one_and_update(
+            {"_id": user_id_obj},
+            pipeline,
+            projection={"generation_credits": 1},
+            return_document=ReturnDocument.AFTER,
         )
-        if result.matched_count == 0:
-            logger.info(f"No generation credit decrement applied for user {user_id}.")
-            return True
-
-        logger.info(f"Decremented generation credits for user {user_id}: {current_credits} -> {current_credits - 1}")
-        return True
     except Exception as e:
-        logger.error(f"Error decrementing generation credits for user {user_id}: {e}")
-        return False
+        logger.error(f"Error recording generation usage for user {user_id}: {e}")
+        return None
+
+    if updated is None:
+        logger.warning(f"User {user_id} not found. Cannot record generation usage.")
+        return None
+    invalidate_principal(user_id)
+
+    remaining = updated.get("generation_credits")
+    logger.debug(f"Recorded {llm_name} generation for user {user_id} (credits left: {remaining})")
+    return int(remaining) if remaining is not None else None
 
 
 def set_linkedin_token(user_id: str, token_data: Dict) -> bool:
@@ -958,6 +990,7 @@ def set_linkedin_token(user_id: str, token_data: Dict) -> bool:
         {"_id": user_id_obj},
         {"$set": {"preferences": preferences, "dateUpdated": datetime.utcnow()}},
     )
+    invalidate_principal(user_id)
     return result.matched_count > 0
 
 
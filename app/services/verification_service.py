@@ -7,6 +7,7 @@ from typing import Optional, Dict, Any
 from bson import ObjectId
 from fastapi import HTTPException, status
 
+from app.core.principal_cache import invalidate_principal
 from app.db.mongodb import get_collection, is_connected
 from app.utils.sms_utils import (
     generate_verification_code,
@@ -89,6 +90,7 @@ def store_verification_code(
             {"_id": ObjectId(user_id)},
             {"$set": {"verification_code": verification_data}}
         )
+        invalidate_principal(user_id)
         
         logger.info(f"Stored verification code for user {user_id}, purpose: {purpose}")
         return True
@@ -191,6 +193,7 @@ def clear_verification_code(user_id: str) -> None:
             {"_id": ObjectId(user_id)},
             {"$unset": {"verification_code": ""}}
         )
+        invalidate_principal(user_id)
         logger.info(f"Cleared verification code for user {user_id}")
     except Exception as e:
         logger.error(f"Error clearing verification code: {e}")
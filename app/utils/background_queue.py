@@ -0,0 +1,229 @@
+"""
+Bounded in-process write-behind queue for side effects that must not delay a response.
+
+Jobs are plain callables run by a small pool of daemon worker threads
+(BACKGROUND_QUEUE_WORKERS). The queue is bounded (BACKGROUND_QUEUE_MAX_SIZE); what happens
+when it is full is the overflow policy (BACKGROUND_QUEUE_OVERFLOW, overridable per job):
+
+    drop         discard the new job (default; fine for debug logs)
+    drop_oldest  evict the oldest pending job to make room for the new one
+    inline       run the new job in the caller's thread (for writes that must not be lost)
+
+Failures are logged and counted, never raised to the caller. On shutdown the app lifespan
+drains the queue for up to BACKGROUND_QUEUE_DRAIN_TIMEOUT_SECONDS; jobs submitted after that
+run inline.
+"""
+from __future__ import annotations
+
+import collections
+import logging
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("drop", "drop_oldest", "inline")
+
+# (label, fn, args, kwargs, enqueued_at)
+_Job = Tuple[str, Callable[..., Any], tuple, dict, float]
+
+
+class BackgroundQueue:
+    def __init__(self, name: str, workers: int, max_size: int, overflow: str = "drop") -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}' (expected one of {OVERFLOW_POLICIES})")
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_size = max(1, max_size)
+        self.overflow = overflow
+        self._jobs: Deque[_Job] = collections.deque()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running = 0
+        self._closed = False
+        self._stats = {
+            "enqueued": 0,
+            "completed": 0,
+            "failed": 0,
+            "dropped": 0,
+            "evicted": 0,
+            "inline": 0,
+            "high_water": 0,
+        }
+        self._dequeued = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+        self._run_ms_total = 0.0
+
+    def _ensure_workers(self) -> None:
+        # Called with self._cond held
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._run, name=f"bgq-{self.name}-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._jobs and not self._closed:
+                    self._cond.wait()
+                if not self._jobs:
+                    return
+                label, fn, args, kwargs, enqueued_at = self._jobs.popleft()
+                self._running += 1
+                self._dequeued += 1
+                waited_ms = (time.monotonic() - enqueued_at) * 1000.0
+                self._wait_ms_total += waited_ms
+                self._wait_ms_max = max(self._wait_ms_max, waited_ms)
+            started = time.perf_counter()
+            failed = not self._execute(label, fn, args, kwargs)
+            with self._cond:
+                self._running -= 1
+                self._run_ms_total += (time.perf_counter() - started) * 1000.0
+                self._stats["failed" if failed else "completed"] += 1
+                self._cond.notify_all()
+
+    @staticmethod
+    def _execute(label: str, fn: Callable[..., Any], args: tuple, kwargs: dict) -> bool:
+        try:
+            fn(*args, **kwargs)
+            return True
+        except Exception as e:
+            logger.warning(f"Background job {label} failed: {e}")
+            return False
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        label: Optional[str] = None,
+        overflow: Optional[str] = None,
+        **kwargs: Any,
+    ) -> bool:
+        """
+        Queue fn(*args, **kwargs) for background execution.
+
+        Args:
+            fn: Callable to run; its exceptions are logged, not raised
+            label: Name used in logs (defaults to fn.__name__)
+            overflow: Policy override for this job when the queue is full
+
+        Returns:
+            False if the job was dropped
+        """
+        label = label or getattr(fn, "__name__", "job")
+        policy = overflow or self.overflow
+        with self._cond:
+            run_inline = self._closed
+            if not run_inline:
+                if len(self._jobs) >= self.max_size:
+                    if policy == "inline":
+                        run_inline = True
+                    elif policy == "drop_oldest":
+                        evicted = self._jobs.popleft()
+                        self._stats["evicted"] += 1
+                        logger.warning(f"Background queue {self.name} is full; evicted {evicted[0]}")
+                    else:
+                        self._stats["dropped"] += 1
+                        logger.warning(f"Background queue {self.name} is full; dropped {label}")
+                        return False
+                if not run_inline:
+                    self._ensure_workers()
+                    self._jobs.append((label, fn, args, kwargs, time.monotonic()))
+                    self._stats["enqueued"] += 1
+                    self._stats["high_water"] = max(self._stats["high_water"], len(self._jobs))
+                    self._cond.notify()
+                    return True
+            self._stats["inline"] += 1
+        ok = self._execute(label, fn, args, kwargs)
+        with self._cond:
+            self._stats["completed" if ok else "failed"] += 1
+        return True
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued job has finished; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._jobs or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting jobs (later submits run inline), drain, and stop the workers."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        drained = self.drain(timeout)
+        if not drained:
+            with self._cond:
+                pending = len(self._jobs)
+            logger.warning(f"Background queue {self.name} shutdown timed out with {pending} job(s) pending")
+        return drained
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            snapshot: Dict[str, Any] = dict(self._stats)
+            started = self._dequeued
+            snapshot.update(
+                pending=len(self._jobs),
+                running=self._running,
+                workers=self.workers,
+                max_size=self.max_size,
+                overflow=self.overflow,
+                closed=self._closed,
+                avg_wait_ms=round(self._wait_ms_total / started, 2) if started else 0.0,
+                max_wait_ms=round(self._wait_ms_max, 2),
+                avg_run_ms=round(self._run_ms_total / max(1, started - self._running), 2),
+            )
+        return snapshot
+
+
+_queue: Optional[BackgroundQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_background_queue() -> BackgroundQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = BackgroundQueue(
+                "default",
+                workers=settings.BACKGROUND_QUEUE_WORKERS,
+                max_size=settings.BACKGROUND_QUEUE_MAX_SIZE,
+                overflow=settings.BACKGROUND_QUEUE_OVERFLOW,
+            )
+        return _queue
+
+
+def submit_background(
+    fn: Callable[..., Any],
+    *args: Any,
+    label: Optional[str] = None,
+    overflow: Optional[str] = None,
+    **kwargs: Any,
+) -> bool:
+    """Queue a side effect on the shared background queue (see BackgroundQueue.submit)."""
+    return get_background_queue().submit(fn, *args, label=label, overflow=overflow, **kwargs)
+
+
+def get_background_queue_stats() -> Dict[str, Any]:
+    with _queue_lock:
+        queue = _queue
+    return queue.stats() if queue is not None else {"started": False}
+
+
+def shutdown_background_queue(timeout: Optional[float] = None) -> None:
+    """Drain pending side effects (called from the app lifespan before Redis/Mongo close)."""
+    with _queue_lock:
+        queue = _queue
+    if queue is not None:
+        queue.shutdown(settings.BACKGROUND_QUEUE_DRAIN_TIMEOUT_SECONDS if timeout is None else timeout)
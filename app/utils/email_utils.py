@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 
 from app.utils.sms_utils import generate_verification_code
 from app.core.config import settings
+from app.utils.local_cache import LocalCache
 
 logger = logging.getLogger(__name__)
 
@@ -41,9 +42,9 @@ if not EMAIL_AVAILABLE:
 else:
     logger.info("Zoho Mail API configuration check passed. Email sending is available.")
 
-# Cache for access token
-_access_token_cache: Optional[str] = None
-_token_expires_at: Optional[datetime] = None
+# Cache for access token (entry TTL = token lifetime minus a 5 minute buffer)
+_ZOHO_TOKEN_CACHE_KEY = "access_token"
+_zoho_token_cache = LocalCache("zoho_access_token", max_entries=1)
 
 
 def get_zoho_access_token() -> Optional[str]:
@@ -54,15 +55,11 @@ def get_zoho_access_token() -> Optional[str]:
     Returns:
         Access token string or None if failed
     """
-    global _access_token_cache, _token_expires_at
-
     # Return cached token if still valid (with 5 minute buffer)
-    if _access_token_cache and _token_expires_at:
-        if datetime.now() < (_token_expires_at - timedelta(minutes=5)):
-            logger.debug("Using cached Zoho access token")
-            return _access_token_cache
-        else:
-            logger.info("Cached Zoho access token expired, requesting new token")
+    cached_token = _zoho_token_cache.get(_ZOHO_TOKEN_CACHE_KEY)
+    if cached_token:
+        logger.debug("Using cached Zoho access token")
+        return cached_token
 
     # Check configuration
     logger.info("Checking Zoho Mail API configuration...")
@@ -114,8 +111,12 @@ def get_zoho_access_token() -> Optional[str]:
 
             if access_token:
                 # Cache the token
-                _access_token_cache = access_token
                 _token_expires_at = datetime.now() + timedelta(seconds=expires_in)
+                _zoho_token_cache.set(
+                    _ZOHO_TOKEN_CACHE_KEY,
+                    access_token,
+                    ttl=max(0, expires_in - timedelta(minutes=5).total_seconds()),
+                )
                 logger.info(
                     f"Successfully obtained Zoho access token (length: {len(access_token)}, expires at: {_token_expires_at})"
                 )
@@ -318,9 +319,7 @@ def send_email(to_email: str, subject: str, body: str) -> bool:
                 logger.warning(
                     "Access token may have expired (401), clearing cache and retrying..."
                 )
-                global _access_token_cache, _token_expires_at
-                _access_token_cache = None
-                _token_expires_at = None
+                _zoho_token_cache.delete(_ZOHO_TOKEN_CACHE_KEY)
                 # Retry once with new token
                 logger.info("Retrying with new access token...")
                 access_token = get_zoho_access_token()
@@ -1,11 +1,18 @@
 """
 Lightweight per-request timing tracker for letter generation.
 Set ENABLE_GENERATION_TIMING_CHART=false to disable all logs.
+
+finish() feeds the checkpoints into the per-stage histograms exported on /metrics (labeled by
+endpoint, LLM and cache status) and, when OTEL_TRACES_ENABLED is set, emits them as
+OpenTelemetry spans. With both the chart and METRICS_ENABLED off, checkpoint() is a no-op.
 """
 from __future__ import annotations
 
 import time
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils import metrics
 
 
 class GenerationTiming:
@@ -18,15 +25,58 @@ class GenerationTiming:
     ) -> None:
         self.enabled = enabled
         self.flow_name = flow_name
+        self._recording = enabled or settings.METRICS_ENABLED or settings.OTEL_TRACES_ENABLED
         self._events: List[Tuple[str, float]] = []
         self._start = time.perf_counter()
+        self._start_ns = time.time_ns()
         self._client_start_ms = client_start_ms
+        self._finished = False
+        # "cover_letter:/api/job-info" -> "/api/job-info"
+        self.labels: Dict[str, str] = {
+            "endpoint": flow_name.split(":", 1)[-1],
+            "llm": "unknown",
+            "cache": "miss",
+        }
 
     def checkpoint(self, label: str) -> None:
-        if not self.enabled:
+        if not self._recording:
             return
         self._events.append((label, time.perf_counter()))
 
+    def set_labels(self, **labels: str) -> None:
+        """Set metric labels known only inside the pipeline (llm, cache=hit|shared|miss)."""
+        self.labels.update(labels)
+
+    def finish(self) -> None:
+        """Record the stages in the metrics registry and as spans (once per request)."""
+        if self._finished or not self._recording or not self._events:
+            return
+        self._finished = True
+        labels = self.labels
+        prev_t = self._start
+        for label, t in self._events:
+            metrics.GENERATION_STAGE_SECONDS.observe(max(0.0, t - prev_t), stage=label, **labels)
+            prev_t = t
+        metrics.GENERATION_TOTAL_SECONDS.observe(max(0.0, prev_t - self._start), **labels)
+        metrics.GENERATIONS_TOTAL.inc(**labels)
+        tracer = metrics.get_tracer()
+        if tracer is not None:
+            self._emit_spans(tracer)
+
+    def _ns(self, t: float) -> int:
+        return self._start_ns + int((t - self._start) * 1e9)
+
+    def _emit_spans(self, tracer) -> None:
+        attributes = {f"generation.{k}": v for k, v in self.labels.items()}
+        root = tracer.start_span(self.flow_name, start_time=self._start_ns, attributes=attributes)
+        context = metrics.otel_trace.set_span_in_context(root)
+        prev_t = self._start
+        for label, t in self._events:
+            span = tracer.start_span(label, context=context, start_time=self._ns(prev_t))
+            span.end(end_time=self._ns(t))
+            prev_t = t
+        root.end(end_time=self._ns(prev_t))
+
     def _segments(self) -> List[Tuple[str, float]]:
         if not self.enabled or len(self._events) < 2:
             return []
@@ -0,0 +1,268 @@
+"""
+Shared cache of job URL analysis results, so a popular posting costs one LLM call.
+
+/api/job-url/analyze sends up to 100k characters of page HTML to the extraction model. Results
+are stored in a TieredCache (L1 + Redis) under the posting's canonical key: "linkedin:<job id>"
+or "indeed:<job key>" when the URL names one, otherwise the normalized URL
+(page_fetcher.normalize_job_url). Each entry also records a hash of the page's visible text, and
+a second index by that hash lets any URL or user-supplied HTML with the same content reuse it.
+
+Lifecycle of an entry (JOB_EXTRACTION_* settings):
+    - younger than FRESH_SECONDS: returned as is, no fetch and no LLM call
+    - up to STALE_SECONDS older: returned immediately while one background task re-fetches
+      the page (stale-while-revalidate); if the visible text is unchanged the entry is just
+      re-stamped, otherwise the extraction is re-run
+    - failures (page not fetched, nothing extracted) are cached for NEGATIVE_TTL_SECONDS so
+      a broken posting is not re-sent to the LLM on every retry
+
+HTML supplied by the client (e.g. after solving a CAPTCHA) is untrusted: its result is never
+stored under the posting key or the shared content index, where it would be served to every
+other user. It is kept under a hash of the exact HTML, so only an identical submission reuses
+it, and it may itself reuse a result extracted from a page this server fetched.
+
+Concurrent misses for the same key in this process share one extraction. Extractions run on
+the bounded LLM executor (llm_dispatch), not the default thread pool that Redis calls use.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.utils.llm_dispatch import run_in_llm_executor
+from app.utils.page_fetcher import job_posting_id, normalize_job_url
+from app.utils.tiered_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+# Bump when the extraction prompt or model changes so old results are not reused
+EXTRACTION_VERSION = "2"
+
+# Markup that never reaches the visible text (scripts, styles, comments)
+_INVISIBLE = re.compile(
+    r"<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL
+)
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+
+# fetch() -> (html, error); extract(html, error) -> analyze_job_url response dict
+FetchFn = Callable[[], Awaitable[Tuple[Optional[str], Optional[str]]]]
+ExtractFn = Callable[[Optional[str], Optional[str]], Dict[str, Any]]
+
+_result_cache = TieredCache(
+    "job_extractions",
+    ttl_seconds=settings.JOB_EXTRACTION_FRESH_SECONDS + settings.JOB_EXTRACTION_STALE_SECONDS,
+    l1_ttl_seconds=settings.JOB_EXTRACTION_FRESH_SECONDS,
+    redis_prefix="cache:job_extraction:",
+)
+
+_in_flight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+# Strong references to background refreshes (the loop only keeps weak ones)
+_refresh_tasks: Set["asyncio.Task[Any]"] = set()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "hits": 0,
+    "stale_hits": 0,
+    "negative_hits": 0,
+    "content_hits": 0,
+    "client_html_hits": 0,
+    "unchanged_refreshes": 0,
+    "extractions": 0,
+    "shared": 0,
+    "refresh_errors": 0,
+}
+
+
+def _bump(field: str) -> None:
+    with _stats_lock:
+        _stats[field] += 1
+
+
+def job_cache_key(url: str) -> str:
+    """Canonical key for a posting: site and job ID when known, else the normalized URL."""
+    posting = job_posting_id(url)
+    if posting is not None:
+        return f"v{EXTRACTION_VERSION}:{posting[0]}:{posting[1]}"
+    digest = hashlib.sha256(normalize_job_url(url).encode("utf-8")).hexdigest()[:32]
+    return f"v{EXTRACTION_VERSION}:url:{digest}"
+
+
+def content_hash(html: str) -> str:
+    """SHA-256 of the page's visible text (scripts, styles, comments, tags and spacing removed)."""
+    text = _SPACE.sub(" ", _TAG.sub(" ", _INVISIBLE.sub(" ", html))).strip()
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def _content_key(digest: str) -> str:
+    return f"v{EXTRACTION_VERSION}:html:{digest}"
+
+
+def _client_html_key(html: str) -> str:
+    digest = hashlib.sha256(html.encode("utf-8", errors="ignore")).hexdigest()
+    return f"v{EXTRACTION_VERSION}:client:{digest}"
+
+
+async def _get(key: str) -> Optional[Dict[str, Any]]:
+    entry = _result_cache.l1.get(key)
+    if entry is not None:
+        return dict(entry)
+    # Redis is synchronous; keep it off the event loop
+    return await asyncio.to_thread(_result_cache.get_json, key)
+
+
+async def _put(key: str, entry: Dict[str, Any], ttl_seconds: float) -> None:
+    await asyncio.to_thread(_result_cache.set_json, key, entry, ttl_seconds)
+
+
+def _response(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(entry["response"])
+
+
+async def _extract(
+    key: str,
+    fetch: FetchFn,
+    extract: ExtractFn,
+    previous: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Fetch the page, reuse a result for identical content, else extract."""
+    html, error = await fetch()
+    digest = content_hash(html) if html and not error else None
+
+    response: Optional[Dict[str, Any]] = None
+    if digest and previous and previous.get("ok") and previous.get("content_hash") == digest:
+        _bump("unchanged_refreshes")
+        response = _response(previous)
+    elif digest:
+        by_content = await _get(_content_key(digest))
+        if by_content and by_content.get("ok"):
+            _bump("content_hits")
+            response = _response(by_content)
+    if response is None:
+        _bump("extractions")
+        # extract() makes a blocking LLM call
+        response = await run_in_llm_executor(extract, html, error)
+
+    ok = bool(response.get("success"))
+    entry = {"response": response, "ok": ok, "content_hash": digest, "stored_at": time.time()}
+    if ok:
+        ttl = settings.JOB_EXTRACTION_FRESH_SECONDS + settings.JOB_EXTRACTION_STALE_SECONDS
+        await _put(key, entry, ttl)
+        if digest:
+            await _put(_content_key(digest), entry, ttl)
+    elif not (previous and previous.get("ok")):
+        # Never replace a good result with a failure
+        await _put(key, entry, settings.JOB_EXTRACTION_NEGATIVE_TTL_SECONDS)
+    return response
+
+
+async def _extract_client_html(extract: ExtractFn, html: str) -> Dict[str, Any]:
+    """Extract client-supplied HTML, caching the result only under the HTML's own hash."""
+    by_content = await _get(_content_key(content_hash(html)))
+    if by_content and by_content.get("ok"):
+        _bump("content_hits")
+        return _response(by_content)
+    key = _client_html_key(html)
+    entry = await _get(key)
+    if entry and entry.get("ok"):
+        _bump("client_html_hits")
+        return _response(entry)
+
+    _bump("extractions")
+    response = await run_in_llm_executor(extract, html, None)
+    if response.get("success"):
+        entry = {"response": response, "ok": True, "content_hash": None, "stored_at": time.time()}
+        await _put(key, entry, settings.JOB_EXTRACTION_FRESH_SECONDS)
+    return response
+
+
+def _shared(key: str, run: Callable[[], Awaitable[Dict[str, Any]]]) -> "asyncio.Future[Dict[str, Any]]":
+    future = _in_flight.get(key)
+    if future is not None:
+        _bump("shared")
+        return future
+    future = asyncio.ensure_future(run())
+    _in_flight[key] = future
+    future.add_done_callback(
+        lambda done: _in_flight.pop(key, None) if _in_flight.get(key) is done else None
+    )
+    return future
+
+
+def _schedule_refresh(
+    key: str, fetch: FetchFn, extract: ExtractFn, previous: Dict[str, Any]
+) -> None:
+    if key in _in_flight:
+        return
+    future = _shared(key, lambda: _extract(key, fetch, extract, previous))
+
+    def _done(done: "asyncio.Future[Dict[str, Any]]") -> None:
+        _refresh_tasks.discard(done)
+        if not done.cancelled() and done.exception() is not None:
+            _bump("refresh_errors")
+            logger.warning(f"Background job extraction refresh failed for {key}: {done.exception()}")
+
+    _refresh_tasks.add(future)
+    future.add_done_callback(_done)
+
+
+async def cached_job_extraction(
+    url: str,
+    fetch: FetchFn,
+    extract: ExtractFn,
+    html_content: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Analysis result for a job URL, from the cache when possible.
+
+    Args:
+        url: Job posting URL
+        fetch: Coroutine function returning (html, error) for the URL
+        extract: Blocking function turning (html, error) into the response dict (LLM call)
+        html_content: HTML supplied by the client; skips the URL lookup and the fetch. Its
+            result is never stored where other users' requests for the URL would read it
+
+    Returns:
+        analyze_job_url response dict
+    """
+    if not settings.JOB_EXTRACTION_CACHE_ENABLED:
+        if html_content:
+            return await run_in_llm_executor(extract, html_content, None)
+        html, error = await fetch()
+        return await run_in_llm_executor(extract, html, error)
+
+    if html_content:
+        return await _extract_client_html(extract, html_content)
+
+    key = job_cache_key(url)
+    entry = await _get(key)
+    if entry is not None:
+        age = time.time() - entry.get("stored_at", 0)
+        if not entry.get("ok"):
+            _bump("negative_hits")
+            logger.info(f"Job extraction negative cache hit: {key}")
+            return _response(entry)
+        if age < settings.JOB_EXTRACTION_FRESH_SECONDS:
+            _bump("hits")
+            logger.info(f"Job extraction cache hit: {key} (age {age:.0f}s)")
+            return _response(entry)
+        if settings.JOB_EXTRACTION_STALE_WHILE_REVALIDATE:
+            _bump("stale_hits")
+            logger.info(f"Job extraction stale hit: {key} (age {age:.0f}s), refreshing in background")
+            _schedule_refresh(key, fetch, extract, entry)
+            return _response(entry)
+
+    # Shielded so a caller that goes away does not cancel the extraction others are waiting on
+    return dict(await asyncio.shield(_shared(key, lambda: _extract(key, fetch, extract, entry))))
+
+
+def get_job_extraction_cache_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+    stats["in_flight"] = len(_in_flight)
+    return stats
@@ -0,0 +1,368 @@
+"""
+Distill a job posting page before it is sent to the extraction model.
+
+extract_with_chatgpt used to receive the first 100k characters of raw HTML: scripts, styles,
+tracking pixels and navigation included, which wastes tokens and on heavy pages cuts off the
+job description itself. distill_job_html() runs first and produces:
+
+- posting: fields of the page's JSON-LD JobPosting, if any (handles arrays and @graph, and
+  descriptions that are escaped HTML), with the description rendered to text
+- text: the page as compact text for the model; non-content nodes (script, style, svg,
+  iframe, forms, nav, footer, ...) are removed with lxml, headings and list items keep a light
+  markup, whitespace is collapsed and exact duplicate blocks are dropped
+
+Collapsed / "show more" content is kept on purpose: elements hidden by CSS, aria-hidden or
+aria-expanded="false" stay in the text, and long data-* attributes that carry the full text
+(data-full-text, data-content, ...) are added after their element.
+
+When the JSON-LD posting has a company, a title and a substantial description
+(JOB_LD_MIN_DESCRIPTION_CHARS), DistilledPage.skip_llm is True and the caller can use it without
+an LLM call (JOB_LD_SKIP_LLM). Character counts before and after distillation and the number of
+LLM calls skipped are exported on /metrics and in /api/health.
+"""
+from __future__ import annotations
+
+import html as html_lib
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+import lxml.html
+from lxml import etree
+
+from app.core.config import settings
+from app.utils.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+JOB_HTML_DISTILL_CHARS_TOTAL = register(
+    Counter(
+        "job_html_distill_chars_total",
+        "Characters of job page HTML before (raw) and after (distilled) distillation",
+        ("stage",),
+    )
+)
+JOB_EXTRACTION_LLM_SKIPPED_TOTAL = register(
+    Counter(
+        "job_extraction_llm_skipped_total",
+        "Job URL analyses answered from complete JSON-LD structured data without an LLM call",
+    )
+)
+
+# Never content: dropped with their subtree (the tail text after them is kept). <form> itself is
+# kept - ASP.NET WebForms sites wrap the whole page in one - and only its controls are dropped.
+_DROP_XPATH = etree.XPath(
+    "//script|//style|//noscript|//template|//svg|//math|//canvas|//iframe|//object|//embed"
+    "|//video|//audio|//picture|//img|//source|//link|//meta|//input|//select"
+    "|//textarea|//button|//nav|//footer|//comment()|//processing-instruction()"
+)
+_JSON_LD_XPATH = etree.XPath(
+    "//script[translate(@type, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+    "='application/ld+json']"
+)
+_BLOCK_TAGS = frozenset(
+    {
+        "address", "article", "aside", "blockquote", "dd", "details", "dialog", "div", "dl",
+        "dt", "fieldset", "figcaption", "figure", "header", "hr", "li", "main", "ol", "p",
+        "pre", "section", "summary", "table", "tbody", "td", "th", "thead", "tr", "ul",
+        "h1", "h2", "h3", "h4", "h5", "h6",
+    }
+)
+_HEADINGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
+# data-* attributes that hold the expanded text of a collapsed element
+_FULL_TEXT_ATTRS = ("data-full-text", "data-fulltext", "data-content", "data-description", "data-text")
+_FULL_TEXT_MIN_CHARS = 80
+
+_INLINE_SPACE = re.compile(r"[ \t\r\f\v\u00a0\u200b]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_ELLIPSES = ("...", "…")
+
+_stats_lock = threading.Lock()
+_stats = {"pages": 0, "raw_chars": 0, "distilled_chars": 0, "json_ld_postings": 0, "llm_skipped": 0}
+
+
+class DistilledPage:
+    """Result of distill_job_html()."""
+
+    __slots__ = ("text", "posting", "raw_chars")
+
+    def __init__(self, text: str, posting: Dict[str, Any], raw_chars: int) -> None:
+        self.text = text
+        # JSON-LD JobPosting fields: company, job_title, job_description (text), location,
+        # date_posted, employment_type; empty if the page has none
+        self.posting = posting
+        self.raw_chars = raw_chars
+
+    @property
+    def skip_llm(self) -> bool:
+        """True if the JSON-LD posting is complete enough to answer without the LLM."""
+        return bool(
+            settings.JOB_LD_SKIP_LLM
+            and self.posting.get("company")
+            and self.posting.get("job_title")
+            and len(self.posting.get("job_description") or "") >= settings.JOB_LD_MIN_DESCRIPTION_CHARS
+        )
+
+
+def _clean_line(line: str) -> str:
+    return _INLINE_SPACE.sub(" ", line).strip()
+
+
+def _mark_blocks(root: Any) -> None:
+    """Put line breaks around block elements and light markup on headings / list items."""
+    for el in root.iter():
+        tag = el.tag if isinstance(el.tag, str) else ""
+        if tag == "br":
+            el.tail = "\n" + (el.tail or "")
+            continue
+        if tag not in _BLOCK_TAGS:
+            continue
+        prefix = "\n"
+        if tag in _HEADINGS:
+            prefix = "\n\n## "
+        elif tag == "li":
+            prefix = "\n- "
+        elif tag in ("td", "th"):
+            prefix = " | "
+        el.text = prefix + (el.text or "")
+        if tag != "li":
+            el.tail = "\n" + (el.tail or "")
+
+
+def _add_full_text_attrs(root: Any) -> None:
+    for attr in _FULL_TEXT_ATTRS:
+        for el in root.iterfind(f".//*[@{attr}]"):
+            value = (el.get(attr) or "").strip()
+            if len(value) >= _FULL_TEXT_MIN_CHARS:
+                el.tail = f"\n{value}\n" + (el.tail or "")
+
+
+def _render(root: Any) -> str:
+    """Text of an element tree as compact lines, exact duplicate blocks removed."""
+    _mark_blocks(root)
+    lines: List[str] = []
+    seen = set()
+    blank = False
+    for line in root.text_content().split("\n"):
+        line = _clean_line(line)
+        if not line or line in ("-", "|", "##"):
+            blank = bool(lines)
+            continue
+        # Repeated blocks (mobile/desktop copies, visually-hidden duplicates); short lines
+        # such as "Remote" or list bullets may legitimately repeat
+        if len(line) > 40:
+            if line in seen:
+                continue
+            seen.add(line)
+        if blank:
+            lines.append("")
+            blank = False
+        lines.append(line)
+    # Truncated previews ("... first sentences of the description…") of text that is also
+    # present in full
+    previews = [line for line in lines if len(line) > 40 and line.endswith(_ELLIPSES)]
+    if previews:
+        drop = set()
+        for preview in previews:
+            stem = preview.rstrip(".… ")
+            if any(line != preview and line.startswith(stem) for line in lines):
+                drop.add(preview)
+        lines = [line for line in lines if line not in drop]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+# For re-parsing str input as bytes: the text is already decoded, ignore declared encodings
+_UTF8_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+
+def parse_html_document(html: str) -> Optional["lxml.html.HtmlElement"]:
+    """
+    Parse a page with lxml; None when it has no elements (empty, whitespace or comments only).
+
+    lxml refuses a str that starts with an XML encoding declaration; such pages are parsed
+    from their UTF-8 bytes instead.
+    """
+    try:
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            return lxml.html.document_fromstring(html.encode("utf-8"), parser=_UTF8_PARSER)
+    except etree.ParserError:
+        return None
+
+
+def html_fragment_to_text(fragment: str) -> str:
+    """Render an HTML fragment (e.g. a JSON-LD description) to text; plain text is cleaned only."""
+    if not fragment:
+        return ""
+    if "&lt;" in fragment and "<" not in fragment:
+        fragment = html_lib.unescape(fragment)
+    if "<" not in fragment:
+        return "\n".join(filter(None, (_clean_line(line) for line in html_lib.unescape(fragment).split("\n"))))
+    try:
+        root = lxml.html.fragment_fromstring(fragment, create_parent="div")
+    except (etree.ParserError, ValueError):
+        return _clean_line(re.sub(r"<[^>]+>", " ", fragment))
+    return _render(root)
+
+
+def _iter_ld_nodes(data: Any) -> Iterator[Dict[str, Any]]:
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_ld_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _iter_ld_nodes(data["@graph"])
+
+
+def _is_job_posting(node: Dict[str, Any]) -> bool:
+    kind = node.get("@type")
+    kinds = kind if isinstance(kind, list) else [kind]
+    return any(isinstance(k, str) and k.split("/")[-1] == "JobPosting" for k in kinds)
+
+
+def _name(value: Any) -> Optional[str]:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name")
+    return _clean_line(str(value)) if value else None
+
+
+def _location(value: Any) -> Optional[str]:
+    if isinstance(value, list):
+        parts = [p for p in (_location(v) for v in value) if p]
+        return "; ".join(parts) or None
+    if isinstance(value, dict):
+        address = value.get("address", value)
+        if isinstance(address, dict):
+            parts = [
+                address.get(k)
+                for k in ("addressLocality", "addressRegion", "addressCountry")
+                if isinstance(address.get(k), str) and address.get(k)
+            ]
+            return ", ".join(parts) or _name(value)
+        return _name(address)
+    return _clean_line(str(value)) if value else None
+
+
+def _load_json_ld(raw: str) -> Any:
+    raw = raw.strip()
+    # Some sites wrap the JSON in CDATA or HTML comments
+    raw = re.sub(r"^(?:<!\[CDATA\[|<!--)\s*|\s*(?:\]\]>|-->)$", "", raw)
+    return json.loads(raw, strict=False)
+
+
+def find_job_posting(root: Any) -> Dict[str, Any]:
+    """Fields of the first JSON-LD JobPosting in the document (empty dict if none)."""
+    for script in _JSON_LD_XPATH(root):
+        try:
+            data = _load_json_ld(script.text or "")
+        except ValueError:
+            continue
+        for node in _iter_ld_nodes(data):
+            if not _is_job_posting(node):
+                continue
+            posting = {
+                "company": _name(node.get("hiringOrganization")),
+                "job_title": _name(node.get("title")),
+                "job_description": html_fragment_to_text(str(node.get("description") or "")),
+                "location": _location(node.get("jobLocation")),
+                "date_posted": _name(node.get("datePosted")),
+                "employment_type": _name(node.get("employmentType")),
+            }
+            return {k: v for k, v in posting.items() if v}
+    return {}
+
+
+def _meta(root: Any, *names: str) -> Optional[str]:
+    for name in names:
+        values = root.xpath(f"//meta[@property='{name}' or @name='{name}']/@content")
+        if values and values[0].strip():
+            return _clean_line(values[0])
+    return None
+
+
+def distill_job_html(html: str, max_chars: Optional[int] = None) -> DistilledPage:
+    """
+    Distill a job posting page to JSON-LD fields plus compact text for the extraction model.
+
+    Args:
+        html: Raw page HTML
+        max_chars: Cap on the returned text (JOB_DISTILL_MAX_CHARS by default)
+
+    Returns:
+        DistilledPage (text is empty only for a page without content)
+    """
+    max_chars = max_chars or settings.JOB_DISTILL_MAX_CHARS
+    raw_chars = len(html or "")
+    if not html or not html.strip():
+        return DistilledPage("", {}, raw_chars)
+
+    root = parse_html_document(html)
+    if root is None:
+        return DistilledPage("", {}, raw_chars)
+    posting = find_job_posting(root)
+    header: List[str] = []
+    title = root.findtext(".//title")
+    if title and title.strip():
+        header.append(f"Page title: {_clean_line(title)}")
+    for label, names in (
+        ("Site", ("og:site_name",)),
+        ("Summary", ("og:description", "description")),
+    ):
+        value = _meta(root, *names)
+        if value:
+            header.append(f"{label}: {value}")
+
+    for el in _DROP_XPATH(root):
+        if el.getparent() is not None:
+            el.drop_tree()
+    _add_full_text_attrs(root)
+    head = root.find("head")
+    if head is not None:
+        head.drop_tree()
+    body_text = _render(root)
+
+    parts = []
+    if header:
+        parts.append("\n".join(header))
+    if posting:
+        structured = dict(posting)
+        description = structured.pop("job_description", "")
+        # The description is usually on the page too; include it only if it is not
+        if description and description[:200] not in body_text:
+            structured["job_description"] = description
+        parts.append("Structured data (JSON-LD JobPosting):\n" + json.dumps(structured, ensure_ascii=False))
+    parts.append(body_text)
+    text = "\n\n".join(p for p in parts if p)[:max_chars]
+
+    with _stats_lock:
+        _stats["pages"] += 1
+        _stats["raw_chars"] += raw_chars
+        _stats["distilled_chars"] += len(text)
+        _stats["json_ld_postings"] += int(bool(posting))
+    JOB_HTML_DISTILL_CHARS_TOTAL.inc(raw_chars, stage="raw")
+    JOB_HTML_DISTILL_CHARS_TOTAL.inc(len(text), stage="distilled")
+    return DistilledPage(text, posting, raw_chars)
+
+
+def record_llm_skipped() -> None:
+    """Count an analysis answered from JSON-LD without an LLM call."""
+    with _stats_lock:
+        _stats["llm_skipped"] += 1
+    JOB_EXTRACTION_LLM_SKIPPED_TOTAL.inc()
+
+
+def get_job_html_distiller_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+    stats["reduction_ratio"] = (
+        round(1 - stats["distilled_chars"] / stats["raw_chars"], 4) if stats["raw_chars"] else 0.0
+    )
+    # ~4 characters per token for English text and markup
+    stats["estimated_tokens_saved"] = max(0, stats["raw_chars"] - stats["distilled_chars"]) // 4
+    return stats
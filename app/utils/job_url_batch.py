@@ -0,0 +1,188 @@
+"""
+Bounded parallel analysis of many job URLs for /api/job-url/analyze/batch.
+
+The mobile app used to call /api/job-url/analyze once per pasted posting, one after another.
+analyze_job_urls() runs the analyses concurrently and yields each result as soon as it is
+ready, in completion order:
+
+- at most JOB_URL_BATCH_CONCURRENCY analyses run at once in this process, across all batches
+  (each one is a page fetch plus, usually, a blocking LLM call in a worker thread)
+- at most JOB_URL_BATCH_PER_HOST_LIMIT of one batch's URLs hit the same job board at once;
+  a URL waiting for its host does not hold a global slot
+- after the batch timeout every unfinished URL is reported as timed out and its analysis is
+  cancelled. Work already inside the shared fetch / extraction caches keeps running there
+  (those waits are shielded), so retrying a timed-out URL later is usually a cache hit.
+
+Each analysis goes through analyze_job_url, so the page cache (page_fetcher) and the result
+cache (job_extraction_cache) are shared with single-URL requests.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+from app.utils.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+JOB_URL_BATCH_RESULTS_TOTAL = register(
+    Counter(
+        "job_url_batch_results_total",
+        "Batch job URL analyses by outcome (ok: extracted, failed: analyzed without usable "
+        "data, error: raised, timeout: unfinished at the batch deadline)",
+        ("status",),
+    )
+)
+
+# analyze(url) -> analyze_job_url response dict
+AnalyzeFn = Callable[[str], Awaitable[Dict[str, Any]]]
+
+# The global limit belongs to the event loop it was created on
+_global_limit: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+_running = 0
+
+_stats_lock = threading.Lock()
+_stats = {"batches": 0, "urls": 0, "ok": 0, "failed": 0, "error": 0, "timeout": 0}
+
+
+def _record(status: str) -> None:
+    JOB_URL_BATCH_RESULTS_TOTAL.inc(status=status)
+    with _stats_lock:
+        _stats[status] += 1
+
+
+def _get_global_limit() -> asyncio.Semaphore:
+    global _global_limit
+    loop = asyncio.get_running_loop()
+    if _global_limit is None or _global_limit[0] is not loop:
+        _global_limit = (loop, asyncio.Semaphore(max(1, settings.JOB_URL_BATCH_CONCURRENCY)))
+    return _global_limit[1]
+
+
+def _host_key(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+async def _analyze_one(
+    index: int,
+    url: str,
+    analyze: AnalyzeFn,
+    host_limit: asyncio.Semaphore,
+    global_limit: asyncio.Semaphore,
+) -> Dict[str, Any]:
+    global _running
+    async with host_limit:
+        async with global_limit:
+            _running += 1
+            started = time.perf_counter()
+            try:
+                result = await analyze(url)
+                status = "ok" if result.get("success") else "failed"
+                item: Dict[str, Any] = {"status": status, "result": result}
+            except ValueError as e:
+                # Invalid URL, same as a 400 from /api/job-url/analyze
+                item = {"status": "error", "error": str(e)}
+            except Exception as e:
+                logger.error(f"Batch analysis failed for {url}: {e}", exc_info=True)
+                item = {"status": "error", "error": f"Failed to fetch or analyze job URL: {e}"}
+            finally:
+                _running -= 1
+    _record(item["status"])
+    return {
+        "type": "result",
+        "index": index,
+        "url": url,
+        **item,
+        "elapsed_ms": round((time.perf_counter() - started) * 1e3),
+    }
+
+
+async def analyze_job_urls(
+    urls: List[str], analyze: AnalyzeFn, timeout_seconds: Optional[float] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Analyze job URLs concurrently, yielding one item per URL as it completes, then a summary.
+
+    Args:
+        urls: Job posting URLs; each item's "index" is the URL's position in this list
+        analyze: Coroutine function analyzing one URL (raises ValueError for invalid URLs)
+        timeout_seconds: Batch deadline, capped at JOB_URL_BATCH_TIMEOUT_SECONDS
+
+    Yields:
+        {"type": "result", "index", "url", "status": "ok"|"failed"|"error"|"timeout",
+        "result" (ok/failed) or "error", "elapsed_ms"} per URL, then
+        {"type": "summary", "total", "ok", "failed", "error", "timeout", "elapsed_ms"}
+    """
+    limit = settings.JOB_URL_BATCH_TIMEOUT_SECONDS
+    timeout = min(timeout_seconds, limit) if timeout_seconds else limit
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + timeout
+    with _stats_lock:
+        _stats["batches"] += 1
+        _stats["urls"] += len(urls)
+
+    global_limit = _get_global_limit()
+    host_limits: Dict[str, asyncio.Semaphore] = {}
+    tasks: Dict["asyncio.Task[Dict[str, Any]]", Tuple[int, str]] = {}
+    for index, url in enumerate(urls):
+        host = _host_key(url)
+        if host not in host_limits:
+            host_limits[host] = asyncio.Semaphore(max(1, settings.JOB_URL_BATCH_PER_HOST_LIMIT))
+        task = asyncio.ensure_future(_analyze_one(index, url, analyze, host_limits[host], global_limit))
+        tasks[task] = (index, url)
+
+    counts = {"ok": 0, "failed": 0, "error": 0, "timeout": 0}
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in sorted(done, key=lambda t: tasks[t][0]):
+                item = task.result()
+                counts[item["status"]] += 1
+                yield item
+
+        if pending:
+            logger.warning(f"Job URL batch timed out after {timeout:g}s with {len(pending)} URLs unfinished")
+        for task in sorted(pending, key=lambda t: tasks[t][0]):
+            task.cancel()
+            index, url = tasks[task]
+            _record("timeout")
+            counts["timeout"] += 1
+            yield {
+                "type": "result",
+                "index": index,
+                "url": url,
+                "status": "timeout",
+                "error": f"Analysis did not finish within {timeout:g} seconds",
+                "elapsed_ms": round((loop.time() - started) * 1e3),
+            }
+        yield {
+            "type": "summary",
+            "total": len(urls),
+            **counts,
+            "elapsed_ms": round((loop.time() - started) * 1e3),
+        }
+    finally:
+        # Client disconnected or deadline passed: stop waiting on whatever is left
+        for task in pending:
+            task.cancel()
+
+
+def get_job_url_batch_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+    stats["running"] = _running
+    stats["concurrency"] = settings.JOB_URL_BATCH_CONCURRENCY
+    return stats
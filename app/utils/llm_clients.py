@@ -0,0 +1,338 @@
+"""
+Long-lived LLM provider clients with keep-alive connection pools.
+
+Building OpenAI(...) / anthropic.Anthropic(...) per generation throws away the HTTP connection
+pool, so every request paid a fresh TCP + TLS handshake. This registry creates one client per
+provider (on startup from the app lifespan, or lazily on first use), shares a tuned
+httpx.Client between the SDK and raw-HTTP providers, and closes everything on shutdown.
+
+Connection reuse is tracked per provider with httpx trace hooks: every request is counted and
+every new TCP connection is counted, so reused = requests - new connections.
+
+Pool sizing: LLM_HTTP_MAX_CONNECTIONS, LLM_HTTP_MAX_KEEPALIVE, LLM_HTTP_KEEPALIVE_EXPIRY.
+"""
+from __future__ import annotations
+
+import datetime
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.utils.local_cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+try:
+    from openai import OpenAI
+
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OpenAI = None
+    OPENAI_AVAILABLE = False
+
+try:
+    import anthropic
+
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    anthropic = None
+    ANTHROPIC_AVAILABLE = False
+
+try:
+    import google.generativeai as genai
+
+    GOOGLE_AVAILABLE = True
+except ImportError:
+    genai = None
+    GOOGLE_AVAILABLE = False
+
+PROVIDERS = ("openai", "anthropic", "xai", "gemini")
+
+_lock = threading.RLock()
+# provider -> (api_key, client); the key is kept so a rotated key rebuilds the client
+_clients: Dict[str, tuple] = {}
+_http_clients: Dict[str, Any] = {}
+_gemini_key: Optional[str] = None
+# sha256(model, system instruction, prefix) -> GenerativeModel bound to a CachedContent, or
+# False when creating the cache failed (e.g. prefix below the provider's minimum token count)
+_gemini_context_models = LocalCache("gemini_context_models", max_entries=512)
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {
+    p: {"requests": 0, "new_connections": 0, "tls_handshakes": 0, "clients_created": 0}
+    for p in PROVIDERS
+}
+
+
+def _bump(provider: str, field: str) -> None:
+    with _stats_lock:
+        _stats[provider][field] += 1
+
+
+def _make_trace(provider: str):
+    def _trace(event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            _bump(provider, "new_connections")
+        elif event_name == "connection.start_tls.complete":
+            _bump(provider, "tls_handshakes")
+
+    return _trace
+
+
+def _build_http_client(provider: str, base_url: Optional[str] = None):
+    """Create a pooled httpx.Client whose requests report connection events for provider."""
+    trace = _make_trace(provider)
+
+    def _on_request(request) -> None:
+        _bump(provider, "requests")
+        request.extensions["trace"] = trace
+
+    kwargs: Dict[str, Any] = {
+        "limits": httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(settings.LLM_HTTP_TIMEOUT_SECONDS, connect=10.0),
+        "event_hooks": {"request": [_on_request]},
+    }
+    if base_url:
+        kwargs["base_url"] = base_url
+    return httpx.Client(**kwargs)
+
+
+def _get_http_client(provider: str, base_url: Optional[str] = None):
+    with _lock:
+        client = _http_clients.get(provider)
+        if client is None or client.is_closed:
+            client = _build_http_client(provider, base_url)
+            _http_clients[provider] = client
+        return client
+
+
+def _cached(provider: str, api_key: str) -> Optional[Any]:
+    entry = _clients.get(provider)
+    if entry is not None and entry[0] == api_key:
+        return entry[1]
+    return None
+
+
+def get_openai_client(api_key: Optional[str] = None):
+    """
+    Get the shared OpenAI client.
+
+    Args:
+        api_key: Override for settings.OPENAI_API_KEY
+
+    Returns:
+        OpenAI client, or None if the SDK or key is missing
+    """
+    api_key = api_key or settings.OPENAI_API_KEY
+    if not OPENAI_AVAILABLE or not HTTPX_AVAILABLE or not api_key:
+        return None
+    with _lock:
+        client = _cached("openai", api_key)
+        if client is None:
+            kwargs: Dict[str, Any] = {
+                "api_key": api_key,
+                "http_client": _get_http_client("openai"),
+                "max_retries": settings.LLM_CLIENT_MAX_RETRIES,
+            }
+            if settings.OPENAI_BASE_URL:
+                kwargs["base_url"] = settings.OPENAI_BASE_URL
+            client = OpenAI(**kwargs)
+            _clients["openai"] = (api_key, client)
+            _bump("openai", "clients_created")
+        return client
+
+
+def get_anthropic_client(api_key: Optional[str] = None):
+    """
+    Get the shared Anthropic client.
+
+    Args:
+        api_key: Override for settings.ANTHROPIC_API_KEY
+
+    Returns:
+        anthropic.Anthropic client, or None if the SDK or key is missing
+    """
+    api_key = api_key or settings.ANTHROPIC_API_KEY
+    if not ANTHROPIC_AVAILABLE or not HTTPX_AVAILABLE or not api_key:
+        return None
+    with _lock:
+        client = _cached("anthropic", api_key)
+        if client is None:
+            kwargs: Dict[str, Any] = {
+                "api_key": api_key,
+                "http_client": _get_http_client("anthropic"),
+                "max_retries": settings.LLM_CLIENT_MAX_RETRIES,
+            }
+            if settings.ANTHROPIC_BASE_URL:
+                kwargs["base_url"] = settings.ANTHROPIC_BASE_URL
+            client = anthropic.Anthropic(**kwargs)
+            _clients["anthropic"] = (api_key, client)
+            _bump("anthropic", "clients_created")
+        return client
+
+
+def get_xai_http_client():
+    """
+    Get the pooled HTTP client for the xAI chat completions API.
+
+    Callers pass the Authorization header per request (the key is resolved at call time).
+
+    Returns:
+        httpx.Client with base_url set to settings.XAI_API_BASE_URL, or None without httpx
+    """
+    if not HTTPX_AVAILABLE:
+        return None
+    base_url = settings.XAI_API_BASE_URL.rstrip("/") + "/"
+    with _lock:
+        client = _http_clients.get("xai")
+        if client is not None and not client.is_closed and str(client.base_url) != base_url:
+            client.close()
+            client = None
+        if client is None or client.is_closed:
+            client = _build_http_client("xai", base_url)
+            _http_clients["xai"] = client
+            _bump("xai", "clients_created")
+        return client
+
+
+def get_gemini_model(model_name: str, api_key: Optional[str] = None):
+    """
+    Get a Gemini GenerativeModel, configuring the SDK once per key.
+
+    genai.configure() rebuilds the SDK's transport, so it is only called when the key changes.
+    Every caller should use the default key (GEMINI_API_KEY, else GOOGLE_API_KEY): alternating
+    keys would re-configure the SDK under in-flight calls and drop the context-model cache.
+
+    Returns:
+        genai.GenerativeModel, or None if the SDK or key is missing
+    """
+    global _gemini_key
+
+    api_key = api_key or settings.GEMINI_API_KEY or settings.GOOGLE_API_KEY
+    if not GOOGLE_AVAILABLE or not api_key:
+        return None
+    with _lock:
+        if _gemini_key != api_key:
+            genai.configure(api_key=api_key)
+            _gemini_key = api_key
+            _clients["gemini"] = (api_key, {})
+            _gemini_context_models.clear()
+            _bump("gemini", "clients_created")
+        models = _clients["gemini"][1]
+        model = models.get(model_name)
+        if model is None:
+            model = genai.GenerativeModel(model_name)
+            models[model_name] = model
+        return model
+
+
+def get_gemini_cached_model(model_name: str, system_instruction: str, prefix: str):
+    """
+    Get a Gemini model bound to an explicit context cache holding system_instruction + prefix.
+
+    The CachedContent is created on first use and reused until shortly before its TTL
+    (GEMINI_CONTEXT_CACHE_TTL_SECONDS) runs out; a failed create is remembered for the same
+    period so requests fall back to the plain model without retrying every time.
+
+    Returns:
+        genai.GenerativeModel, or None if the SDK/key is missing or the cache could not be created
+    """
+    if get_gemini_model(model_name) is None:
+        return None
+    ttl = max(120, settings.GEMINI_CONTEXT_CACHE_TTL_SECONDS)
+    key = hashlib.sha256(
+        "\0".join((model_name, system_instruction, prefix)).encode("utf-8")
+    ).hexdigest()
+    model = _gemini_context_models.get(key)
+    if model is not None:
+        return model or None
+    try:
+        cached_content = genai.caching.CachedContent.create(
+            model=f"models/{model_name}",
+            system_instruction=system_instruction,
+            contents=[prefix],
+            ttl=datetime.timedelta(seconds=ttl),
+        )
+        model = genai.GenerativeModel.from_cached_content(cached_content)
+    except Exception as e:
+        logger.info(f"Gemini context cache not created, using the uncached model: {e}")
+        model = False
+    # Drop the local entry a minute before the provider expires the cache
+    _gemini_context_models.set(key, model, ttl=ttl - 60)
+    return model or None
+
+
+def _warm_connections() -> None:
+    """Open one pooled connection per configured provider so the first generation skips TLS setup."""
+    targets = []
+    if get_openai_client() is not None:
+        targets.append(("openai", settings.OPENAI_BASE_URL or "https://api.openai.com/v1"))
+    if get_anthropic_client() is not None:
+        targets.append(("anthropic", settings.ANTHROPIC_BASE_URL or "https://api.anthropic.com"))
+    if settings.XAI_API_KEY and get_xai_http_client() is not None:
+        targets.append(("xai", settings.XAI_API_BASE_URL))
+    for provider, url in targets:
+        try:
+            # Any response (even 401/404) leaves a keep-alive connection in the pool
+            _get_http_client(provider).head(url, timeout=5.0)
+        except Exception as e:
+            logger.debug(f"LLM connection warm-up for {provider} failed: {e}")
+
+
+def init_llm_clients() -> None:
+    """Create provider clients at startup and optionally warm their connection pools."""
+    if not HTTPX_AVAILABLE:
+        logger.warning("httpx not available - LLM provider clients will not be pooled")
+        return
+    get_openai_client()
+    get_anthropic_client()
+    get_xai_http_client()
+    get_gemini_model("gemini-2.5-flash")
+    if settings.LLM_WARM_CONNECTIONS:
+        threading.Thread(target=_warm_connections, name="llm-warmup", daemon=True).start()
+    logger.info("LLM provider clients initialized")
+
+
+def close_llm_clients() -> None:
+    """Close pooled connections (called from the app lifespan on shutdown)."""
+    global _gemini_key
+
+    with _lock:
+        for provider, client in list(_http_clients.items()):
+            try:
+                client.close()
+            except Exception as e:
+                logger.error(f"Error closing {provider} HTTP client: {e}")
+        _http_clients.clear()
+        _clients.clear()
+        _gemini_key = None
+    _gemini_context_models.clear()
+
+
+def get_llm_client_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-provider request and connection counters, with the connection reuse ratio."""
+    with _stats_lock:
+        snapshot = {p: dict(v) for p, v in _stats.items()}
+    for provider, s in snapshot.items():
+        s["active"] = provider in _http_clients or provider in _clients
+        if provider == "gemini":
+            # gRPC channel is managed by the SDK; only configuration is tracked
+            continue
+        reused = max(0, s["requests"] - s["new_connections"])
+        s["reused_connections"] = reused
+        s["reuse_ratio"] = round(reused / s["requests"], 4) if s["requests"] else 0.0
+    return snapshot
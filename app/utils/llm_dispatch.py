@@ -0,0 +1,124 @@
+"""
+Bounded executor for blocking cover-letter generation work.
+
+get_job_info() is synchronous end to end (Mongo lookups, S3 download, PDF parsing and the
+provider SDK calls), so async routes must not call it directly: a 20-60 s completion would
+stall every other request on the uvicorn worker. Routes await run_in_llm_executor() instead,
+which runs the call on a dedicated, size-limited thread pool and keeps the event loop free.
+
+Set LLM_DISPATCH_MAX_WORKERS to control how many generations one worker keeps in flight.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Dispatch counters (guarded by _stats_lock)
+_stats_lock = threading.Lock()
+_in_flight = 0
+_peak_in_flight = 0
+_completed = 0
+_failed = 0
+_total_seconds = 0.0
+
+
+def get_llm_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared generation executor (created on first use).
+
+    Returns:
+        ThreadPoolExecutor sized by settings.LLM_DISPATCH_MAX_WORKERS
+    """
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = max(1, settings.LLM_DISPATCH_MAX_WORKERS)
+                _executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix="llm-dispatch",
+                )
+                logger.info(f"LLM dispatch executor started with {max_workers} workers")
+    return _executor
+
+
+def _track_start() -> None:
+    global _in_flight, _peak_in_flight
+    with _stats_lock:
+        _in_flight += 1
+        _peak_in_flight = max(_peak_in_flight, _in_flight)
+
+
+def _track_done(elapsed: float, ok: bool) -> None:
+    global _in_flight, _completed, _failed, _total_seconds
+    with _stats_lock:
+        _in_flight -= 1
+        _total_seconds += elapsed
+        if ok:
+            _completed += 1
+        else:
+            _failed += 1
+
+
+async def run_in_llm_executor(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking callable on the generation executor and await its result.
+
+    The caller's context variables are copied into the worker thread so request-scoped
+    state (logging context, etc.) survives the hop.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    ctx = contextvars.copy_context()
+    started = time.perf_counter()
+    ok = False
+    _track_start()
+    try:
+        result = await loop.run_in_executor(get_llm_executor(), ctx.run, call)
+        ok = True
+        return result
+    finally:
+        _track_done(time.perf_counter() - started, ok)
+
+
+def get_llm_dispatch_stats() -> Dict[str, Any]:
+    """Snapshot of executor sizing and dispatch counters."""
+    with _stats_lock:
+        finished = _completed + _failed
+        return {
+            "max_workers": max(1, settings.LLM_DISPATCH_MAX_WORKERS),
+            "in_flight": _in_flight,
+            "queued": max(0, _in_flight - max(1, settings.LLM_DISPATCH_MAX_WORKERS)),
+            "peak_in_flight": _peak_in_flight,
+            "completed": _completed,
+            "failed": _failed,
+            "avg_seconds": round(_total_seconds / finished, 4) if finished else 0.0,
+        }
+
+
+def shutdown_llm_executor(wait: bool = True) -> None:
+    """Stop the generation executor (called from the app lifespan on shutdown)."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            try:
+                _executor.shutdown(wait=wait)
+            except Exception as e:
+                logger.error(f"Error shutting down LLM dispatch executor: {e}")
+            finally:
+                _executor = None
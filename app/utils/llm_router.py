@@ -0,0 +1,321 @@
+"""
+Latency-aware LLM routing with hedged requests (opt-in: LLM_HEDGING_ENABLED).
+
+A generation normally waits on the one model the user picked, however slow that provider is
+at the moment. With hedging on, the router keeps a rolling window of time-to-first-token and
+errors per model and, when the primary has not started answering within its hedge delay,
+sends the same prompt to the fallback model configured for it in llms-config.json
+("fallbackModel"). Whichever attempt produces its first token first wins: its tokens are
+forwarded and its completion returned; the other attempt is cancelled at its next chunk,
+which closes the provider stream.
+
+Hedge delay per model (LLM_HEDGE_* settings):
+    - p95 time-to-first-token over the window, clamped to [MIN_DELAY, MAX_DELAY], once the
+      model has MIN_SAMPLES successful calls (DEFAULT_DELAY before that)
+    - 0 (hedge immediately) while the model's error rate is at or above ERROR_RATE
+If the primary fails before the delay, the fallback is started at once (failover). The
+fallback chosen is the first configured one that is not itself failing.
+
+Wins and hedges are counted on /metrics (llm_routed_requests_total) and in /api/health.
+"""
+from __future__ import annotations
+
+import collections
+import contextvars
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.llm_utils import llm_metric_label, normalize_llm_name
+from app.utils.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+LLM_ROUTED_REQUESTS_TOTAL = register(
+    Counter(
+        "llm_routed_requests_total",
+        "Generations sent through the hedging router, by selected model, serving model and "
+        "whether a hedge request was sent",
+        ("primary", "winner", "hedged"),
+    )
+)
+
+# attempt(llm, on_token) -> completion text; on_token is called for every chunk
+AttemptFn = Callable[[str, Callable[[str], None]], str]
+
+
+class HedgeCancelled(Exception):
+    """Raised inside the losing attempt's token callback to abandon its stream."""
+
+
+class _ModelWindow:
+    """Rolling (timestamp, ttft_seconds or None on error) samples for one model."""
+
+    __slots__ = ("samples",)
+
+    def __init__(self) -> None:
+        self.samples: Deque[Tuple[float, Optional[float]]] = collections.deque(
+            maxlen=max(1, settings.LLM_ROUTER_WINDOW_SIZE)
+        )
+
+    def prune(self, now: float) -> None:
+        horizon = now - settings.LLM_ROUTER_WINDOW_SECONDS
+        while self.samples and self.samples[0][0] < horizon:
+            self.samples.popleft()
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(s for _, s in self.samples if s is not None)
+        total = len(self.samples)
+        errors = total - len(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None
+        p50 = latencies[len(latencies) // 2] if latencies else None
+        return {
+            "samples": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "p50_ttft_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_ttft_seconds": round(p95, 3) if p95 is not None else None,
+        }
+
+
+class _Race:
+    """Shared state of the attempts for one generation."""
+
+    def __init__(self, on_token: Optional[Callable[[str], None]]) -> None:
+        self.on_token = on_token
+        self.cond = threading.Condition()
+        self.winner: Optional[int] = None
+        # attempt index -> (text, None) or (None, exception)
+        self.outcomes: Dict[int, Tuple[Optional[str], Optional[BaseException]]] = {}
+
+
+class LLMRouter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._windows: Dict[str, _ModelWindow] = {}
+        self._fallbacks: Optional[Dict[str, List[str]]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {"requests": 0, "hedged": 0, "failovers": 0, "fallback_wins": 0, "cancelled": 0}
+
+    # --- rolling latency / error windows ----------------------------------------------------
+
+    def record(self, llm: str, ttft_seconds: Optional[float]) -> None:
+        """Record a successful call's time to first token, or an error (None)."""
+        key = llm_metric_label(llm)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = _ModelWindow()
+            window.prune(now)
+            window.samples.append((now, ttft_seconds))
+
+    def _snapshot(self, llm: str) -> Dict[str, Any]:
+        with self._lock:
+            window = self._windows.get(llm_metric_label(llm))
+            if window is None:
+                return _ModelWindow().snapshot()
+            window.prune(time.monotonic())
+            return window.snapshot()
+
+    def _is_failing(self, snapshot: Dict[str, Any]) -> bool:
+        return (
+            snapshot["samples"] >= settings.LLM_HEDGE_MIN_SAMPLES
+            and snapshot["error_rate"] >= settings.LLM_HEDGE_ERROR_RATE
+        )
+
+    def hedge_delay(self, llm: str) -> float:
+        """Seconds to wait for the primary's first token before sending the hedge request."""
+        snapshot = self._snapshot(llm)
+        if self._is_failing(snapshot):
+            return 0.0
+        successes = snapshot["samples"] - snapshot["errors"]
+        if successes < settings.LLM_HEDGE_MIN_SAMPLES or snapshot["p95_ttft_seconds"] is None:
+            return settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+        return min(
+            settings.LLM_HEDGE_MAX_DELAY_SECONDS,
+            max(settings.LLM_HEDGE_MIN_DELAY_SECONDS, snapshot["p95_ttft_seconds"]),
+        )
+
+    # --- fallback configuration -------------------------------------------------------------
+
+    def _load_fallbacks(self) -> Dict[str, List[str]]:
+        fallbacks: Dict[str, List[str]] = {}
+        try:
+            with open(settings.LLM_CONFIG_PATH, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            for entry in config.get("llms", []):
+                value = entry.get("value")
+                fallback = entry.get("fallbackModel")
+                if not value or not fallback:
+                    continue
+                fallbacks[value] = [fallback] if isinstance(fallback, str) else list(fallback)
+        except Exception as e:
+            logger.error(f"Could not load LLM fallbacks from {settings.LLM_CONFIG_PATH}: {e}")
+        return fallbacks
+
+    def fallback_for(self, llm: str) -> Optional[str]:
+        """First configured fallback for llm that is not currently failing (None if none is set)."""
+        with self._lock:
+            if self._fallbacks is None:
+                self._fallbacks = self._load_fallbacks()
+            fallbacks = self._fallbacks
+        candidates = fallbacks.get(llm) or fallbacks.get(normalize_llm_name(llm)) or []
+        candidates = [c for c in candidates if normalize_llm_name(c) != normalize_llm_name(llm)]
+        for candidate in candidates:
+            if not self._is_failing(self._snapshot(candidate)):
+                return candidate
+        return candidates[0] if candidates else None
+
+    # --- hedged call ------------------------------------------------------------------------
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Up to two attempts per in-flight generation
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(2, 2 * settings.LLM_DISPATCH_MAX_WORKERS),
+                    thread_name_prefix="llm-hedge",
+                )
+            return self._executor
+
+    def _start(self, race: _Race, index: int, llm: str, attempt: AttemptFn) -> None:
+        ctx = contextvars.copy_context()
+        self._get_executor().submit(ctx.run, self._run_attempt, race, index, llm, attempt)
+
+    def _run_attempt(self, race: _Race, index: int, llm: str, attempt: AttemptFn) -> None:
+        started = time.monotonic()
+        first_token_at: List[float] = []
+
+        def on_token(chunk: str) -> None:
+            with race.cond:
+                if race.winner is None:
+                    race.winner = index
+                    race.cond.notify_all()
+                elif race.winner != index:
+                    raise HedgeCancelled()
+            if not first_token_at:
+                first_token_at.append(time.monotonic())
+            if race.on_token:
+                race.on_token(chunk)
+
+        text: Optional[str] = None
+        error: Optional[BaseException] = None
+        try:
+            text = attempt(llm, on_token)
+        except HedgeCancelled:
+            error = HedgeCancelled()
+            with self._lock:
+                self._stats["cancelled"] += 1
+            logger.info(f"Hedged LLM attempt on {llm} cancelled (lost the race)")
+        except BaseException as e:
+            error = e
+            self.record(llm, None)
+            logger.warning(f"LLM attempt on {llm} failed after {time.monotonic() - started:.2f}s: {e}")
+        else:
+            if first_token_at:
+                self.record(llm, first_token_at[0] - started)
+            with race.cond:
+                # A provider that never called on_token still wins by finishing first
+                if race.winner is None:
+                    race.winner = index
+        with race.cond:
+            race.outcomes[index] = (text, error)
+            race.cond.notify_all()
+
+    def call(
+        self,
+        llm: str,
+        attempt: AttemptFn,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> Tuple[str, str]:
+        """
+        Run attempt(llm, ...) with a hedge to the fallback model.
+
+        Returns:
+            (completion text, model that produced it)
+        Raises:
+            The winning attempt's exception, or the primary's if every attempt failed
+        """
+        fallback = self.fallback_for(llm)
+        models = [llm]
+        race = _Race(on_token)
+        self._start(race, 0, llm, attempt)
+        hedged = failover = False
+        if fallback:
+            deadline = time.monotonic() + self.hedge_delay(llm)
+            with race.cond:
+                while race.winner is None and 0 not in race.outcomes:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    race.cond.wait(remaining)
+                # Primary has not started answering in time, or already failed
+                hedged = race.winner is None
+                failover = 0 in race.outcomes
+        if hedged:
+            logger.info(f"{'Failing over' if failover else 'Hedging'} LLM request: {llm} -> {fallback}")
+            models.append(fallback)
+            self._start(race, 1, fallback, attempt)
+        with race.cond:
+            # Done when the winner has finished, or every attempt failed without a winner
+            while not (race.winner in race.outcomes or len(race.outcomes) == len(models)):
+                race.cond.wait()
+            winner = race.winner
+            outcomes = dict(race.outcomes)
+        served_by = models[winner] if winner is not None else llm
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["hedged"] += int(hedged)
+            self._stats["failovers"] += int(failover)
+            self._stats["fallback_wins"] += int(winner == 1)
+        LLM_ROUTED_REQUESTS_TOTAL.inc(
+            primary=llm_metric_label(llm),
+            winner=llm_metric_label(served_by),
+            hedged="true" if hedged else "false",
+        )
+        if winner is None:
+            raise outcomes[0][1]  # type: ignore[misc]
+        text, error = outcomes[winner]
+        if error is not None:
+            raise error
+        if winner == 1:
+            logger.info(f"Hedged LLM request served by fallback {served_by} (primary {llm})")
+        return text or "", served_by
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot: Dict[str, Any] = dict(self._stats)
+            models = list(self._windows)
+        snapshot["enabled"] = settings.LLM_HEDGING_ENABLED
+        snapshot["models"] = {
+            m: dict(self._snapshot(m), hedge_delay_seconds=round(self.hedge_delay(m), 3))
+            for m in sorted(models)
+        }
+        return snapshot
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+_router = LLMRouter()
+
+
+def get_llm_router() -> LLMRouter:
+    return _router
+
+
+def get_llm_router_stats() -> Dict[str, Any]:
+    return _router.stats()
+
+
+def shutdown_llm_router() -> None:
+    """Stop the hedge attempt threads (called from the app lifespan on shutdown)."""
+    _router.shutdown()
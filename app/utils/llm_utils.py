@@ -8,34 +8,16 @@ from pathlib import Path
 from typing import Optional
 
 from app.core.config import settings
+from app.utils.llm_clients import (
+    get_anthropic_client,
+    get_gemini_model,
+    get_openai_client,
+    get_xai_http_client,
+)
 
 logger = logging.getLogger(__name__)
 
-# Try to import LLM libraries
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-
-try:
-    import google.generativeai as genai
-    GOOGLE_AVAILABLE = True
-except ImportError:
-    GOOGLE_AVAILABLE = False
-
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
-
+# Optional SDKs used directly here; the other providers' clients come from llm_clients
 try:
     import oci
     OCI_AVAILABLE = True
@@ -100,11 +82,10 @@ def post_to_llm(prompt: str, model: str = "gpt-4.1") -> Optional[str]:
     return_response = None
     
     if model == "gpt-4.1" or model == "gpt-5.2" or model.startswith("gpt-"):
-        if not OPENAI_AVAILABLE or not settings.OPENAI_API_KEY:
+        client = get_openai_client()
+        if client is None:
             logger.error("OpenAI not available or API key not set")
             return None
-            
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
         # Use high max_completion_tokens for GPT-5.2
         if model == "gpt-5.2":
             response = client.chat.completions.create(
@@ -127,11 +108,10 @@ def post_to_llm(prompt: str, model: str = "gpt-4.1") -> Optional[str]:
         return_response = response.choices[0].message.content
         
     elif model == "claude-sonnet-4-20250514":
-        if not ANTHROPIC_AVAILABLE or not settings.ANTHROPIC_API_KEY:
+        client = get_anthropic_client()
+        if client is None:
             logger.error("Anthropic not available or API key not set")
             return None
-            
-        client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
         response = client.messages.create(
             model=model,
             system="You are a helpful assistant.",
@@ -144,17 +124,17 @@ def post_to_llm(prompt: str, model: str = "gpt-4.1") -> Optional[str]:
         )
         
     elif model == "gemini-2.5-flash":
-        if not GOOGLE_AVAILABLE or not settings.GOOGLE_API_KEY:
+        # Same key as cover letter generation, so genai.configure() is not re-run between them
+        client = get_gemini_model(model)
+        if client is None:
             logger.error("Google Generative AI not available or API key not set")
             return None
-            
-        genai.configure(api_key=settings.GOOGLE_API_KEY)
-        client = genai.GenerativeModel(model)
         response = client.generate_content(contents=prompt)
         return_response = response.text
         
     elif model == "grok-4-fast-reasoning":
-        if not REQUESTS_AVAILABLE or not settings.XAI_API_KEY:
+        xai_client = get_xai_http_client()
+        if xai_client is None or not settings.XAI_API_KEY:
             logger.error("XAI API not available or API key not set")
             return None
             
@@ -169,8 +149,8 @@ def post_to_llm(prompt: str, model: str = "gpt-4.1") -> Optional[str]:
                 {"role": "user", "content": prompt},
             ],
         }
-        response = requests.post(
-            "https://api.x.ai/v1/chat/completions",
+        response = xai_client.post(
+            "chat/completions",
             json=data,
             headers=headers,
             timeout=3600,
@@ -211,6 +191,30 @@ def normalize_llm_name(llm: str) -> str:
         return llm
 
 
+# Everything normalize_llm_name() maps to
+KNOWN_LLM_NAMES = frozenset(
+    (
+        "gemini-2.5-flash",
+        "gpt-4.1",
+        "grok-4-fast-reasoning",
+        "claude-sonnet-4-20250514",
+        "llama3.2",
+        "oci-generative-ai",
+    )
+)
+
+
+def llm_metric_label(llm: str) -> str:
+    """
+    Canonical model name for metric labels and per-model router state.
+
+    The llm field of a request is free-form client input, so names normalize_llm_name() does
+    not recognise all become "other" instead of a new time series each.
+    """
+    name = normalize_llm_name(llm or "")
+    return name if name in KNOWN_LLM_NAMES else "other"
+
+
 def get_text(contents):
     """Helper function to extract text from OCI content list"""
     text = ""
@@ -0,0 +1,192 @@
+"""
+Bounded in-process cache with LRU eviction and TTL expiry.
+
+Used for process-local caches (Redis fallbacks, tokens, plan lists) so they cannot grow without
+bound: each cache is capped by entry count and by an estimated byte size, evicts the least
+recently used entries first, and a shared background thread sweeps expired entries even when
+they are never read again. All operations are thread-safe.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Every LocalCache registers here so the sweeper and stats endpoint can find it
+_registry: "weakref.WeakSet[LocalCache]" = weakref.WeakSet()
+_registry_lock = threading.Lock()
+_sweeper_started = False
+
+
+def _estimate_size(value: Any) -> int:
+    """Rough byte size of a cached value (strings/bytes exact, containers via JSON)."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", errors="ignore"))
+    if isinstance(value, (dict, list, tuple)):
+        try:
+            return len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            pass
+    return sys.getsizeof(value)
+
+
+def _sweep_loop() -> None:
+    while True:
+        time.sleep(max(1.0, settings.LOCAL_CACHE_SWEEP_INTERVAL_SECONDS))
+        with _registry_lock:
+            caches = list(_registry)
+        for cache in caches:
+            try:
+                cache.sweep()
+            except Exception as e:
+                logger.debug(f"Local cache sweep failed for {cache.name}: {e}")
+
+
+def _ensure_sweeper() -> None:
+    global _sweeper_started
+    with _registry_lock:
+        if _sweeper_started:
+            return
+        _sweeper_started = True
+    threading.Thread(target=_sweep_loop, name="local-cache-sweeper", daemon=True).start()
+
+
+class LocalCache:
+    """Thread-safe LRU cache with per-entry TTL and entry/byte limits."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = _estimate_size,
+    ) -> None:
+        """
+        Args:
+            name: Label used in stats and logs
+            max_entries: Entry limit (defaults to settings.LOCAL_CACHE_MAX_ENTRIES)
+            max_bytes: Estimated size limit (defaults to settings.LOCAL_CACHE_MAX_BYTES)
+            default_ttl: Seconds an entry lives when set() gets no ttl (None = no expiry)
+            sizeof: Function estimating the byte size of a value
+        """
+        self.name = name
+        self.max_entries = max_entries if max_entries is not None else settings.LOCAL_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes if max_bytes is not None else settings.LOCAL_CACHE_MAX_BYTES
+        self.default_ttl = default_ttl
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        # key -> (expires_at or None, size, value); order = recency (last = most recent)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        with _registry_lock:
+            _registry.add(self)
+        _ensure_sweeper()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (marking it recently used) or default if missing/expired."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self._misses += 1
+                return default
+            expires_at, _, value = item
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; ttl (seconds) overrides default_ttl. Values over max_bytes are skipped."""
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                return
+            self._data[key] = (expires_at, size, value)
+            self._bytes += size
+            self._evict()
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def sweep(self) -> int:
+        """Drop expired entries; returns how many were removed."""
+        now = time.time()
+        with self._lock:
+            expired = [k for k, (exp, _, _) in self._data.items() if exp is not None and exp <= now]
+            for key in expired:
+                self._remove(key)
+            self._expirations += len(expired)
+        return len(expired)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.max_entries and len(self._data) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self._evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+
+def get_local_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every live LocalCache, keyed by cache name."""
+    with _registry_lock:
+        caches = list(_registry)
+    return {cache.name: cache.stats() for cache in caches}
@@ -0,0 +1,217 @@
+"""
+Minimal in-process metrics registry with Prometheus text exposition.
+
+Histograms and counters are kept per label set in this worker and rendered by
+render_prometheus() for the /metrics endpoint (text format 0.0.4). With several uvicorn
+workers each process exposes its own series; scrape them per worker or aggregate upstream.
+
+Generation stage latencies (see GenerationTiming.finish()) are the main producer. Set
+METRICS_ENABLED=false to turn recording into a no-op.
+
+With OTEL_TRACES_ENABLED=true the same stages are also emitted as OpenTelemetry spans. Spans
+go to whatever tracer provider is installed (e.g. by opentelemetry-instrument); if none is and
+opentelemetry-sdk plus the OTLP exporter are installed, one exporting to
+OTEL_EXPORTER_OTLP_ENDPOINT is set up on first use.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import math
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace as otel_trace
+
+    OTEL_AVAILABLE = True
+except ImportError:
+    otel_trace = None
+    OTEL_AVAILABLE = False
+
+# Seconds; LLM calls dominate, so the upper buckets are wide
+STAGE_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+_LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> _LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[_LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = STAGE_BUCKETS_SECONDS,
+    ) -> None:
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., +Inf count], sum
+        self._series: Dict[_LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._series.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+_registry: List[_Metric] = []
+_registry_lock = threading.Lock()
+
+
+def register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        _registry.append(metric)
+    return metric
+
+
+def render_prometheus() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines: List[str] = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+GENERATION_STAGE_SECONDS = register(
+    Histogram(
+        "generation_stage_seconds",
+        "Time spent in each generation stage (from the previous checkpoint to this one)",
+        ("endpoint", "llm", "cache", "stage"),
+    )
+)
+GENERATION_TOTAL_SECONDS = register(
+    Histogram(
+        "generation_total_seconds",
+        "Backend time from request received to the last checkpoint",
+        ("endpoint", "llm", "cache"),
+    )
+)
+GENERATIONS_TOTAL = register(
+    Counter("generations_total", "Completed generation requests", ("endpoint", "llm", "cache"))
+)
+LLM_PROMPT_TOKENS_TOTAL = register(
+    Counter(
+        "llm_prompt_tokens_total",
+        "Prompt tokens reported by the provider (kind=prompt: all, cached: read from the "
+        "provider prompt cache, cache_write: written to it)",
+        ("llm", "kind"),
+    )
+)
+
+
+_tracer: Optional[Any] = None
+_tracer_lock = threading.Lock()
+
+
+def _install_otlp_provider() -> None:
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_TRACES_ENABLED is set but opentelemetry-sdk / OTLP exporter are not installed")
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    otel_trace.set_tracer_provider(provider)
+    logger.info("OpenTelemetry OTLP span exporter configured")
+
+
+def get_tracer() -> Optional[Any]:
+    """OpenTelemetry tracer for generation spans, or None when tracing is off or unavailable."""
+    global _tracer
+    if not settings.OTEL_TRACES_ENABLED or not OTEL_AVAILABLE:
+        return None
+    with _tracer_lock:
+        if _tracer is None:
+            provider = otel_trace.get_tracer_provider()
+            if type(provider).__name__ in ("ProxyTracerProvider", "NoOpTracerProvider"):
+                _install_otlp_provider()
+            _tracer = otel_trace.get_tracer("app.generation")
+        return _tracer
@@ -0,0 +1,299 @@
+"""
+Async, pooled fetcher for job posting pages with a shared, URL-normalized page cache.
+
+analyze_job_url used to fetch each page with a one-off blocking requests.get, which held the
+event loop for up to the full timeout. fetch_page() instead uses one httpx.AsyncClient per
+process (connection pooling and keep-alive, HTTP/2 when the h2 package is installed, gzip /
+brotli / zstd decoding for whatever decoders are installed) and limits concurrent requests per
+host (PAGE_FETCH_PER_HOST_LIMIT) so a burst of analyses does not hammer one job board.
+
+Pages are cached under their normalized URL (normalize_job_url(): tracking parameters
+stripped, LinkedIn and Indeed postings reduced to their job ID), so the many users pasting
+the same popular posting share one entry:
+
+- entry younger than PAGE_CACHE_FRESH_SECONDS: returned without touching the network
+- older entry (kept for PAGE_CACHE_TTL_SECONDS): revalidated with If-None-Match /
+  If-Modified-Since; a 304 refreshes the entry and returns the cached HTML
+- concurrent fetches of the same URL in this process share one request
+
+Only 200 responses that the caller's cacheable() check accepts (e.g. not a CAPTCHA page) are
+stored.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from app.core.config import settings
+from app.utils.metrics import Counter, register
+from app.utils.tiered_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2 support)
+
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+PAGE_FETCH_TOTAL = register(
+    Counter(
+        "page_fetch_total",
+        "Job page fetches by outcome (hit: served from cache, revalidated: 304 from origin, "
+        "fetched: full download, shared: joined an in-flight fetch, error)",
+        ("result",),
+    )
+)
+
+# Accept-Encoding is left to httpx, which advertises exactly the decoders that are installed
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+# Query parameters that only identify the click, never the page (compared lowercased)
+_TRACKING_PARAMS = frozenset(
+    {
+        "gclid", "gclsrc", "dclid", "fbclid", "msclkid", "yclid", "igshid",
+        "mc_cid", "mc_eid", "_hsenc", "_hsmi", "ref", "refid", "referrer",
+        "trk", "trkinfo", "trackingid", "lipi", "ebp", "originalsubdomain",
+    }
+)
+_TRACKING_PREFIXES = ("utm_",)
+
+# /jobs/view/1234567890/ or /jobs/view/senior-engineer-at-acme-1234567890
+_LINKEDIN_JOB_PATH = re.compile(r"/jobs/view/(?:[^/]*?-)?(\d{6,})(?:/|$)")
+_LINKEDIN_JOB_PARAMS = ("currentJobId", "jobId")
+_INDEED_JOB_PARAMS = ("jk", "vjk")
+
+_page_cache = TieredCache(
+    "job_pages",
+    ttl_seconds=settings.PAGE_CACHE_TTL_SECONDS,
+    l1_ttl_seconds=settings.PAGE_CACHE_FRESH_SECONDS,
+    l1_max_entries=settings.PAGE_CACHE_L1_MAX_ENTRIES,
+    l1_max_bytes=settings.PAGE_CACHE_L1_MAX_BYTES,
+    redis_prefix="cache:job_page:",
+)
+
+# Client and per-host semaphores belong to the event loop they were created on
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+_in_flight: Dict[str, "asyncio.Future[FetchedPage]"] = {}
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "revalidated": 0, "fetched": 0, "shared": 0, "errors": 0}
+
+
+def _bump(field: str, result: str) -> None:
+    with _stats_lock:
+        _stats[field] += 1
+    PAGE_FETCH_TOTAL.inc(result=result)
+
+
+class FetchedPage:
+    """A fetched (or cached) page."""
+
+    __slots__ = ("url", "status_code", "html", "cache")
+
+    def __init__(self, url: str, status_code: int, html: str, cache: Optional[str] = None) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.html = html
+        # "hit", "revalidated" or None (downloaded)
+        self.cache = cache
+
+
+def job_posting_id(url: str) -> Optional[Tuple[str, str]]:
+    """("linkedin" | "indeed", job ID) for a LinkedIn or Indeed posting URL, else None."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    params = dict(parse_qsl(parts.query, keep_blank_values=True))
+    if host == "linkedin.com" or host.endswith(".linkedin.com"):
+        match = _LINKEDIN_JOB_PATH.search(parts.path)
+        if match:
+            return "linkedin", match.group(1)
+        job_id = next((params[p] for p in _LINKEDIN_JOB_PARAMS if params.get(p, "").isdigit()), None)
+        if job_id:
+            return "linkedin", job_id
+    if host == "indeed.com" or host.endswith(".indeed.com"):
+        job_key = next((params[p] for p in _INDEED_JOB_PARAMS if params.get(p)), None)
+        if job_key:
+            return "indeed", job_key
+    return None
+
+
+def normalize_job_url(url: str) -> str:
+    """
+    Canonical form of a job posting URL, used as the fetch target and cache key.
+
+    LinkedIn postings become https://www.linkedin.com/jobs/view/<id>/ (from the path or the
+    currentJobId of search/collection pages), Indeed postings https://www.indeed.com/viewjob?jk=<id>
+    (keeping country subdomains). Elsewhere the host is lowercased, the fragment and tracking
+    parameters are dropped and the remaining parameters are sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    posting = job_posting_id(url)
+    if posting is not None:
+        site, job_id = posting
+        if site == "linkedin":
+            return f"https://www.linkedin.com/jobs/view/{job_id}/"
+        host = "www.indeed.com" if host == "indeed.com" else host
+        return f"https://{host}/viewjob?{urlencode({'jk': job_id})}"
+
+    netloc = host
+    if parts.port and not (
+        (scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)
+    ):
+        netloc = f"{host}:{parts.port}"
+    kept = sorted(
+        (k, v)
+        for k, v in query
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith(_TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(kept), ""))
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        # First use, or a new event loop (the old client cannot be used from this one)
+        _client = httpx.AsyncClient(
+            http2=settings.PAGE_FETCH_HTTP2 and H2_AVAILABLE,
+            follow_redirects=True,
+            timeout=httpx.Timeout(settings.PAGE_FETCH_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=settings.PAGE_FETCH_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PAGE_FETCH_MAX_CONNECTIONS,
+                keepalive_expiry=settings.PAGE_FETCH_KEEPALIVE_SECONDS,
+            ),
+            headers=_HEADERS,
+        )
+        _client_loop = loop
+        _host_limits.clear()
+        _in_flight.clear()
+    return _client
+
+
+def _host_limit(host: str) -> asyncio.Semaphore:
+    semaphore = _host_limits.get(host)
+    if semaphore is None:
+        semaphore = _host_limits[host] = asyncio.Semaphore(max(1, settings.PAGE_FETCH_PER_HOST_LIMIT))
+    return semaphore
+
+
+async def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    entry = _page_cache.l1.get(key)
+    if entry is not None:
+        return dict(entry)
+    # Redis is synchronous; keep it off the event loop
+    return await asyncio.to_thread(_page_cache.get_json, key)
+
+
+async def _download(
+    key: str, entry: Optional[Dict[str, Any]], cacheable: Optional[Callable[[str], bool]]
+) -> FetchedPage:
+    client = _get_client()
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        async with _host_limit(urlsplit(key).hostname or ""):
+            response = await client.get(key, headers=headers)
+    except Exception:
+        _bump("errors", "error")
+        raise
+
+    if response.status_code == 304 and entry:
+        _bump("revalidated", "revalidated")
+        entry["fetched_at"] = time.time()
+        await asyncio.to_thread(_page_cache.set_json, key, entry)
+        logger.info(f"Job page not modified, using cached copy: {key}")
+        return FetchedPage(key, 200, entry["html"], cache="revalidated")
+
+    _bump("fetched", "fetched")
+    html = response.text
+    if response.status_code == 200 and (cacheable is None or cacheable(html)):
+        await asyncio.to_thread(
+            _page_cache.set_json,
+            key,
+            {
+                "html": html,
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "fetched_at": time.time(),
+            },
+        )
+    return FetchedPage(key, response.status_code, html)
+
+
+async def fetch_page(
+    url: str, cacheable: Optional[Callable[[str], bool]] = None
+) -> FetchedPage:
+    """
+    Fetch a job posting page through the shared pool and page cache.
+
+    Args:
+        url: Page URL (normalized with normalize_job_url before fetching)
+        cacheable: Optional check on a 200 response's HTML; False keeps it out of the cache
+
+    Returns:
+        FetchedPage (any status code; the caller decides what an error status means)
+
+    Raises:
+        httpx.HTTPError: on network errors and timeouts
+    """
+    key = normalize_job_url(url)
+    entry = await _cache_get(key)
+    if entry and time.time() - entry.get("fetched_at", 0) < settings.PAGE_CACHE_FRESH_SECONDS:
+        _bump("hits", "hit")
+        logger.info(f"Job page cache hit: {key}")
+        return FetchedPage(key, 200, entry["html"], cache="hit")
+
+    _get_client()
+    future = _in_flight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(_download(key, entry, cacheable))
+        _in_flight[key] = future
+        future.add_done_callback(
+            lambda done: _in_flight.pop(key, None) if _in_flight.get(key) is done else None
+        )
+    else:
+        _bump("shared", "shared")
+    # Shielded so a caller that goes away does not cancel the fetch others are waiting on
+    return await asyncio.shield(future)
+
+
+def get_page_fetcher_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+    stats["http2"] = settings.PAGE_FETCH_HTTP2 and H2_AVAILABLE
+    stats["hosts"] = len(_host_limits)
+    return stats
+
+
+async def close_page_fetcher() -> None:
+    """Close the pooled client (called from the app lifespan on shutdown)."""
+    global _client, _client_loop
+    client, _client, _client_loop = _client, None, None
+    _host_limits.clear()
+    if client is not None:
+        await client.aclose()
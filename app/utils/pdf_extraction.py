@@ -0,0 +1,190 @@
+"""
+Pluggable PDF text extraction engines.
+
+Each engine turns PDF bytes into a list of per-page strings. extract_text() tries the engines
+in PDF_TEXT_ENGINES order (default "pymupdf,pypdf2") and falls back to the next one when an
+engine is not installed, raises, or returns no text. PyMuPDF (C, MuPDF) is the default: it is
+an order of magnitude faster than pure-Python PyPDF2 on typical resumes.
+
+Documents with at least PDF_PARALLEL_PAGE_THRESHOLD pages are split into page ranges and
+extracted in a small process pool (PDF_PARALLEL_WORKERS); PyMuPDF documents cannot be shared
+between threads, and both engines hold the GIL while parsing. Pool workers are spawned, not
+forked: the server has many threads (LLM executor, queue workers, Mongo and Redis monitors)
+and a forked child can deadlock on a lock one of them held at fork time.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pymupdf  # type: ignore[import-untyped]
+
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    try:
+        import fitz as pymupdf  # type: ignore[import-untyped,no-redef]
+
+        PYMUPDF_AVAILABLE = True
+    except ImportError:
+        pymupdf = None
+        PYMUPDF_AVAILABLE = False
+
+try:
+    import PyPDF2
+
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PyPDF2 = None
+    PYPDF2_AVAILABLE = False
+
+
+class PDFExtractionError(Exception):
+    """Raised when no configured engine could extract text."""
+
+
+def _pymupdf_page_count(pdf_bytes: bytes) -> int:
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def _pymupdf_pages(pdf_bytes: bytes, start: int = 0, stop: Optional[int] = None) -> List[str]:
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        return [doc[i].get_text("text") for i in range(start, stop)]
+
+
+def _pypdf2_page_count(pdf_bytes: bytes) -> int:
+    return len(PyPDF2.PdfReader(BytesIO(pdf_bytes)).pages)
+
+
+def _pypdf2_pages(pdf_bytes: bytes, start: int = 0, stop: Optional[int] = None) -> List[str]:
+    pages = PyPDF2.PdfReader(BytesIO(pdf_bytes)).pages
+    stop = len(pages) if stop is None else min(stop, len(pages))
+    return [pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+# name -> (available, page_count(bytes), pages(bytes, start, stop))
+ENGINES: Dict[str, Tuple[bool, Callable[[bytes], int], Callable[..., List[str]]]] = {
+    "pymupdf": (PYMUPDF_AVAILABLE, _pymupdf_page_count, _pymupdf_pages),
+    "pypdf2": (PYPDF2_AVAILABLE, _pypdf2_page_count, _pypdf2_pages),
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.PDF_PARALLEL_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _extract_range(engine: str, pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    # Runs in a worker process
+    return ENGINES[engine][2](pdf_bytes, start, stop)
+
+
+def available_engines() -> List[str]:
+    return [name for name, (available, _, _) in ENGINES.items() if available]
+
+
+def configured_engines() -> List[str]:
+    """Engine chain from PDF_TEXT_ENGINES (unknown names are ignored)."""
+    names = [n.strip().lower() for n in settings.PDF_TEXT_ENGINES.split(",") if n.strip()]
+    return [n for n in names if n in ENGINES] or ["pymupdf", "pypdf2"]
+
+
+def extract_pages(pdf_bytes: bytes, engine: str, parallel: Optional[bool] = None) -> List[str]:
+    """
+    Extract per-page text with one engine.
+
+    Args:
+        pdf_bytes: PDF file content
+        engine: Engine name (see ENGINES)
+        parallel: Force (True) or disable (False) per-page parallelism; None uses the
+            PDF_PARALLEL_PAGE_THRESHOLD setting
+
+    Returns:
+        List of page texts
+    """
+    available, page_count, pages = ENGINES[engine]
+    if not available:
+        raise ImportError(f"PDF engine '{engine}' is not installed")
+
+    threshold = settings.PDF_PARALLEL_PAGE_THRESHOLD
+    if parallel is False or (parallel is None and threshold <= 0):
+        return pages(pdf_bytes)
+    count = page_count(pdf_bytes)
+    workers = max(1, settings.PDF_PARALLEL_WORKERS)
+    if workers == 1 or count < 2 or (parallel is None and count < threshold):
+        return pages(pdf_bytes)
+
+    chunk = -(-count // workers)
+    ranges = [(start, min(start + chunk, count)) for start in range(0, count, chunk)]
+    pool = _get_pool()
+    futures = [pool.submit(_extract_range, engine, pdf_bytes, a, b) for a, b in ranges]
+    result: List[str] = []
+    for future in futures:
+        result.extend(future.result())
+    return result
+
+
+def extract_text(
+    pdf_bytes: bytes, engines: Optional[Sequence[str]] = None, parallel: Optional[bool] = None
+) -> Tuple[str, str]:
+    """
+    Extract plain text, trying each engine in the fallback chain.
+
+    Pages are joined with a blank line, matching the original PyPDF2 output format.
+
+    Args:
+        pdf_bytes: PDF file content
+        engines: Engine chain (defaults to configured_engines())
+        parallel: See extract_pages()
+
+    Returns:
+        (text, engine name that produced it)
+
+    Raises:
+        PDFExtractionError: If every engine failed or returned no text
+    """
+    errors = []
+    for engine in engines or configured_engines():
+        try:
+            pages = extract_pages(pdf_bytes, engine, parallel=parallel)
+        except Exception as e:
+            errors.append(f"{engine}: {e}")
+            logger.debug(f"PDF engine {engine} failed: {e}")
+            continue
+        text = "\n\n".join(p.strip() for p in pages).strip()
+        if text:
+            return text, engine
+        errors.append(f"{engine}: no text")
+    raise PDFExtractionError("; ".join(errors) or "no PDF engine available")
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop the page-parallel worker pool (called from the app lifespan on shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            if sys.version_info >= (3, 9):
+                _pool.shutdown(wait=False, cancel_futures=True)
+            else:
+                _pool.shutdown(wait=False)
+            _pool = None
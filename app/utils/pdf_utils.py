@@ -6,15 +6,9 @@ import os
 from io import BytesIO
 from typing import Optional
 
-logger = logging.getLogger(__name__)
+from app.utils.pdf_extraction import available_engines, extract_text
 
-# Try to import PyPDF2
-try:
-    import PyPDF2
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
-    logger.warning("PyPDF2 not available. PDF reading will not work.")
+logger = logging.getLogger(__name__)
 
 # Try to import PyMuPDF (fitz) for markdown/layout-aware extraction.
 _fitz_module = None
@@ -32,29 +26,21 @@ def read_pdf_from_bytes(pdf_bytes: bytes) -> str:
     """
     Extract text content from PDF bytes
     
+    Uses the engine chain from app.utils.pdf_extraction (PyMuPDF first, PyPDF2 fallback).
+    
     Args:
         pdf_bytes: PDF file content as bytes
         
     Returns:
         Extracted text content as string
     """
-    if not PDF_AVAILABLE:
-        raise ImportError("PyPDF2 is not installed. Cannot read PDF files.")
+    if not available_engines():
+        raise ImportError("Neither PyMuPDF nor PyPDF2 is installed. Cannot read PDF files.")
 
     try:
-        text_content = ""
-        pdf_file = BytesIO(pdf_bytes)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        num_pages = len(pdf_reader.pages)
-
-        for page_num in range(num_pages):
-            page = pdf_reader.pages[page_num]
-            text_content += page.extract_text()
-            if page_num < num_pages - 1:
-                text_content += "\n\n"
-
-        logger.info(f"Successfully extracted text from PDF ({num_pages} pages)")
-        return text_content.strip()
+        text_content, engine = extract_text(pdf_bytes)
+        logger.info(f"Successfully extracted text from PDF using {engine}")
+        return text_content
     except Exception as e:
         logger.error(f"Error reading PDF: {str(e)}")
         return f"[Error reading PDF: {str(e)}]"
@@ -105,8 +91,8 @@ def read_pdf_file(file_path: str) -> str:
     Returns:
         Extracted text content as string
     """
-    if not PDF_AVAILABLE:
-        raise ImportError("PyPDF2 is not installed. Cannot read PDF files.")
+    if not available_engines():
+        raise ImportError("Neither PyMuPDF nor PyPDF2 is installed. Cannot read PDF files.")
 
     if not os.path.exists(file_path):
         logger.warning(f"PDF file not found: {file_path}")
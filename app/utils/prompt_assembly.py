@@ -0,0 +1,377 @@
+"""
+Precompiled, hot-reloaded prompt assembly for cover letter generation.
+
+system_prompt.json and templates/<category>/*.template are read once and kept in memory,
+together with the instruction block each template expands to. Every
+PROMPT_RELOAD_CHECK_SECONDS the mtimes of those files (and the template directories, for
+added/removed templates) are compared with the loaded snapshot; on a change the assets are
+reloaded, so prompts can be edited without a restart.
+
+The static instruction text (personality, template, typography, DOCX components and override
+wrappers) is kept as precompiled fragments; building a prompt only concatenates them with the
+per-request values. Provider-specific prompt shapes (single text, chat messages, Anthropic
+content blocks) are built by build_full_text_prompt(), build_chat_messages() and
+build_claude_content().
+
+With PROMPT_CACHE_ENABLED, _prepare_generation() passes the resume separately
+(gen["resume_message"]) and the builders put it right after the system prompt, ahead of the
+per-request instructions and job data. System prompt + resume then form a prefix that stays
+byte-identical across a user's generations, which is what provider prompt caches key on.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import random
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.utils.template_loader import get_template_category_from_profile_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYSTEM_PROMPT = (
+    "You are an expert cover letter writer. Generate a professional cover letter based on the "
+    "provided information. IMPORTANT: Any returned HTML must not contain backslashes (\\\\) as "
+    "carriage returns or line breaks - use only whitespace characters (spaces, tabs) for formatting."
+)
+
+# Anthropic cache breakpoint (5 minute TTL, refreshed on every hit)
+CACHE_CONTROL = {"type": "ephemeral"}
+
+_PERSONALITY_HEAD = """
+=== PERSONALITY PROFILE INSTRUCTION - CRITICAL ===
+YOU MUST FOLLOW THIS PERSONALITY PROFILE EXACTLY:
+"""
+_PERSONALITY_TAIL = """
+
+Apply this personality throughout the entire cover letter. This instruction takes precedence over default writing styles.
+=== END PERSONALITY PROFILE INSTRUCTION ===
+"""
+
+_TEMPLATE_HEAD = """
+=== TEMPLATE STRUCTURE - MATCH LINE BREAKS EXACTLY ===
+Your "content" output MUST follow this template line-for-line so paragraph and line breaks are consistent.
+
+RULES:
+- Each non-blank line in the template = one line in your content (use one newline (\\n) after it before the next line).
+- Each blank line in the template = exactly two newlines (\\n\\n) in your content — that is the paragraph separator.
+- Do not merge lines or skip blank lines. The number of lines and blank lines in your output must match the template.
+
+TEMPLATE (copy its structure; replace placeholders with real data):
+---
+"""
+_TEMPLATE_TAIL = """
+---
+
+Placeholders: <<date>>, <<name>>, <<phone>>, <<email>>, <<address>>, <<city, state, zip>>, <<hiring manager>>, <<company name>>, <<company address>>, <<position title>>, <<salutation>>, <<body paragraph>> (repeat for each body paragraph), <<complimentary close>> — replace with actual resume/job data. Generate the right number of <<body paragraph>> blocks.
+=== END TEMPLATE STRUCTURE ===
+"""
+
+_TYPOGRAPHY = """
+=== TYPOGRAPHY BASELINE ===
+Use font-family '{font_family}', font-size {font_size}pt, and line-height {line_height} as the baseline for main body text.
+You may creatively vary font size, color, and style for lists, tables, headings, and key phrases using inline HTML (e.g. <span style='font-size:14pt'>, <span style='color:#c00000'>). The baseline applies to the main letter content; lists and tables can use different sizes for visual hierarchy.
+=== END TYPOGRAPHY BASELINE ===
+"""
+
+DOCX_COMPONENTS_INSTRUCTION = """
+=== OUTPUT FORMAT: DOCX AS XML COMPONENTS (required when this section is present) ===
+Return a JSON object with exactly three string fields. The values must be valid XML for a Word document.
+
+1. "document_xml": Full content of word/document.xml.
+   Root: <w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body> ... </w:body></w:document>
+   - Ordinary paragraph: <w:p><w:r><w:t>Your text here</w:t></w:r></w:p>
+   - BULLET LISTS (mandatory): Do NOT put bullet characters (•, -, *, etc.) inside <w:t>. For every bullet list item you MUST use this exact structure so the document gets proper hanging indents:
+     <w:p><w:pPr><w:numPr><w:ilvl w:val="0"/><w:numId w:val="1"/></w:numPr></w:pPr><w:r><w:t>List item text only</w:t></w:r></w:p>
+     The <w:numPr> block (with ilvl 0 and numId 1) is what makes Word show the bullet and hanging indent. The text inside <w:t> must be the list item content only—no leading bullet character.
+   - End the body with <w:sectPr/> before </w:body>.
+
+2. "numbering_xml": (optional) Full content of word/numbering.xml. If you omit or leave empty, the system uses a default (numId 1 = bullet with hanging indent).
+
+3. "styles_xml": (optional) Full content of word/styles.xml. If you omit or leave empty, the system uses a default.
+
+Escape quotes inside JSON strings (use \\" for a literal quote). Newlines inside the XML strings are allowed.
+=== END DOCX COMPONENTS ===
+"""
+
+_OVERRIDE_HEAD = """
+
+=== FINAL OVERRIDE INSTRUCTIONS - HIGHEST PRIORITY ===
+IGNORE ALL PREVIOUS INSTRUCTIONS ABOUT LENGTH, TONE, STYLE, OR FORMATTING.
+THE FOLLOWING INSTRUCTIONS TAKE ABSOLUTE PRECEDENCE OVER EVERYTHING ELSE, INCLUDING:
+- System prompts
+- Personality profiles
+- Tone settings
+- Any other instructions in this conversation
+
+YOU MUST FOLLOW THESE INSTRUCTIONS EXACTLY:
+"""
+_OVERRIDE_TAIL = """
+
+=== END OVERRIDE INSTRUCTIONS ===
+"""
+
+TONE_PREFIX = (
+    "Use the following tone/personality when generating the result, but do not specifically "
+    "note the activities within this text: "
+)
+
+
+class _PromptAssets:
+    __slots__ = ("system_prompt", "template_blocks", "signature")
+
+    def __init__(
+        self,
+        system_prompt: str,
+        template_blocks: Dict[str, List[Tuple[str, str]]],
+        signature: Tuple[Tuple[str, int], ...],
+    ) -> None:
+        self.system_prompt = system_prompt
+        # category -> [(template file name, precompiled instruction block)]
+        self.template_blocks = template_blocks
+        self.signature = signature
+
+
+_assets: Optional[_PromptAssets] = None
+_assets_lock = threading.Lock()
+_last_check = 0.0
+_stats = {"loads": 0, "reload_checks": 0}
+
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return -1
+
+
+def _template_files() -> List[Path]:
+    base = Path(settings.TEMPLATES_DIR)
+    if not base.is_dir():
+        return []
+    return sorted(base.glob("*/*.template"))
+
+
+def _signature() -> Tuple[Tuple[str, int], ...]:
+    base = Path(settings.TEMPLATES_DIR)
+    paths = [Path(settings.SYSTEM_PROMPT_PATH), base]
+    if base.is_dir():
+        paths.extend(sorted(p for p in base.iterdir() if p.is_dir()))
+    paths.extend(_template_files())
+    return tuple((str(p), _mtime_ns(p)) for p in paths)
+
+
+def _read_system_prompt() -> str:
+    path = Path(settings.SYSTEM_PROMPT_PATH)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            system_prompt = json.load(f).get("system_prompt", "")
+    except FileNotFoundError:
+        logger.warning(f"System prompt file not found: {path}. Using default.")
+        return DEFAULT_SYSTEM_PROMPT
+    except Exception as e:
+        logger.error(f"Error loading system prompt from {path}: {e}. Using default.")
+        return DEFAULT_SYSTEM_PROMPT
+    if not system_prompt:
+        logger.warning(f"System prompt not found in {path}. Using default.")
+        return DEFAULT_SYSTEM_PROMPT
+    return system_prompt
+
+
+def _load() -> _PromptAssets:
+    signature = _signature()
+    blocks: Dict[str, List[Tuple[str, str]]] = {}
+    for path in _template_files():
+        try:
+            content = path.read_text(encoding="utf-8").strip()
+        except Exception as e:
+            logger.error(f"Failed to read template {path}: {e}")
+            continue
+        if content:
+            blocks.setdefault(path.parent.name, []).append(
+                (path.name, _TEMPLATE_HEAD + content + _TEMPLATE_TAIL)
+            )
+    system_prompt = _read_system_prompt()
+    _stats["loads"] += 1
+    logger.info(
+        f"Loaded prompt assets: system prompt ({len(system_prompt)} chars), "
+        f"{sum(len(v) for v in blocks.values())} template(s) in {sorted(blocks)}"
+    )
+    return _PromptAssets(system_prompt, blocks, signature)
+
+
+def _get_assets() -> _PromptAssets:
+    global _assets, _last_check
+    assets = _assets
+    now = time.monotonic()
+    if assets is not None and now - _last_check < settings.PROMPT_RELOAD_CHECK_SECONDS:
+        return assets
+    with _assets_lock:
+        if _assets is None:
+            _assets = _load()
+        elif now - _last_check >= settings.PROMPT_RELOAD_CHECK_SECONDS:
+            _stats["reload_checks"] += 1
+            if _signature() != _assets.signature:
+                _assets = _load()
+        _last_check = now
+        return _assets
+
+
+def reload_prompt_assets() -> None:
+    """Drop the loaded snapshot; the next call reloads from disk."""
+    global _assets
+    with _assets_lock:
+        _assets = None
+
+
+def get_system_prompt() -> str:
+    return _get_assets().system_prompt
+
+
+def get_template_instruction(profile_name: str) -> str:
+    """
+    Precompiled template-structure block for a random template of the profile's category
+    (falls back to "formal"); empty string if no templates exist.
+    """
+    blocks = _get_assets().template_blocks
+    category = get_template_category_from_profile_name(profile_name)
+    choices = blocks.get(category) or blocks.get("formal")
+    if not choices:
+        logger.warning(f"No templates available for category '{category}'")
+        return ""
+    name, block = random.choice(choices)
+    logger.info(f"Using template: {category}/{name}")
+    return block
+
+
+@lru_cache(maxsize=256)
+def get_typography_instruction(font_family: str, font_size: Any, line_height: Any) -> str:
+    return _TYPOGRAPHY.format(font_family=font_family, font_size=font_size, line_height=line_height)
+
+
+def _typography_from_preferences(user_ctx: Optional[Dict[str, Any]]) -> str:
+    preferences = user_ctx.get("preferences") if isinstance(user_ctx, dict) else None
+    if not isinstance(preferences, dict):
+        return ""
+    app_settings = preferences.get("appSettings", {})
+    print_props = app_settings.get("printProperties", {}) if isinstance(app_settings, dict) else {}
+    if not isinstance(print_props, dict) or not print_props:
+        return ""
+    font_family = print_props.get("fontFamily", "Times New Roman")
+    is_default_font = font_family and str(font_family).strip().lower() == "default"
+    if is_default_font or print_props.get("useDefaultFonts", False):
+        return ""
+    return get_typography_instruction(
+        str(font_family), print_props.get("fontSize", 12), print_props.get("lineHeight", 1.6)
+    )
+
+
+def build_critical_instructions(
+    selected_profile: str, profile_name: str, user_ctx: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Personality block, then (per feature flags and user preferences) the template structure,
+    typography baseline and DOCX components blocks.
+    """
+    parts = [_PERSONALITY_HEAD, selected_profile, _PERSONALITY_TAIL]
+    if settings.USE_TEMPLATE_IN_PROMPT:
+        parts.append(get_template_instruction(profile_name))
+    parts.append(_typography_from_preferences(user_ctx))
+    if settings.USE_DOCX_COMPONENTS:
+        parts.append(DOCX_COMPONENTS_INSTRUCTION)
+    return "".join(parts)
+
+
+def build_override_instructions(additional_instructions: Optional[str]) -> str:
+    """Final-override block for non-empty additional instructions (empty string otherwise)."""
+    if not additional_instructions or not additional_instructions.strip():
+        return ""
+    return _OVERRIDE_HEAD + additional_instructions + _OVERRIDE_TAIL
+
+
+def _context_lines(gen: Dict[str, Any]) -> List[str]:
+    return [
+        f"Hiring Manager: {gen['hiring_manager']}",
+        f"Company Name: {gen['company_name']}",
+        f"Ad Source: {gen['ad_source']}",
+    ]
+
+
+def split_full_text_prompt(gen: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Single-string prompt as (stable prefix, per-request rest). The prefix is the system prompt
+    and, with prompt caching, the resume.
+    """
+    rest = (
+        f"{gen['critical_instructions']}. {gen['message']}. "
+        + ". ".join(_context_lines(gen))
+        + gen["additional_instructions_text"]
+    )
+    resume_message = gen.get("resume_message")
+    if resume_message:
+        return f"{get_system_prompt()}\n\n{resume_message}\n", rest
+    return get_system_prompt(), rest
+
+
+def build_full_text_prompt(gen: Dict[str, Any]) -> str:
+    """Single-string prompt for providers without chat roles (Gemini, OCI)."""
+    prefix, rest = split_full_text_prompt(gen)
+    return prefix + rest
+
+
+def build_chat_messages(gen: Dict[str, Any], include_context: bool = True) -> List[Dict[str, str]]:
+    """
+    OpenAI-style messages: system prompt, (with prompt caching) resume, personality/instructions,
+    request data, then (optionally) one message per context line and the override instructions
+    last.
+    """
+    messages = [{"role": "system", "content": get_system_prompt()}]
+    if gen.get("resume_message"):
+        messages.append({"role": "user", "content": gen["resume_message"]})
+    messages.append({"role": "user", "content": gen["critical_instructions"].strip()})
+    messages.append({"role": "user", "content": gen["message"]})
+    if include_context:
+        messages.extend({"role": "user", "content": line} for line in _context_lines(gen))
+    if gen["additional_instructions_text"]:
+        messages.append({"role": "user", "content": gen["additional_instructions_text"].strip()})
+    return messages
+
+
+def build_claude_system(gen: Dict[str, Any]) -> Union[str, List[Dict[str, Any]]]:
+    """Anthropic system parameter; a cache_control text block when prompt caching is on."""
+    if gen.get("resume_message"):
+        return [{"type": "text", "text": get_system_prompt(), "cache_control": CACHE_CONTROL}]
+    return get_system_prompt()
+
+
+def build_claude_content(gen: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Anthropic user content blocks (the system prompt is passed separately). With prompt caching
+    the resume comes first and ends a cache breakpoint, so system + resume are read from the
+    cache on a user's repeat generations.
+    """
+    blocks: List[Dict[str, Any]] = []
+    if gen.get("resume_message"):
+        blocks.append({"type": "text", "text": gen["resume_message"], "cache_control": CACHE_CONTROL})
+    blocks.append({"type": "text", "text": gen["critical_instructions"].strip()})
+    blocks.append({"type": "text", "text": gen["message"]})
+    blocks.extend({"type": "text", "text": line} for line in _context_lines(gen))
+    if gen["additional_instructions_text"]:
+        blocks.append({"type": "text", "text": gen["additional_instructions_text"].strip()})
+    return blocks
+
+
+def get_prompt_assembly_stats() -> Dict[str, Any]:
+    assets = _assets
+    snapshot: Dict[str, Any] = dict(_stats)
+    snapshot["loaded"] = assets is not None
+    if assets is not None:
+        snapshot["system_prompt_chars"] = len(assets.system_prompt)
+        snapshot["templates"] = {c: [n for n, _ in v] for c, v in sorted(assets.template_blocks.items())}
+    snapshot["typography_cache"] = get_typography_instruction.cache_info()._asdict()
+    return snapshot
@@ -0,0 +1,319 @@
+"""
+Content-addressed cache for text extracted from resume PDFs.
+
+Extraction results are keyed by the SHA-256 of the PDF bytes (plus the extraction kind and
+EXTRACTOR_VERSION), so the same file is parsed once no matter which user, path or upload it
+arrived through. Text is stored in the shared TieredCache (L1 + Redis) and mirrored to local
+disk under RESUME_TEXT_CACHE_DIR, both with a long TTL (RESUME_TEXT_CACHE_TTL_SECONDS).
+
+For S3 objects the ETag of the last download is remembered alongside the content hash. A
+HEAD request that returns the same ETag means the object is unchanged, so the cached text is
+returned without downloading the PDF at all.
+
+Uploads are pre-extracted in the background: pre_extract_s3_pdf() stores the plain text and
+markdown in a sidecar object ({user_id}/.extracted/<file name>.json) tagged with the PDF's
+ETag, so the first generation after an upload reads a small JSON object instead of
+downloading and parsing the PDF, even after the Redis/disk entries have expired.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.utils.pdf_utils import read_pdf_from_bytes, read_pdf_markdown_from_bytes
+from app.utils.s3_utils import (
+    download_pdf_with_etag_from_s3,
+    get_s3_client,
+    get_s3_object_etag,
+    parse_s3_path,
+)
+from app.utils.tiered_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction output changes so old entries are not reused
+EXTRACTOR_VERSION = "2"
+
+_EXTRACTORS = {
+    "text": read_pdf_from_bytes,
+    "markdown": read_pdf_markdown_from_bytes,
+}
+
+_text_cache = TieredCache(
+    "resume_text_by_hash",
+    ttl_seconds=settings.RESUME_TEXT_CACHE_TTL_SECONDS,
+    l1_ttl_seconds=3600,
+    redis_prefix="cache:resume_text:",
+)
+# bucket/key -> {"etag", "sha256"} of the last downloaded version
+_etag_cache = TieredCache(
+    "resume_s3_etag",
+    ttl_seconds=settings.RESUME_TEXT_CACHE_TTL_SECONDS,
+    l1_ttl_seconds=3600,
+    redis_prefix="cache:resume_etag:",
+)
+
+_stats_lock = threading.Lock()
+_stats = {
+    "hits": 0,
+    "disk_hits": 0,
+    "extractions": 0,
+    "s3_downloads": 0,
+    "s3_downloads_skipped": 0,
+    "sidecar_hits": 0,
+    "pre_extractions": 0,
+}
+
+
+def _bump(field: str) -> None:
+    with _stats_lock:
+        _stats[field] += 1
+
+
+def pdf_content_hash(pdf_bytes: bytes) -> str:
+    """SHA-256 hex digest of the PDF bytes."""
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def _cache_key(digest: str, kind: str) -> str:
+    return f"v{EXTRACTOR_VERSION}:{kind}:{digest}"
+
+
+def _disk_path(digest: str, kind: str) -> Optional[str]:
+    if not settings.RESUME_TEXT_CACHE_DIR:
+        return None
+    return os.path.join(
+        settings.RESUME_TEXT_CACHE_DIR, digest[:2], f"{digest}.{kind}.v{EXTRACTOR_VERSION}.txt"
+    )
+
+
+def _read_disk(digest: str, kind: str) -> Optional[str]:
+    path = _disk_path(digest, kind)
+    if not path:
+        return None
+    try:
+        if time.time() - os.path.getmtime(path) > settings.RESUME_TEXT_CACHE_TTL_SECONDS:
+            os.remove(path)
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.debug(f"Resume text disk cache read failed for {digest[:12]}: {e}")
+        return None
+
+
+def _write_disk(digest: str, kind: str, text: str) -> None:
+    path = _disk_path(digest, kind)
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug(f"Resume text disk cache write failed for {digest[:12]}: {e}")
+
+
+def get_text_by_hash(digest: str, kind: str = "text") -> Optional[str]:
+    """Cached extraction for a PDF content hash (L1, Redis, then disk), or None."""
+    text = _text_cache.get_text(_cache_key(digest, kind))
+    if text is not None:
+        _bump("hits")
+        return text
+    text = _read_disk(digest, kind)
+    if text is not None:
+        _bump("disk_hits")
+        _text_cache.set_text(_cache_key(digest, kind), text)
+    return text
+
+
+def set_text_by_hash(digest: str, text: str, kind: str = "text") -> None:
+    _text_cache.set_text(_cache_key(digest, kind), text)
+    _write_disk(digest, kind, text)
+
+
+def extract_pdf_text_cached(
+    pdf_bytes: bytes, kind: str = "text", digest: Optional[str] = None
+) -> str:
+    """
+    Extract text from PDF bytes, reusing a previous extraction of identical bytes.
+
+    Args:
+        pdf_bytes: PDF file content
+        kind: "text" (PyPDF2) or "markdown" (PyMuPDF layout-aware)
+        digest: Precomputed pdf_content_hash(pdf_bytes), if the caller has it
+
+    Returns:
+        Extracted text (error placeholders from the extractor are returned but not cached)
+    """
+    digest = digest or pdf_content_hash(pdf_bytes)
+    text = get_text_by_hash(digest, kind)
+    if text is not None:
+        logger.info(f"Resume text cache hit for PDF {digest[:12]} ({kind})")
+        return text
+    _bump("extractions")
+    text = _EXTRACTORS[kind](pdf_bytes)
+    if text and not text.startswith("[Error reading PDF"):
+        set_text_by_hash(digest, text, kind)
+    return text
+
+
+def _etag_key(bucket: str, object_key: str) -> str:
+    return f"{bucket}/{object_key}"
+
+
+def sidecar_key(object_key: str) -> str:
+    """S3 key of the pre-extracted text for a PDF: <folder>/.extracted/<file name>.json"""
+    folder, _, filename = object_key.rpartition("/")
+    prefix = f"{folder}/" if folder else ""
+    return f"{prefix}.extracted/{filename}.json"
+
+
+def _read_sidecar(bucket: str, object_key: str, etag: str) -> Optional[Dict[str, Any]]:
+    """Sidecar for the given object version, or None if missing or stale."""
+    try:
+        response = get_s3_client().get_object(Bucket=bucket, Key=sidecar_key(object_key))
+        sidecar = json.loads(response["Body"].read())
+    except Exception as e:
+        logger.debug(f"No usable sidecar for {bucket}/{object_key}: {e}")
+        return None
+    if sidecar.get("etag") != etag or sidecar.get("extractor_version") != EXTRACTOR_VERSION:
+        return None
+    return sidecar
+
+
+def pre_extract_s3_pdf(
+    bucket: str, object_key: str, pdf_bytes: bytes, etag: Optional[str] = None
+) -> None:
+    """
+    Extract text and markdown for a freshly uploaded PDF and store them next to it.
+
+    Runs as a background task after /api/files/upload; failures are logged, never raised.
+
+    Args:
+        bucket: S3 bucket of the PDF
+        object_key: S3 key of the PDF
+        pdf_bytes: Uploaded PDF content
+        etag: ETag returned by put_object (looked up with HEAD if omitted)
+    """
+    try:
+        digest = pdf_content_hash(pdf_bytes)
+        text = extract_pdf_text_cached(pdf_bytes, kind="text", digest=digest)
+        if not text or text.startswith("[Error reading PDF"):
+            return
+        markdown = extract_pdf_text_cached(pdf_bytes, kind="markdown", digest=digest)
+        etag = etag or get_s3_object_etag(bucket, object_key)
+        if not etag:
+            return
+        sidecar = {
+            "etag": etag,
+            "sha256": digest,
+            "extractor_version": EXTRACTOR_VERSION,
+            "text": text,
+            "markdown": markdown,
+        }
+        get_s3_client().put_object(
+            Bucket=bucket,
+            Key=sidecar_key(object_key),
+            Body=json.dumps(sidecar).encode("utf-8"),
+            ContentType="application/json",
+        )
+        _etag_cache.set_json(_etag_key(bucket, object_key), {"etag": etag, "sha256": digest})
+        _bump("pre_extractions")
+        logger.info(f"Pre-extracted resume text for {object_key} ({len(text)} chars)")
+    except Exception as e:
+        logger.warning(f"Background resume extraction failed for {object_key}: {e}")
+
+
+def move_s3_sidecar(bucket: str, old_key: str, new_key: str) -> None:
+    """Carry a PDF's sidecar along when the PDF is renamed (copy + delete)."""
+    s3_client = get_s3_client()
+    try:
+        s3_client.copy_object(
+            CopySource={"Bucket": bucket, "Key": sidecar_key(old_key)},
+            Bucket=bucket,
+            Key=sidecar_key(new_key),
+        )
+    except Exception as e:
+        logger.debug(f"No sidecar copied for {old_key}: {e}")
+    known = _etag_cache.get_json(_etag_key(bucket, old_key))
+    if known:
+        _etag_cache.set_json(_etag_key(bucket, new_key), known)
+    delete_s3_sidecar(bucket, old_key)
+
+
+def delete_s3_sidecar(bucket: str, object_key: str) -> None:
+    """Remove a PDF's sidecar and ETag mapping (the hash-keyed text may still be shared)."""
+    _etag_cache.delete(_etag_key(bucket, object_key))
+    try:
+        get_s3_client().delete_object(Bucket=bucket, Key=sidecar_key(object_key))
+    except Exception as e:
+        logger.debug(f"Could not delete sidecar for {object_key}: {e}")
+
+
+def get_s3_pdf_text(s3_path: str, kind: str = "text") -> str:
+    """
+    Text of a PDF in S3 without downloading it when possible.
+
+    Order: cached text for the object's current ETag, then the upload-time sidecar, then a
+    full download and extraction.
+
+    Args:
+        s3_path: S3 path in format s3://bucket/key or bucket/key
+        kind: "text" or "markdown"
+
+    Returns:
+        Extracted text
+
+    Raises:
+        Exception: If the object cannot be read from S3
+    """
+    bucket, object_key = parse_s3_path(s3_path)
+    etag_key = _etag_key(bucket, object_key)
+    try:
+        current_etag = get_s3_object_etag(bucket, object_key)
+    except Exception as e:
+        logger.debug(f"HEAD failed for {etag_key}, downloading instead: {e}")
+        current_etag = None
+
+    if current_etag:
+        known = _etag_cache.get_json(etag_key)
+        if known and known.get("etag") == current_etag and known.get("sha256"):
+            text = get_text_by_hash(known["sha256"], kind)
+            if text is not None:
+                _bump("s3_downloads_skipped")
+                logger.info(f"S3 object unchanged (ETag {current_etag}), using cached text")
+                return text
+        sidecar = _read_sidecar(bucket, object_key, current_etag)
+        if sidecar and sidecar.get(kind):
+            _bump("sidecar_hits")
+            for sidecar_kind in _EXTRACTORS:
+                if sidecar.get(sidecar_kind):
+                    set_text_by_hash(sidecar["sha256"], sidecar[sidecar_kind], sidecar_kind)
+            _etag_cache.set_json(etag_key, {"etag": current_etag, "sha256": sidecar["sha256"]})
+            logger.info(f"Using pre-extracted text for {object_key}")
+            return sidecar[kind]
+
+    _bump("s3_downloads")
+    pdf_bytes, etag = download_pdf_with_etag_from_s3(f"{bucket}/{object_key}")
+    digest = pdf_content_hash(pdf_bytes)
+    text = extract_pdf_text_cached(pdf_bytes, kind=kind, digest=digest)
+    if etag:
+        _etag_cache.set_json(etag_key, {"etag": etag, "sha256": digest})
+    return text
+
+
+def get_resume_text_cache_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        return dict(_stats)
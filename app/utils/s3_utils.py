@@ -3,7 +3,8 @@ AWS S3 utilities for file management
 """
 import logging
 import os
-from typing import Optional
+import threading
+from typing import Optional, Tuple
 from botocore.exceptions import ClientError, NoCredentialsError
 
 from app.core.config import settings
@@ -19,9 +20,14 @@ except ImportError:
     logger.warning("boto3 not available. S3 operations will not work.")
 
 
+# boto3 clients are thread-safe; build one and reuse its connection pool
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
 def get_s3_client():
     """
-    Get S3 client with proper credentials
+    Get S3 client with proper credentials (created once and reused)
     
     Returns:
         boto3 S3 client instance
@@ -29,23 +35,85 @@ def get_s3_client():
     Raises:
         ImportError: If boto3 is not installed
     """
+    global _s3_client
+
     if not S3_AVAILABLE:
         raise ImportError("boto3 is not installed. Cannot access S3.")
 
-    # Create S3 client with credentials if provided, otherwise use default
-    if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-        logger.info("Using AWS credentials from environment variables")
-        return boto3.client(
-            "s3",
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION,
-        )
+    if _s3_client is not None:
+        return _s3_client
+
+    with _s3_client_lock:
+        if _s3_client is None:
+            # Create S3 client with credentials if provided, otherwise use default
+            if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
+                logger.info("Using AWS credentials from environment variables")
+                _s3_client = boto3.client(
+                    "s3",
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    region_name=settings.AWS_REGION,
+                )
+            else:
+                logger.info(
+                    "Using default AWS credentials (IAM role, credentials file, or environment)"
+                )
+                _s3_client = boto3.client("s3", region_name=settings.AWS_REGION)
+    return _s3_client
+
+
+def parse_s3_path(s3_path: str, bucket_name: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Split an S3 path into (bucket, key)
+    
+    Args:
+        s3_path: S3 path in format s3://bucket/key or bucket/key
+        bucket_name: Optional bucket name (if not in s3_path)
+        
+    Returns:
+        Tuple of (bucket, key)
+        
+    Raises:
+        ValueError: If the path or bucket cannot be resolved
+    """
+    if s3_path.startswith("s3://"):
+        s3_path = s3_path[5:]  # Remove 's3://' prefix
+
+    # Split bucket and key
+    parts = s3_path.split("/", 1)
+    if len(parts) == 2:
+        parsed_bucket = parts[0]
+        object_key = parts[1]
+    elif bucket_name:
+        parsed_bucket = bucket_name
+        object_key = s3_path
     else:
-        logger.info(
-            "Using default AWS credentials (IAM role, credentials file, or environment)"
+        raise ValueError(
+            f"Invalid S3 path format: {s3_path}. Expected format: bucket/key or s3://bucket/key"
         )
-        return boto3.client("s3", region_name=settings.AWS_REGION)
+
+    bucket = parsed_bucket or settings.AWS_S3_BUCKET
+    if not bucket:
+        raise ValueError("Bucket name is required")
+    return bucket, object_key
+
+
+def get_s3_object_etag(bucket_name: str, object_key: str) -> Optional[str]:
+    """
+    Get an object's ETag with a HEAD request (no body transfer)
+    
+    Returns:
+        ETag string without quotes, or None if the object does not exist
+    """
+    s3_client = get_s3_client()
+    try:
+        response = s3_client.head_object(Bucket=bucket_name, Key=object_key)
+    except ClientError as e:
+        error_code = e.response.get("Error", {}).get("Code", "Unknown")
+        if error_code in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+    return (response.get("ETag") or "").strip('"') or None
 
 
 def download_pdf_from_s3(s3_path: str, bucket_name: Optional[str] = None) -> bytes:
@@ -59,6 +127,26 @@ def download_pdf_from_s3(s3_path: str, bucket_name: Optional[str] = None) -> byt
     Returns:
         PDF file content as bytes
         
+    Raises:
+        Exception: If download fails
+    """
+    pdf_bytes, _ = download_pdf_with_etag_from_s3(s3_path, bucket_name)
+    return pdf_bytes
+
+
+def download_pdf_with_etag_from_s3(
+    s3_path: str, bucket_name: Optional[str] = None
+) -> Tuple[bytes, Optional[str]]:
+    """
+    Download PDF from S3 bucket and return its bytes and ETag
+    
+    Args:
+        s3_path: S3 path in format s3://bucket/key or bucket/key
+        bucket_name: Optional bucket name (if not in s3_path)
+        
+    Returns:
+        Tuple of (PDF file content, ETag without quotes or None)
+        
     Raises:
         Exception: If download fails
     """
@@ -66,26 +154,7 @@ def download_pdf_from_s3(s3_path: str, bucket_name: Optional[str] = None) -> byt
         raise ImportError("boto3 is not installed. Cannot download from S3.")
 
     try:
-        # Parse S3 path
-        if s3_path.startswith("s3://"):
-            s3_path = s3_path[5:]  # Remove 's3://' prefix
-
-        # Split bucket and key
-        parts = s3_path.split("/", 1)
-        if len(parts) == 2:
-            parsed_bucket = parts[0]
-            object_key = parts[1]
-        elif bucket_name:
-            parsed_bucket = bucket_name
-            object_key = s3_path
-        else:
-            raise ValueError(
-                f"Invalid S3 path format: {s3_path}. Expected format: bucket/key or s3://bucket/key"
-            )
-
-        bucket_name = parsed_bucket or settings.AWS_S3_BUCKET
-        if not bucket_name:
-            raise ValueError("Bucket name is required")
+        bucket_name, object_key = parse_s3_path(s3_path, bucket_name)
 
         logger.info(f"Downloading PDF from S3: bucket={bucket_name}, key={object_key}")
 
@@ -95,9 +164,10 @@ def download_pdf_from_s3(s3_path: str, bucket_name: Optional[str] = None) -> byt
         # Download the object
         response = s3_client.get_object(Bucket=bucket_name, Key=object_key)
         pdf_bytes = response["Body"].read()
+        etag = (response.get("ETag") or "").strip('"') or None
 
         logger.info(f"Successfully downloaded PDF from S3 ({len(pdf_bytes)} bytes)")
-        return pdf_bytes
+        return pdf_bytes, etag
 
     except NoCredentialsError:
         error_msg = (
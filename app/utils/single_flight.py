@@ -0,0 +1,207 @@
+"""
+Single-flight request coalescing for expensive, idempotent work (LLM generations).
+
+Identical generations share one upstream call instead of each paying for it:
+
+- In-process: the first caller for a key becomes the leader and runs the work; concurrent
+  callers with the same key wait on the leader's future and receive the same result.
+- Across processes: the leader also takes a short Redis lock (SET NX PX). Callers in other
+  workers that find the lock held subscribe to a completion channel, wait for the leader's
+  notification and then read the result from the shared cache. If the leader fails, the lock
+  expires or Redis is unavailable, they fall back to running the work themselves.
+- A local follower that waits longer than wait_timeout_seconds does the same: it reads the
+  shared cache and, on a miss, runs the work itself instead of failing the request.
+
+The work function is expected to write its result to the shared cache; lookup() reads it back.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.utils.redis_utils import get_redis_client
+from app.utils.tiered_cache import redis_breaker
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Delete the lock only if this process still owns it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution."""
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        lock_ttl_seconds: float,
+        wait_timeout_seconds: float,
+        distributed: bool = True,
+    ) -> None:
+        self.namespace = namespace
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self.distributed = distributed
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._stats = {
+            "leader_calls": 0,
+            "shared_local": 0,
+            "shared_remote": 0,
+            "remote_fallbacks": 0,
+            "local_fallbacks": 0,
+            "redis_errors": 0,
+        }
+
+    def _bump(self, field: str) -> None:
+        with self._lock:
+            self._stats[field] += 1
+
+    def _lock_key(self, key: str) -> str:
+        return f"singleflight:{self.namespace}:lock:{key}"
+
+    def _channel(self, key: str) -> str:
+        return f"singleflight:{self.namespace}:done:{key}"
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], T],
+        lookup: Optional[Callable[[], Optional[T]]] = None,
+    ) -> Tuple[T, bool]:
+        """
+        Run fn() once for all concurrent callers with the same key.
+
+        Args:
+            key: Coalescing key (e.g. the result cache key)
+            fn: Work to run; should populate the shared cache read by lookup
+            lookup: Reads a finished result from the shared cache (needed for cross-process sharing)
+
+        Returns:
+            (result, shared) - shared is True when the result came from another caller's execution
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            logger.info("Single-flight: joined in-flight call for %s", key)
+            try:
+                result = future.result(timeout=self.wait_timeout_seconds)
+            except FutureTimeoutError:
+                # The leader is slow, not failed: take its result if it has landed, else run it
+                self._bump("local_fallbacks")
+                logger.warning(
+                    "Single-flight: in-flight call for %s still running after %ss, running locally",
+                    key,
+                    self.wait_timeout_seconds,
+                )
+                result = lookup() if lookup is not None else None
+                if result is not None:
+                    return result, True
+                return fn(), False
+            self._bump("shared_local")
+            return result, True
+
+        try:
+            result, shared = self._run_leader(key, fn, lookup)
+            future.set_result(result)
+            return result, shared
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _run_leader(
+        self, key: str, fn: Callable[[], T], lookup: Optional[Callable[[], Optional[T]]]
+    ) -> Tuple[T, bool]:
+        client = None
+        token = uuid.uuid4().hex
+        if self.distributed and lookup is not None and redis_breaker.allow():
+            try:
+                client = get_redis_client()
+                acquired = client.set(
+                    self._lock_key(key), token, nx=True, px=int(self.lock_ttl_seconds * 1000)
+                )
+                redis_breaker.record_success()
+            except Exception as e:
+                self._bump("redis_errors")
+                redis_breaker.record_failure(e)
+                logger.debug(f"Single-flight lock unavailable, running locally: {e}")
+                client = None
+                acquired = True
+            if not acquired:
+                result = self._wait_for_remote(client, key, lookup)
+                if result is not None:
+                    self._bump("shared_remote")
+                    return result, True
+                self._bump("remote_fallbacks")
+
+        self._bump("leader_calls")
+        try:
+            return fn(), False
+        finally:
+            if client is not None:
+                try:
+                    client.eval(_RELEASE_LOCK_SCRIPT, 1, self._lock_key(key), token)
+                    client.publish(self._channel(key), "done")
+                except Exception as e:
+                    self._bump("redis_errors")
+                    logger.debug(f"Single-flight release/notify failed for {key}: {e}")
+
+    def _wait_for_remote(
+        self, client: Any, key: str, lookup: Callable[[], Optional[T]]
+    ) -> Optional[T]:
+        """Wait for another process's leader to finish, then read its result from the cache."""
+        deadline = time.monotonic() + self.wait_timeout_seconds
+        pubsub = None
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self._channel(key))
+            logger.info("Single-flight: waiting on another worker's call for %s", key)
+            while time.monotonic() < deadline:
+                # Re-check between waits: covers a finish before we subscribed and an expired lock
+                result = lookup()
+                if result is not None:
+                    return result
+                if not client.exists(self._lock_key(key)):
+                    return lookup()
+                message = pubsub.get_message(timeout=min(1.0, max(0.0, deadline - time.monotonic())))
+                if message and message.get("type") == "message":
+                    return lookup()
+        except Exception as e:
+            self._bump("redis_errors")
+            logger.debug(f"Single-flight wait failed for {key}: {e}")
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus the number of upstream calls avoided."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["in_flight"] = len(self._in_flight)
+        snapshot["deduplicated"] = snapshot["shared_local"] + snapshot["shared_remote"]
+        return snapshot
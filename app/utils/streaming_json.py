@@ -0,0 +1,288 @@
+"""
+Incremental, tolerant parser for the JSON object an LLM returns.
+
+The generation prompt asks for a single JSON object (content / document_xml / markdown + html),
+but replies are often wrapped in ``` fences or prose, contain raw newlines inside strings, or are
+cut off by the output token limit. StreamingJSONParser consumes the reply in one pass, either
+chunk by chunk as the provider streams it (feed()) or all at once (parse_llm_json()):
+
+- text before the first "{" (fences, prose) and after the matching "}" is ignored
+- raw control characters inside strings and trailing commas are accepted
+- each top-level field is reported to on_field as soon as its value is complete, so a client
+  can get the finished "content" before the reply has ended
+- on a truncated reply, finish() keeps the completed fields, decodes the string that was being
+  read up to the cut and closes the open containers; nothing is re-scanned
+
+String bodies are located with a regex and decoded with the json module's scanner, so the
+per-character work runs in C; the Python state machine only handles structure.
+"""
+from __future__ import annotations
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Callable, Dict, List, Optional
+
+# Body of a JSON string up to (not including) the closing quote; stops before a lone trailing
+# backslash so a split escape is resumed once the next chunk arrives
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+_WHITESPACE = re.compile(r"\s*")
+# Bare token: number, true, false, null (or garbage, rejected when decoded)
+_BARE_TOKEN = re.compile(r'[^\s,:\[\]{}"]+')
+# Longest prefix of a string body made of complete characters and escapes (truncation recovery)
+_COMPLETE_BODY = re.compile(r'[^"\\]*(?:(?:\\u[0-9a-fA-F]{4}|\\[^u])[^"\\]*)*', re.DOTALL)
+_ESCAPE = re.compile(r'\\(u[0-9a-fA-F]{4}|["\\/bfnrt]|.?)', re.DOTALL)
+
+# Parser modes
+_SEEK = 0  # before the top-level "{"
+_VALUE = 1  # expecting a value (after ":" or "," in an array, or right after "[")
+_KEY = 2  # expecting a key or "}" in an object
+_COLON = 3  # expecting ":" after a key
+_AFTER = 4  # expecting "," or the container's closing bracket
+_STRING = 5  # inside a string (key or value)
+_DONE = 6  # top-level object closed
+_FAILED = 7  # syntax error; the rest of the input is ignored
+
+
+def _keep_escape(match: "re.Match[str]") -> str:
+    escape = match.group(1)
+    if len(escape) == 5 or (len(escape) == 1 and escape in '"\\/bfnrt'):
+        return match.group(0)
+    return "\\\\" + escape
+
+
+def _decode_string(raw: str) -> str:
+    """Decode a JSON string body (without quotes), keeping invalid escapes as literal text."""
+    try:
+        return scanstring(raw + '"', 0, False)[0]
+    except ValueError:
+        return scanstring(_ESCAPE.sub(_keep_escape, raw) + '"', 0, False)[0]
+
+
+class _Frame:
+    __slots__ = ("container", "name", "key")
+
+    def __init__(self, container: Any, name: Optional[str]) -> None:
+        self.container = container
+        # Key of this container in its parent object (None for the root and array items)
+        self.name = name
+        # Object frames: key waiting for its value
+        self.key: Optional[str] = None
+
+
+class StreamingJSONParser:
+    """
+    Single-pass parser for the first JSON object in a (possibly streamed) LLM reply.
+
+    Usage:
+        parser = StreamingJSONParser(on_field=lambda name, value: ...)
+        for chunk in chunks:
+            parser.feed(chunk)
+        result = parser.finish()
+    """
+
+    def __init__(self, on_field: Optional[Callable[[str, Any], None]] = None) -> None:
+        self.on_field = on_field
+        self.truncated = False
+        self.error: Optional[str] = None
+        self._buf = ""
+        self._pos = 0
+        self._mode = _SEEK
+        self._stack: List[_Frame] = []
+        self._root: Optional[Dict[str, Any]] = None
+        # Current string: start offset of its body, scan position, and whether it is a key
+        self._str_start = 0
+        self._str_scan = 0
+        self._str_is_key = False
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level object has been closed."""
+        return self._mode == _DONE
+
+    def feed(self, chunk: str) -> None:
+        """Consume the next piece of the reply."""
+        if not chunk or self._mode in (_DONE, _FAILED):
+            return
+        keep = self._str_start if self._mode == _STRING else self._pos
+        if keep:
+            # Drop consumed input so the buffer only holds the unfinished token
+            self._buf = self._buf[keep:]
+            self._pos -= keep
+            if self._mode == _STRING:
+                self._str_start -= keep
+                self._str_scan -= keep
+        self._buf += chunk
+        self._parse()
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        End of input: return the top-level object, recovering a truncated reply.
+
+        Raises:
+            json.JSONDecodeError: no object was found, or nothing could be recovered from it
+        """
+        if self._mode not in (_DONE, _FAILED) and self._root is not None:
+            self.truncated = True
+            if self._mode == _STRING and not self._str_is_key:
+                value = _decode_string(_COMPLETE_BODY.match(self._buf, self._str_start).group())
+                if value and "\ud800" <= value[-1] <= "\udbff":
+                    # Cut between the two halves of a surrogate pair
+                    value = value[:-1]
+                # Not reported to on_field: the value is cut off, not complete
+                self._add_value(value, complete=False)
+            elif self._mode == _VALUE:
+                self._flush_bare_token(final=True, report=False)
+            self._stack.clear()
+        if self._root is None:
+            raise json.JSONDecodeError("No JSON object found in LLM response", self._buf, 0)
+        if not self._root and self._mode != _DONE:
+            raise json.JSONDecodeError(
+                self.error or "Unterminated JSON object", self._buf, self._pos
+            )
+        return self._root
+
+    # --- internals --------------------------------------------------------------------------
+
+    def _fail(self, message: str) -> None:
+        self.error = message
+        self._mode = _FAILED
+
+    def _add_value(self, value: Any, complete: bool = True) -> None:
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict):
+            frame.container[frame.key] = value
+            if complete and len(self._stack) == 1 and self.on_field is not None:
+                self.on_field(frame.key, value)
+            frame.key = None
+        else:
+            frame.container.append(value)
+        self._mode = _AFTER
+
+    def _open(self, container: Any) -> None:
+        name = None
+        if self._stack:
+            name = self._stack[-1].key
+            self._add_value(container, complete=False)
+        self._stack.append(_Frame(container, name))
+        self._mode = _KEY if isinstance(container, dict) else _VALUE
+
+    def _close(self) -> None:
+        frame = self._stack.pop()
+        if not self._stack:
+            self._mode = _DONE
+            return
+        self._mode = _AFTER
+        # Nested containers are reported once they are closed
+        if len(self._stack) == 1 and frame.name is not None and self.on_field is not None:
+            self.on_field(frame.name, frame.container)
+
+    def _flush_bare_token(self, final: bool, report: bool = True) -> bool:
+        """Decode a number/true/false/null at the current position; False if more input is needed."""
+        match = _BARE_TOKEN.match(self._buf, self._pos)
+        if match is None:
+            return True
+        if match.end() == len(self._buf) and not final:
+            return False
+        try:
+            value = json.loads(match.group())
+        except ValueError:
+            if not final:
+                self._fail(f"Invalid value {match.group()[:20]!r}")
+            return True
+        self._pos = match.end()
+        self._add_value(value, complete=report)
+        return True
+
+    def _parse(self) -> None:
+        buf = self._buf
+        end = len(buf)
+        while self._pos < end or self._mode == _STRING:
+            mode = self._mode
+            if mode == _STRING:
+                self._str_scan = _STRING_BODY.match(buf, self._str_scan).end()
+                if self._str_scan >= end or buf[self._str_scan] != '"':
+                    # Needs more input (possibly an escape split across chunks)
+                    return
+                self._pos = self._str_scan + 1
+                try:
+                    value = scanstring(buf, self._str_start, False)[0]
+                except ValueError:
+                    value = _decode_string(buf[self._str_start:self._str_scan])
+                if self._str_is_key:
+                    self._stack[-1].key = value
+                    self._mode = _COLON
+                else:
+                    self._add_value(value)
+                continue
+            if mode == _SEEK:
+                start = buf.find("{", self._pos)
+                if start < 0:
+                    self._pos = end
+                    return
+                self._pos = start + 1
+                self._root = {}
+                self._open(self._root)
+                continue
+            if mode in (_DONE, _FAILED):
+                return
+            char = buf[self._pos]
+            if char.isspace():
+                self._pos = _WHITESPACE.match(buf, self._pos).end()
+                if self._pos >= end:
+                    return
+                char = buf[self._pos]
+            if mode == _KEY:
+                if char == '"':
+                    self._begin_string(is_key=True)
+                elif char == "}":
+                    self._pos += 1
+                    self._close()
+                else:
+                    self._fail(f"Expecting property name, got {char!r}")
+            elif mode == _COLON:
+                if char == ":":
+                    self._pos += 1
+                    self._mode = _VALUE
+                else:
+                    self._fail(f"Expecting ':', got {char!r}")
+            elif mode == _VALUE:
+                if char == '"':
+                    self._begin_string(is_key=False)
+                elif char == "{":
+                    self._pos += 1
+                    self._open({})
+                elif char == "[":
+                    self._pos += 1
+                    self._open([])
+                elif char == "]" and isinstance(self._stack[-1].container, list):
+                    # Empty array or trailing comma
+                    self._pos += 1
+                    self._close()
+                elif not self._flush_bare_token(final=False):
+                    return
+                elif self._mode == _VALUE:
+                    self._fail(f"Expecting value, got {char!r}")
+            elif mode == _AFTER:
+                container = self._stack[-1].container
+                if char == ",":
+                    self._pos += 1
+                    self._mode = _KEY if isinstance(container, dict) else _VALUE
+                elif char == ("}" if isinstance(container, dict) else "]"):
+                    self._pos += 1
+                    self._close()
+                else:
+                    self._fail(f"Expecting ',' or end of container, got {char!r}")
+
+    def _begin_string(self, is_key: bool) -> None:
+        self._pos += 1
+        self._str_start = self._str_scan = self._pos
+        self._str_is_key = is_key
+        self._mode = _STRING
+
+
+def parse_llm_json(text: str, on_field: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+    """Parse (and if needed recover) the JSON object in a complete LLM reply."""
+    parser = StreamingJSONParser(on_field=on_field)
+    parser.feed(text)
+    return parser.finish()
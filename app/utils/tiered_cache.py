@@ -0,0 +1,250 @@
+"""
+Two-tier cache: L1 in-process (LocalCache) in front of L2 Redis, guarded by a circuit breaker.
+
+Reads check L1, then Redis (filling L1 on a hit); writes go to both. Redis failures are
+counted by a shared circuit breaker: after CACHE_BREAKER_FAILURE_THRESHOLD consecutive
+failures it opens and every cache skips Redis (L1 only, no added latency). While open, a
+background thread PINGs Redis every CACHE_BREAKER_RESET_SECONDS and closes the breaker once
+Redis answers again.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.utils.local_cache import LocalCache
+from app.utils.redis_utils import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a background recovery probe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int,
+        reset_seconds: float,
+        probe: Callable[[], Any],
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._probe = probe
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._trips = 0
+        self._short_circuited = 0
+        self._prober: Optional[threading.Thread] = None
+
+    def allow(self) -> bool:
+        """True if calls should go through; counts short-circuited calls while open."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            self._short_circuited += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+
+    def record_failure(self, error: BaseException) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            self._last_error = str(error)
+            if self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trips += 1
+                logger.warning(
+                    f"Circuit breaker '{self.name}' opened after "
+                    f"{self._consecutive_failures} failures: {error}"
+                )
+                self._start_prober()
+
+    def _start_prober(self) -> None:
+        # Caller holds self._lock
+        if self._prober is not None and self._prober.is_alive():
+            return
+        self._prober = threading.Thread(
+            target=self._probe_loop, name=f"breaker-probe-{self.name}", daemon=True
+        )
+        self._prober.start()
+
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(max(0.1, self.reset_seconds))
+            try:
+                self._probe()
+            except Exception as e:
+                with self._lock:
+                    self._last_error = str(e)
+                logger.debug(f"Circuit breaker '{self.name}' probe failed: {e}")
+                continue
+            with self._lock:
+                self._state = self.CLOSED
+                self._consecutive_failures = 0
+                self._opened_at = None
+            logger.info(f"Circuit breaker '{self.name}' closed (probe succeeded)")
+            return
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "open_for_seconds": (
+                    round(time.monotonic() - self._opened_at, 1) if self._opened_at else 0.0
+                ),
+                "trips": self._trips,
+                "short_circuited": self._short_circuited,
+                "last_error": self._last_error,
+            }
+
+
+def _probe_redis() -> None:
+    get_redis_client().ping()
+
+
+# Shared by every TieredCache: one Redis, one view of its health
+redis_breaker = CircuitBreaker(
+    "redis",
+    failure_threshold=settings.CACHE_BREAKER_FAILURE_THRESHOLD,
+    reset_seconds=settings.CACHE_BREAKER_RESET_SECONDS,
+    probe=_probe_redis,
+)
+
+_caches: Dict[str, "TieredCache"] = {}
+
+
+class TieredCache:
+    """L1 LocalCache + L2 Redis cache for text or JSON values under one key namespace."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        ttl_seconds: float,
+        l1_ttl_seconds: Optional[float] = None,
+        l1_max_entries: Optional[int] = None,
+        l1_max_bytes: Optional[int] = None,
+        redis_prefix: str = "cache:",
+        breaker: CircuitBreaker = redis_breaker,
+    ) -> None:
+        """
+        Args:
+            name: Label for stats (also the L1 cache name)
+            ttl_seconds: Redis TTL
+            l1_ttl_seconds: In-process TTL (defaults to ttl_seconds; use a shorter value for
+                data other workers may update)
+            redis_prefix: Prefix added to keys in Redis
+        """
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.l1_ttl_seconds = l1_ttl_seconds if l1_ttl_seconds is not None else ttl_seconds
+        self.redis_prefix = redis_prefix
+        self.breaker = breaker
+        self.l1 = LocalCache(
+            name,
+            max_entries=l1_max_entries,
+            max_bytes=l1_max_bytes,
+            default_ttl=self.l1_ttl_seconds,
+        )
+        self._stats_lock = threading.Lock()
+        self._l2_hits = 0
+        self._l2_misses = 0
+        self._l2_errors = 0
+        _caches[name] = self
+
+    def _bump(self, field: str) -> None:
+        with self._stats_lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def _redis_call(self, op: Callable[[Any], Any]) -> Any:
+        """Run op(client) unless the breaker is open; returns None on skip or failure."""
+        if not self.breaker.allow():
+            return None
+        try:
+            result = op(get_redis_client())
+        except Exception as e:
+            self._bump("_l2_errors")
+            self.breaker.record_failure(e)
+            return None
+        self.breaker.record_success()
+        return result
+
+    def get_text(self, key: str) -> Optional[str]:
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+        raw = self._redis_call(lambda c: c.get(f"{self.redis_prefix}{key}"))
+        if raw is None:
+            self._bump("_l2_misses")
+            return None
+        self._bump("_l2_hits")
+        self.l1.set(key, raw)
+        return raw
+
+    def set_text(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        self.l1.set(key, value, ttl=min(ttl, self.l1_ttl_seconds))
+        self._redis_call(
+            lambda c: c.setex(f"{self.redis_prefix}{key}", timedelta(seconds=ttl), value)
+        )
+
+    def get_json(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached dict (callers may mutate it)."""
+        value = self.l1.get(key)
+        if value is not None:
+            return dict(value)
+        raw = self._redis_call(lambda c: c.get(f"{self.redis_prefix}{key}"))
+        if raw is None:
+            self._bump("_l2_misses")
+            return None
+        try:
+            value = json.loads(raw)
+        except (TypeError, ValueError):
+            self._bump("_l2_misses")
+            return None
+        self._bump("_l2_hits")
+        self.l1.set(key, value)
+        return dict(value)
+
+    def set_json(self, key: str, value: Dict[str, Any], ttl_seconds: Optional[float] = None) -> None:
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        self.l1.set(key, dict(value), ttl=min(ttl, self.l1_ttl_seconds))
+        payload = json.dumps(value, default=str)
+        self._redis_call(
+            lambda c: c.setex(f"{self.redis_prefix}{key}", timedelta(seconds=ttl), payload)
+        )
+
+    def delete(self, key: str) -> None:
+        self.l1.delete(key)
+        self._redis_call(lambda c: c.delete(f"{self.redis_prefix}{key}"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            l2 = {"hits": self._l2_hits, "misses": self._l2_misses, "errors": self._l2_errors}
+        return {"l1": self.l1.stats(), "l2": l2}
+
+
+def get_tiered_cache_stats() -> Dict[str, Any]:
+    """Breaker state plus per-cache L1/L2 stats."""
+    return {
+        "redis_breaker": redis_breaker.status(),
+        "caches": {name: cache.stats() for name, cache in _caches.items()},
+    }
@@ -14,14 +14,16 @@ Usage:
     )
 """
 
+import asyncio
 import json
 import re
 import logging
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
 
 # Configure logging first
 logger = logging.getLogger(__name__)
@@ -37,6 +39,38 @@ except ImportError:
         "OpenAI not available - ChatGPT extraction will be skipped. Install openai to enable ChatGPT extraction."
     )
 
+# Shared, pooled provider clients when running inside the API app
+try:
+    from app.utils.llm_clients import get_openai_client
+except ImportError:
+    get_openai_client = None
+
+# Async pooled page fetcher with the shared page cache (API app only; needs httpx)
+try:
+    import httpx
+
+    from app.utils.page_fetcher import fetch_page
+except ImportError:
+    fetch_page = None
+
+# Shared extraction results keyed by posting (API app only)
+try:
+    from app.utils.job_extraction_cache import cached_job_extraction
+except ImportError:
+    cached_job_extraction = None
+
+# HTML distillation / JSON-LD shortcut before the LLM call (API app only; needs lxml)
+try:
+    from app.core.config import settings as app_settings
+    from app.utils.job_html_distiller import (
+        distill_job_html,
+        parse_html_document,
+        record_llm_skipped,
+    )
+except ImportError:
+    distill_job_html = None
+    parse_html_document = None
+
 token_limit = 100000
 
 
@@ -74,18 +108,61 @@ class JobExtractionResult:
         )
 
 
+_RE_NS = {"re": "http://exslt.org/regular-expressions"}
+# Visible text nodes (script / style contents and comments are not text() nodes of interest)
+_TEXT_NODES = etree.XPath("descendant-or-self::text()[not(ancestor::script) and not(ancestor::style)]")
+_JSON_LD = etree.XPath("//script[@type='application/ld+json']")
+
+
+def _xpath(expression: str) -> etree.XPath:
+    """Compile an XPath once (EXSLT regular expressions available as re:test)."""
+    return etree.XPath(expression, namespaces=_RE_NS)
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate equivalent to the CSS class selector .name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _first(selectors: Tuple[etree.XPath, ...], doc) -> Optional["lxml.html.HtmlElement"]:
+    """First element matched by the first selector (in priority order) that matches."""
+    for selector in selectors:
+        found = selector(doc)
+        if found:
+            return found[0]
+    return None
+
+
+def _text(element) -> str:
+    """Element text like BeautifulSoup get_text(strip=True): stripped strings joined, scripts, styles and comments skipped."""
+    return "".join(s.strip() for s in _TEXT_NODES(element))
+
+
+def _parse_document(html: str):
+    """Parse HTML with lxml (bytes if the markup carries an XML encoding declaration)."""
+    if parse_html_document is not None:
+        doc = parse_html_document(html)
+        if doc is None:
+            raise ValueError("Document is empty")
+        return doc
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        return lxml.html.document_fromstring(html.encode("utf-8"))
+
+
 class BaseJobParser:
-    """Base class for job parsers"""
+    """Base class for job parsers (stateless; one shared instance per site)"""
 
-    def parse(self, soup: BeautifulSoup, url: str) -> JobExtractionResult:
-        """Parse job information from BeautifulSoup object"""
+    def parse(self, doc: "lxml.html.HtmlElement", url: str) -> JobExtractionResult:
+        """Parse job information from an lxml document"""
         raise NotImplementedError("Subclasses must implement parse()")
 
 
 class LinkedInParser(BaseJobParser):
     """Parser for LinkedIn job postings"""
 
-    def parse(self, soup: BeautifulSoup, url: str) -> JobExtractionResult:
+    def parse(self, doc: "lxml.html.HtmlElement", url: str) -> JobExtractionResult:
         """
         LinkedIn parser - SIMPLIFIED: Now relies on Grok LLM for extraction.
         This method returns an empty result to force fallback to Grok extraction.
@@ -415,16 +492,32 @@ class LinkedInParser(BaseJobParser):
 class IndeedParser(BaseJobParser):
     """Parser for Indeed job postings"""
 
-    def parse(self, soup: BeautifulSoup, url: str) -> JobExtractionResult:
+    COMPANY = (
+        _xpath('(//*[@data-testid="job-poster-name"])[1]'),
+        _xpath('(//*[@data-testid="inlineHeader-companyName"])[1]'),
+        _xpath(f"(//*[{_has_class('jobsearch-InlineCompanyRating')}])[1]"),
+        _xpath('(//a[@data-testid="company-name"])[1]'),
+    )
+    TITLE = (
+        _xpath(f"(//h1[{_has_class('jobTitle')}])[1]"),
+        _xpath('(//h1[@data-testid="job-title"])[1]'),
+        _xpath(f"(//*[{_has_class('jobsearch-JobInfoHeader-title')}])[1]"),
+    )
+    DESCRIPTION = (
+        _xpath('(//*[@id="jobDescriptionText"])[1]'),
+        _xpath('(//*[@data-testid="job-description"])[1]'),
+        _xpath(f"(//*[{_has_class('jobsearch-jobDescriptionText')}])[1]"),
+    )
+
+    def parse(self, doc: "lxml.html.HtmlElement", url: str) -> JobExtractionResult:
         result = JobExtractionResult()
         result.method = "beautifulsoup-indeed"
 
         try:
             # Try JSON-LD structured data first
-            json_ld_scripts = soup.find_all("script", type="application/ld+json")
-            for script in json_ld_scripts:
+            for script in _JSON_LD(doc):
                 try:
-                    data = json.loads(script.string)
+                    data = json.loads(script.text)
                     if isinstance(data, dict) and data.get("@type") == "JobPosting":
                         result.company = data.get("hiringOrganization", {}).get("name")
                         result.job_title = data.get("title")
@@ -432,45 +525,20 @@ class IndeedParser(BaseJobParser):
                         if result.has_minimum_data():
                             result.is_complete = True
                             return result
-                except (json.JSONDecodeError, AttributeError):
+                except (json.JSONDecodeError, AttributeError, TypeError):
                     continue
 
-            # Company name
-            company_selectors = [
-                '[data-testid="job-poster-name"]',
-                '[data-testid="inlineHeader-companyName"]',
-                ".jobsearch-InlineCompanyRating",
-                'a[data-testid="company-name"]',
-            ]
-            for selector in company_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    result.company = element.get_text(strip=True)
-                    break
-
-            # Job title
-            title_selectors = [
-                "h1.jobTitle",
-                'h1[data-testid="job-title"]',
-                ".jobsearch-JobInfoHeader-title",
-            ]
-            for selector in title_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    result.job_title = element.get_text(strip=True)
-                    break
-
-            # Job description
-            desc_selectors = [
-                "#jobDescriptionText",
-                '[data-testid="job-description"]',
-                ".jobsearch-jobDescriptionText",
-            ]
-            for selector in desc_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    result.job_description = element.get_text(strip=True)
-                    break
+            element = _first(self.COMPANY, doc)
+            if element is not None:
+                result.company = _text(element)
+
+            element = _first(self.TITLE, doc)
+            if element is not None:
+                result.job_title = _text(element)
+
+            element = _first(self.DESCRIPTION, doc)
+            if element is not None:
+                result.job_description = _text(element)
 
             result.is_complete = result.has_minimum_data()
 
@@ -483,16 +551,31 @@ class IndeedParser(BaseJobParser):
 class GlassdoorParser(BaseJobParser):
     """Parser for Glassdoor job postings"""
 
-    def parse(self, soup: BeautifulSoup, url: str) -> JobExtractionResult:
+    COMPANY = (
+        _xpath('(//*[@data-test="employer-name"])[1]'),
+        _xpath(f"(//*[{_has_class('employerName')}])[1]"),
+        _xpath(f"(//*[{_has_class('jobInfoItem')} and {_has_class('employer')}])[1]"),
+    )
+    TITLE = (
+        _xpath('(//h1[@data-test="job-title"])[1]'),
+        _xpath(f"(//*[{_has_class('jobTitle')}])[1]"),
+        _xpath(f"(//h1[{_has_class('jobTitle')}])[1]"),
+    )
+    DESCRIPTION = (
+        _xpath('(//*[@data-test="job-description"])[1]'),
+        _xpath(f"(//*[{_has_class('jobDescriptionContent')}])[1]"),
+        _xpath('(//*[@id="JobDescriptionContainer"])[1]'),
+    )
+
+    def parse(self, doc: "lxml.html.HtmlElement", url: str) -> JobExtractionResult:
         result = JobExtractionResult()
         result.method = "beautifulsoup-glassdoor"
 
         try:
             # Try JSON-LD structured data first
-            json_ld_scripts = soup.find_all("script", type="application/ld+json")
-            for script in json_ld_scripts:
+            for script in _JSON_LD(doc):
                 try:
-                    data = json.loads(script.string)
+                    data = json.loads(script.text)
                     if isinstance(data, dict) and data.get("@type") == "JobPosting":
                         result.company = data.get("hiringOrganization", {}).get("name")
                         result.job_title = data.get("title")
@@ -500,40 +583,20 @@ class GlassdoorParser(BaseJobParser):
                         if result.has_minimum_data():
                             result.is_complete = True
                             return result
-                except (json.JSONDecodeError, AttributeError):
+                except (json.JSONDecodeError, AttributeError, TypeError):
                     continue
 
-            # Company name
-            company_selectors = [
-                '[data-test="employer-name"]',
-                ".employerName",
-                ".jobInfoItem.employer",
-            ]
-            for selector in company_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    result.company = element.get_text(strip=True)
-                    break
-
-            # Job title
-            title_selectors = ['h1[data-test="job-title"]', ".jobTitle", "h1.jobTitle"]
-            for selector in title_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    result.job_title = element.get_text(strip=True)
-                    break
-
-            # Job description
-            desc_selectors = [
-                '[data-test="job-description"]',
-                ".jobDescriptionContent",
-                "#JobDescriptionContainer",
-            ]
-            for selector in desc_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    result.job_description = element.get_text(strip=True)
-                    break
+            element = _first(self.COMPANY, doc)
+            if element is not None:
+                result.company = _text(element)
+
+            element = _first(self.TITLE, doc)
+            if element is not None:
+                result.job_title = _text(element)
+
+            element = _first(self.DESCRIPTION, doc)
+            if element is not None:
+                result.job_description = _text(element)
 
             result.is_complete = result.has_minimum_data()
 
@@ -546,16 +609,40 @@ class GlassdoorParser(BaseJobParser):
 class GenericParser(BaseJobParser):
     """Generic parser that tries common patterns and structured data"""
 
-    def parse(self, soup: BeautifulSoup, url: str) -> JobExtractionResult:
+    OG_COMPANY = _xpath('(//meta[@property="og:company"])[1]/@content')
+    OG_TITLE = _xpath('(//meta[@property="og:title"])[1]/@content')
+    OG_DESCRIPTION = _xpath('(//meta[@property="og:description"])[1]/@content')
+    META_COMPANY = (_xpath('(//meta[@name="company"])[1]'), _xpath('(//meta[@name="organization"])[1]'))
+    META_TITLE = (_xpath('(//meta[@name="title"])[1]'), _xpath("(//title)[1]"))
+    META_DESCRIPTION = _xpath('(//meta[@name="description"])[1]/@content')
+    # Class / id patterns, matched case-insensitively like re.compile(..., re.I)
+    COMPANY = (
+        _xpath("(//*[re:test(@class, 'company', 'i')])[1]"),
+        _xpath("(//*[re:test(@class, 'employer', 'i')])[1]"),
+        _xpath("(//*[re:test(@class, 'organization', 'i')])[1]"),
+    )
+    TITLE = (
+        _xpath("(//h1)[1]"),
+        _xpath("(//*[re:test(@class, 'job.*title', 'i')])[1]"),
+        _xpath("(//*[re:test(@class, 'position', 'i')])[1]"),
+    )
+    DESCRIPTION = (
+        _xpath("(//*[re:test(@id, 'description', 'i')])[1]"),
+        _xpath("(//*[re:test(@class, 'description', 'i')])[1]"),
+        _xpath("(//*[re:test(@class, 'job.*description', 'i')])[1]"),
+        _xpath("(//main)[1]"),
+        _xpath("(//article)[1]"),
+    )
+
+    def parse(self, doc: "lxml.html.HtmlElement", url: str) -> JobExtractionResult:
         result = JobExtractionResult()
         result.method = "beautifulsoup-generic"
 
         try:
             # 1. Try JSON-LD structured data (most reliable)
-            json_ld_scripts = soup.find_all("script", type="application/ld+json")
-            for script in json_ld_scripts:
+            for script in _JSON_LD(doc):
                 try:
-                    data = json.loads(script.string)
+                    data = json.loads(script.text)
                     if isinstance(data, dict):
                         # Handle both single objects and arrays
                         if data.get("@type") == "JobPosting":
@@ -581,77 +668,58 @@ class GenericParser(BaseJobParser):
                     continue
 
             # 2. Try Open Graph meta tags
-            og_company = soup.find("meta", property="og:company")
-            if og_company and og_company.get("content"):
-                result.company = og_company["content"]
-
-            og_title = soup.find("meta", property="og:title")
-            if og_title and og_title.get("content"):
-                result.job_title = og_title["content"]
-
-            og_description = soup.find("meta", property="og:description")
-            if og_description and og_description.get("content"):
-                result.job_description = og_description["content"]
+            for selector, field in (
+                (self.OG_COMPANY, "company"),
+                (self.OG_TITLE, "job_title"),
+                (self.OG_DESCRIPTION, "job_description"),
+            ):
+                values = selector(doc)
+                if values and values[0]:
+                    setattr(result, field, values[0])
 
             # 3. Try common meta tags
-            meta_company = soup.find("meta", {"name": "company"}) or soup.find(
-                "meta", {"name": "organization"}
-            )
-            if meta_company and meta_company.get("content"):
-                result.company = meta_company["content"]
+            meta_company = _first(self.META_COMPANY, doc)
+            if meta_company is not None and meta_company.get("content"):
+                result.company = meta_company.get("content")
 
-            meta_title = soup.find("meta", {"name": "title"}) or soup.find("title")
-            if meta_title:
+            meta_title = _first(self.META_TITLE, doc)
+            if meta_title is not None:
                 title_text = (
                     meta_title.get("content")
-                    if meta_title.name == "meta"
-                    else meta_title.get_text(strip=True)
+                    if meta_title.tag == "meta"
+                    else _text(meta_title)
                 )
                 if title_text and not result.job_title:
                     result.job_title = title_text
 
-            meta_description = soup.find("meta", {"name": "description"})
-            if meta_description and meta_description.get("content"):
-                result.job_description = meta_description["content"]
+            values = self.META_DESCRIPTION(doc)
+            if values and values[0]:
+                result.job_description = values[0]
 
             # 4. Try common CSS class patterns
             if not result.company:
-                company_patterns = [
-                    soup.find(class_=re.compile(r"company", re.I)),
-                    soup.find(class_=re.compile(r"employer", re.I)),
-                    soup.find(class_=re.compile(r"organization", re.I)),
-                ]
-                for element in company_patterns:
-                    if element:
-                        text = element.get_text(strip=True)
+                for selector in self.COMPANY:
+                    found = selector(doc)
+                    if found:
+                        text = _text(found[0])
                         if text and len(text) < 100:  # Reasonable company name length
                             result.company = text
                             break
 
             if not result.job_title:
-                title_patterns = [
-                    soup.find("h1"),
-                    soup.find(class_=re.compile(r"job.*title", re.I)),
-                    soup.find(class_=re.compile(r"position", re.I)),
-                ]
-                for element in title_patterns:
-                    if element:
-                        text = element.get_text(strip=True)
+                for selector in self.TITLE:
+                    found = selector(doc)
+                    if found:
+                        text = _text(found[0])
                         if text and len(text) < 200:  # Reasonable title length
                             result.job_title = text
                             break
 
             if not result.job_description:
-                desc_patterns = [
-                    soup.find(id=re.compile(r"description", re.I)),
-                    soup.find(class_=re.compile(r"description", re.I)),
-                    soup.find(class_=re.compile(r"job.*description", re.I)),
-                    soup.find("main"),
-                    soup.find("article"),
-                ]
-                for element in desc_patterns:
-                    if element:
-                        text = element.get_text(strip=True)
+                for selector in self.DESCRIPTION:
+                    found = selector(doc)
+                    if found:
+                        text = _text(found[0])
                         if (
                             text and len(text) > 100
                         ):  # Description should be substantial
@@ -666,6 +734,15 @@ class GenericParser(BaseJobParser):
         return result
 
 
+# Parsers are stateless: one shared instance per site
+_PARSERS: Dict[str, BaseJobParser] = {
+    "linkedin": LinkedInParser(),
+    "indeed": IndeedParser(),
+    "glassdoor": GlassdoorParser(),
+    "generic": GenericParser(),
+}
+
+
 def detect_site(url: str) -> str:
     """Detect which job site the URL belongs to"""
     domain = urlparse(url).netloc.lower()
@@ -792,6 +869,97 @@ def detect_captcha(html: str) -> bool:
     return False
 
 
+def _check_blocked_response(
+    url: str, status_code: int, html: str
+) -> Optional[Tuple[Optional[str], Optional[str], Optional[bool]]]:
+    """
+    CAPTCHA / block-page handling shared by the sync and async fetchers
+
+    Returns:
+        fetch_html's result tuple for CAPTCHA and 403/429/503 pages, or None if the
+        response should be handled by its status code
+    """
+    # Check for CAPTCHA BEFORE checking status code
+    # Some sites (like Indeed) may return 403 or redirect to CAPTCHA page
+    captcha_detected = detect_captcha(html)
+
+    # If CAPTCHA is detected, return it even if status is not 200
+    if captcha_detected:
+        logger.warning(
+            f"CAPTCHA detected for URL: {url} (status: {status_code})"
+        )
+        return html, None, captcha_detected
+
+    # For error status codes (403, 429, 503), check for CAPTCHA
+    # BUT: If the page contains job content, CAPTCHA was already completed
+    # Only mark as CAPTCHA if there's no job content
+    if status_code in [403, 429, 503]:
+        # First check if page has job content (CAPTCHA already completed)
+        html_lower_check = html.lower()
+        job_content_indicators = [
+            "job description",
+            "job title",
+            "apply now",
+            "job posting",
+            "hiring",
+            "qualifications",
+            "responsibilities",
+            "requirements",
+            "jobsearch-jobdescriptiontext",
+            "job-poster-name",
+            "job-title",
+        ]
+        has_job_content = any(
+            indicator in html_lower_check for indicator in job_content_indicators
+        )
+
+        if has_job_content:
+            # Page has job content despite error status - CAPTCHA was already completed
+            logger.info(
+                f"Error status {status_code} but job content found - CAPTCHA already completed, proceeding"
+            )
+            return html, None, False  # No CAPTCHA needed
+
+        # No job content - check for CAPTCHA
+        captcha_detected = detect_captcha(html)
+        if captcha_detected:
+            logger.warning(
+                f"CAPTCHA detected for URL: {url} (status: {status_code}, no job content)"
+            )
+            return html, None, captcha_detected
+
+        # Indeed specifically - 403 without job content likely means CAPTCHA needed
+        if "indeed.com" in url.lower() and status_code == 403:
+            logger.warning(
+                f"Indeed 403 Forbidden for URL: {url} (no job content) - treating as CAPTCHA required"
+            )
+            return html, None, True
+
+        # For other sites with 403/429/503, check if HTML suggests CAPTCHA
+        # Look for common error pages that might indicate verification needed
+        if any(
+            indicator in html_lower_check
+            for indicator in [
+                "access denied",
+                "unusual traffic",
+                "verify",
+                "security",
+            ]
+        ):
+            logger.warning(
+                f"Error status {status_code} with security indicators for URL: {url} (no job content) - treating as CAPTCHA"
+            )
+            return html, None, True
+
+        logger.warning(
+            f"Error status {status_code} for URL: {url} (no job content) - may require CAPTCHA"
+        )
+        # Return as CAPTCHA required to trigger modal
+        return html, None, True
+
+    return None
+
+
 def fetch_html(
     url: str, timeout: int = 10
 ) -> Tuple[Optional[str], Optional[str], Optional[bool]]:
@@ -823,100 +991,90 @@ def fetch_html(
         else:
             html = response.content.decode("utf-8", errors="ignore")
 
-        # Check for CAPTCHA BEFORE checking status code
-        # Some sites (like Indeed) may return 403 or redirect to CAPTCHA page
-        captcha_detected = detect_captcha(html)
-
-        # If CAPTCHA is detected, return it even if status is not 200
-        if captcha_detected:
-            logger.warning(
-                f"CAPTCHA detected for URL: {url} (status: {response.status_code})"
-            )
-            return html, None, captcha_detected
+        blocked = _check_blocked_response(url, response.status_code, html)
+        if blocked is not None:
+            return blocked
 
-        # For error status codes (403, 429, 503), check for CAPTCHA
-        # BUT: If the page contains job content, CAPTCHA was already completed
-        # Only mark as CAPTCHA if there's no job content
-        if response.status_code in [403, 429, 503]:
-            # First check if page has job content (CAPTCHA already completed)
-            html_lower_check = html.lower()
-            job_content_indicators = [
-                "job description",
-                "job title",
-                "apply now",
-                "job posting",
-                "hiring",
-                "qualifications",
-                "responsibilities",
-                "requirements",
-                "jobsearch-jobdescriptiontext",
-                "job-poster-name",
-                "job-title",
-            ]
-            has_job_content = any(
-                indicator in html_lower_check for indicator in job_content_indicators
-            )
+        # Now check status code (only if no CAPTCHA was detected and not error status)
+        response.raise_for_status()
 
-            if has_job_content:
-                # Page has job content despite error status - CAPTCHA was already completed
-                logger.info(
-                    f"Error status {response.status_code} but job content found - CAPTCHA already completed, proceeding"
-                )
-                return html, None, False  # No CAPTCHA needed
+        return html, None, False
 
-            # No job content - check for CAPTCHA
-            captcha_detected = detect_captcha(html)
-            if captcha_detected:
-                logger.warning(
-                    f"CAPTCHA detected for URL: {url} (status: {response.status_code}, no job content)"
-                )
-                return html, None, captcha_detected
+    except requests.exceptions.Timeout:
+        return None, "Request timeout", None
+    except requests.exceptions.RequestException as e:
+        return None, f"Failed to fetch URL: {str(e)}", None
+    except Exception as e:
+        return None, f"Unexpected error fetching URL: {str(e)}", None
 
-            # Indeed specifically - 403 without job content likely means CAPTCHA needed
-            if "indeed.com" in url.lower() and response.status_code == 403:
-                logger.warning(
-                    f"Indeed 403 Forbidden for URL: {url} (no job content) - treating as CAPTCHA required"
-                )
-                return html, None, True
-
-            # For other sites with 403/429/503, check if HTML suggests CAPTCHA
-            # Look for common error pages that might indicate verification needed
-            if any(
-                indicator in html_lower_check
-                for indicator in [
-                    "access denied",
-                    "unusual traffic",
-                    "verify",
-                    "security",
-                ]
-            ):
-                logger.warning(
-                    f"Error status {response.status_code} with security indicators for URL: {url} (no job content) - treating as CAPTCHA"
-                )
-                return html, None, True
 
-            logger.warning(
-                f"Error status {response.status_code} for URL: {url} (no job content) - may require CAPTCHA"
-            )
-            # Return as CAPTCHA required to trigger modal
-            return html, None, True
+async def fetch_html_async(
+    url: str,
+) -> Tuple[Optional[str], Optional[str], Optional[bool]]:
+    """
+    Fetch HTML content without blocking the event loop
 
-        # Now check status code (only if no CAPTCHA was detected and not error status)
-        response.raise_for_status()
+    Uses the shared pooled fetcher and page cache (app/utils/page_fetcher.py) when running
+    inside the API app, otherwise runs fetch_html in a worker thread.
 
-        return html, None, captcha_detected
+    Returns:
+        Same tuple as fetch_html
+    """
+    if fetch_page is None:
+        return await asyncio.to_thread(fetch_html, url)
 
-    except requests.exceptions.Timeout:
+    try:
+        # CAPTCHA pages are returned to the caller but never cached
+        page = await fetch_page(url, cacheable=lambda html: not detect_captcha(html))
+    except httpx.TimeoutException:
         return None, "Request timeout", None
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         return None, f"Failed to fetch URL: {str(e)}", None
     except Exception as e:
         return None, f"Unexpected error fetching URL: {str(e)}", None
 
+    blocked = _check_blocked_response(url, page.status_code, page.html)
+    if blocked is not None:
+        return blocked
+    if page.status_code >= 400:
+        return None, f"Failed to fetch URL: HTTP {page.status_code} for {page.url}", None
+    return page.html, None, False
+
+
+# Hiring manager hints, in priority order, and the name that follows them
+_HIRING_MANAGER_HINTS = (
+    re.compile(r"hiring manager", re.I),
+    re.compile(r"recruiter", re.I),
+    re.compile(r"contact.*name", re.I),
+)
+_HIRING_MANAGER_NAME = re.compile(
+    r"(?:hiring manager|recruiter)[:\s]+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)", re.I
+)
+
+
+def _find_hiring_manager(doc: "lxml.html.HtmlElement") -> Optional[str]:
+    """Name after a "hiring manager" / "recruiter" hint, from one pass over the visible text."""
+    parents: List[Optional["lxml.html.HtmlElement"]] = [None] * len(_HIRING_MANAGER_HINTS)
+    for node in _TEXT_NODES(doc):
+        for index, hint in enumerate(_HIRING_MANAGER_HINTS):
+            if parents[index] is None and hint.search(node):
+                owner = node.getparent()
+                parents[index] = owner.getparent() if node.is_tail else owner
+        if all(parent is not None for parent in parents):
+            break
+
+    for parent in parents:
+        if parent is None:
+            continue
+        match = _HIRING_MANAGER_NAME.search(_text(parent))
+        if match:
+            return match.group(1).strip()
+    return None
+
 
 def extract_from_html(html: str, url: str) -> JobExtractionResult:
     """
-    Extract job information from provided HTML content using BeautifulSoup
+    Extract job information from provided HTML content using the site parsers
 
     Args:
         html: HTML content to parse
@@ -933,7 +1091,7 @@ def extract_from_html(html: str, url: str) -> JobExtractionResult:
 
     # Parse HTML
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        doc = _parse_document(html)
     except Exception as e:
         logger.error(f"Failed to parse HTML: {e}")
         result.method = "beautifulsoup-parse-error"
@@ -943,46 +1101,17 @@ def extract_from_html(html: str, url: str) -> JobExtractionResult:
     site = detect_site(url)
     logger.info(f"Detected site: {site} for URL: {url}")
 
-    parsers = {
-        "linkedin": LinkedInParser(),
-        "indeed": IndeedParser(),
-        "glassdoor": GlassdoorParser(),
-        "generic": GenericParser(),
-    }
-
-    parser = parsers.get(site, GenericParser())
-    result = parser.parse(soup, url)
+    parser = _PARSERS.get(site, _PARSERS["generic"])
+    result = parser.parse(doc, url)
 
     # Set ad_source based on detected site
     result.ad_source = site
 
     # Try to extract hiring manager (common patterns)
     try:
-        # Look for hiring manager patterns in the HTML
-        hiring_manager_patterns = [
-            soup.find(string=re.compile(r"hiring manager", re.I)),
-            soup.find(string=re.compile(r"recruiter", re.I)),
-            soup.find(string=re.compile(r"contact.*name", re.I)),
-        ]
-
-        for pattern_match in hiring_manager_patterns:
-            if pattern_match:
-                # Try to find the name near the pattern
-                parent = (
-                    pattern_match.parent if hasattr(pattern_match, "parent") else None
-                )
-                if parent:
-                    # Look for name-like text nearby
-                    text = parent.get_text(strip=True)
-                    # Simple heuristic: look for capitalized words after "hiring manager" or "recruiter"
-                    match = re.search(
-                        r"(?:hiring manager|recruiter)[:\s]+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)",
-                        text,
-                        re.I,
-                    )
-                    if match:
-                        result.hiring_manager = match.group(1).strip()
-                        break
+        hiring_manager = _find_hiring_manager(doc)
+        if hiring_manager:
+            result.hiring_manager = hiring_manager
     except Exception as e:
         logger.debug(f"Could not extract hiring manager: {e}")
         # Leave as None/empty string
@@ -992,7 +1121,7 @@ def extract_from_html(html: str, url: str) -> JobExtractionResult:
 
 def extract_with_beautifulsoup(url: str) -> JobExtractionResult:
     """
-    Extract job information using BeautifulSoup
+    Extract job information using the site parsers
 
     Returns:
         JobExtractionResult object
@@ -1008,7 +1137,7 @@ def extract_with_beautifulsoup(url: str) -> JobExtractionResult:
 
     # Parse HTML
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        doc = _parse_document(html)
     except Exception as e:
         logger.error(f"Failed to parse HTML: {e}")
         result = JobExtractionResult()
@@ -1018,15 +1147,8 @@ def extract_with_beautifulsoup(url: str) -> JobExtractionResult:
     # Detect site and use appropriate parser
     site = detect_site(url)
 
-    parsers = {
-        "linkedin": LinkedInParser(),
-        "indeed": IndeedParser(),
-        "glassdoor": GlassdoorParser(),
-        "generic": GenericParser(),
-    }
-
-    parser = parsers.get(site, GenericParser())
-    result = parser.parse(soup, url)
+    parser = _PARSERS.get(site, _PARSERS["generic"])
+    result = parser.parse(doc, url)
 
     # Set ad_source based on detected site
     result.ad_source = site
@@ -1052,61 +1174,79 @@ def extract_with_beautifulsoup(url: str) -> JobExtractionResult:
             result.method = "captcha-required"
     return result
 
-    # Try to extract hiring manager (common patterns)
-    # Note: LinkedIn hiring manager extraction is handled in LinkedInParser
-    # This is a fallback for other sites or if LinkedInParser didn't find it
-    if not result.hiring_manager:
-        try:
-            # Look for hiring manager patterns in the HTML
-            hiring_manager_patterns = [
-                soup.find(string=re.compile(r"meet the hiring team", re.I)),
-                soup.find(string=re.compile(r"hiring manager", re.I)),
-                soup.find(string=re.compile(r"recruiter", re.I)),
-                soup.find(string=re.compile(r"contact.*name", re.I)),
-            ]
 
-            for pattern_match in hiring_manager_patterns:
-                if pattern_match:
-                    # Try to find the name near the pattern
-                    parent = (
-                        pattern_match.parent
-                        if hasattr(pattern_match, "parent")
-                        else None
-                    )
-                    if parent:
-                        # Look for name-like text nearby
-                        text = parent.get_text(strip=True)
-                        # Simple heuristic: look for capitalized words after "hiring manager", "recruiter", or "meet the hiring team"
-                        match = re.search(
-                            r"(?:meet the hiring team|hiring manager|recruiter)[:\s]+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)",
-                            text,
-                            re.I,
-                        )
-                        if match:
-                            result.hiring_manager = match.group(1).strip()
-                            logger.info(
-                                f"[extract_with_beautifulsoup] Found hiring manager: '{result.hiring_manager}'"
-                            )
-                            break
+def extract_job_fields(
+    html: str, openai_client: Optional[OpenAI] = None
+) -> JobExtractionResult:
+    """
+    Extract job information from page HTML: distill it first, answer from complete JSON-LD
+    structured data without an LLM call, otherwise send the distilled text to ChatGPT
+
+    Args:
+        html: Page HTML
+        openai_client: Optional OpenAI client instance
+
+    Returns:
+        JobExtractionResult object
+    """
+    if distill_job_html is None or not app_settings.JOB_HTML_DISTILL_ENABLED:
+        return extract_with_chatgpt(html, openai_client)
+
+    try:
+        page = distill_job_html(html)
+    except Exception as e:
+        logger.warning(f"HTML distillation failed, sending raw HTML: {e}")
+        return extract_with_chatgpt(html, openai_client)
+
+    posting = page.posting
+    if page.skip_llm:
+        result = JobExtractionResult()
+        result.method = "json-ld"
+        result.company = posting["company"]
+        result.job_title = posting["job_title"]
+        result.job_description = posting["job_description"]
+        # JSON-LD has no hiring manager; look for one in the page text as extract_from_html does
+        result.hiring_manager = ""
+        try:
+            result.hiring_manager = _find_hiring_manager(_parse_document(html)) or ""
         except Exception as e:
             logger.debug(f"Could not extract hiring manager: {e}")
-            # Leave as None/empty string
+        result.is_complete = result.has_minimum_data()
+        record_llm_skipped()
+        logger.info(
+            f"Job extracted from JSON-LD without LLM call (page {page.raw_chars} chars)"
+        )
+        return result
 
     logger.info(
-        f"BeautifulSoup extraction result: method={result.method}, complete={result.is_complete}, ad_source={result.ad_source}"
+        f"Distilled job page {page.raw_chars} -> {len(page.text)} chars before LLM extraction"
     )
+    result = extract_with_chatgpt(page.text, openai_client, distilled=True)
+    # Fill gaps the model left from the structured data, if any
+    if not result.company or result.company == "Not specified":
+        result.company = posting.get("company") or result.company
+    if not result.job_title or result.job_title == "Not specified":
+        result.job_title = posting.get("job_title") or result.job_title
+    description = posting.get("job_description") or ""
+    if (not result.job_description or result.job_description == "Not specified") and len(
+        description
+    ) >= app_settings.JOB_LD_MIN_DESCRIPTION_CHARS:
+        result.job_description = description
+    result.is_complete = result.has_minimum_data()
     return result
 
 
 def extract_with_chatgpt(
-    html: str, openai_client: Optional[OpenAI] = None
+    html: str, openai_client: Optional[OpenAI] = None, distilled: bool = False
 ) -> JobExtractionResult:
     """
     Extract job information using ChatGPT (fallback method)
 
     Args:
         html: HTML content to analyze
-        openai_client: Optional OpenAI client instance (will create if not provided)
+        openai_client: Optional OpenAI client instance (uses the shared pooled client if not provided)
+        distilled: html is distill_job_html() text (markup removed, collapsed sections
+            expanded) rather than raw HTML
 
     Returns:
         JobExtractionResult object
@@ -1122,7 +1262,7 @@ def extract_with_chatgpt(
         # Limit HTML size to avoid token limits
         html_content = html[:token_limit] if len(html) > token_limit else html
 
-        # Create OpenAI client if not provided
+        # Use the shared client if one was not provided
         if openai_client is None:
             import os
 
@@ -1130,12 +1270,21 @@ def extract_with_chatgpt(
             if not api_key:
                 logger.error("OPENAI_API_KEY not configured")
                 return result
-            openai_client = OpenAI(api_key=api_key)
+            if get_openai_client is not None:
+                openai_client = get_openai_client(api_key)
+            if openai_client is None:
+                openai_client = OpenAI(api_key=api_key)
+
+        content_label = (
+            "Page Content (text distilled from the HTML: scripts, styles and markup removed, collapsed sections already expanded)"
+            if distilled
+            else "HTML Content"
+        )
 
         # Create simplified prompt for Grok - let the LLM figure it out
         prompt = f"""Scan the provided HTML content and retrieve the following fields: "Company Name", "Job Title", "Hiring Manager", "Ad Source", and "Job Description". The job description should include all responsibilities, requirements, qualifications, and details. It should be the full job description text including all responsibilities, requirements, qualifications, and details. The hiring manager should be the name of the person who is hiring for the job. The ad source should be the source of the job posting. The company name should be the name of the company that is hiring for the job. The job title should be the title of the job. The hiring manager may be called a human resources manager, recruiter, hiring manager, or "meet the hiring team". 
 
-HTML Content:
+{content_label}:
 {html_content}
 
 Extract the following information and return ONLY valid JSON (no markdown, no code blocks):
@@ -1282,16 +1431,40 @@ async def analyze_job_url(
     # Detect ad_source from URL
     ad_source = detect_site(url)
 
-    # Step 1: Fetch HTML from URL (or use provided HTML)
-    if html_content:
-        html = html_content
-        error = None
+    async def fetch() -> Tuple[Optional[str], Optional[str]]:
+        html, error, _ = await fetch_html_async(url)
+        return html, error
+
+    def extract(html: Optional[str], error: Optional[str]) -> Dict:
+        return _build_analysis_response(url, ad_source, html, error, openai_client)
+
+    # Popular postings are answered from the shared extraction cache when available
+    if cached_job_extraction is not None:
+        response_data = await cached_job_extraction(url, fetch, extract, html_content=html_content)
+    elif html_content:
+        response_data = await asyncio.to_thread(extract, html_content, None)
     else:
-        html, error, _ = fetch_html(url)
+        response_data = await asyncio.to_thread(extract, *(await fetch()))
+
+    # A cached result may come from another URL for the same posting
+    response_data["url"] = url
+    response_data["ad_source"] = ad_source
+    return response_data
+
 
-    # Step 2: Always use GPT model to extract all fields
+def _build_analysis_response(
+    url: str,
+    ad_source: str,
+    html: Optional[str],
+    error: Optional[str],
+    openai_client: Optional[OpenAI] = None,
+) -> Dict:
+    """
+    Turn fetched HTML (or a fetch error) into the analyze_job_url response (blocking LLM call)
+    """
+    # Always use GPT model to extract all fields
     if html and not error:
-        result = extract_with_chatgpt(html, openai_client)
+        result = extract_job_fields(html, openai_client)
         result.ad_source = ad_source
     else:
         logger.error(f"Failed to fetch HTML: {error}")
@@ -0,0 +1,622 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the cover-letter generation pipeline.
+
+Everything external is replaced by a local stand-in, so runs are reproducible and need no
+credentials or network:
+
+  LLM    scripts/stub_llm_server.py (OpenAI-compatible, used through the Grok/xAI path)
+  S3     in-memory client installed as the s3_utils singleton (resume PDF by S3 key)
+  Mongo  in-memory users collection patched into user_service (usage accounting)
+  Redis  fakeredis when installed, otherwise the tiered caches run L1-only
+
+Two kinds of measurement:
+
+  stages      CPU time (thread time, fastest of the timed runs), wall time (median) and peak
+              traced allocations (KiB per op) for prompt building, JSON parsing/repair of the
+              LLM response, DOCX building and PDF text extraction
+  end-to-end  throughput and latency percentiles of get_job_info_async() and of the
+              /api/job-info route (ASGI, in process) at several concurrency levels
+
+Results are compared against a baseline JSON (scripts/benchmark_generation_baseline.json by
+default). Host speed varies between machines and between runs on shared ones, so CPU time is
+gated as a ratio to a fixed calibration workload timed in the same run (cpu_rel), not in
+absolute milliseconds. A stage whose cpu_rel or allocations exceed the baseline by more than
+the tolerance (plus a small absolute slack) fails the run (exit code 1). Stages over the limit
+are measured once more first, and only a regression that reproduces fails. End-to-end numbers are dominated by
+the stub delay and the host, so they are reported against the baseline but only fail with
+--strict.
+
+Usage:
+    python scripts/benchmark_generation_pipeline.py
+    python scripts/benchmark_generation_pipeline.py --save-baseline
+    python scripts/benchmark_generation_pipeline.py --stages-only --tolerance 0.5
+    python scripts/benchmark_generation_pipeline.py --stages-only --rounds 5
+    python scripts/benchmark_generation_pipeline.py --concurrency 1,4,16 --delay 0.05 --json out.json
+"""
+
+import argparse
+import asyncio
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from unittest import mock
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from stub_llm_server import STUB_LETTER, start_stub_server  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).parent / "benchmark_generation_baseline.json"
+DEFAULT_PDF = ROOT / "website" / "profile" / "Simon Kaltgrad Resume 2025 Q3.pdf"
+USER_ID = "000000000000000000000001"
+BUCKET = "benchmark-bucket"
+RESUME_KEY = f"{USER_ID}/resume.pdf"
+ALLOC_RUNS = 5
+# Minimum CPU time of one timed sample; faster stages are run several times per sample
+SAMPLE_SECONDS = 0.002
+# Absolute slack added to the relative tolerance so sub-millisecond stages don't flap
+SLACK = {"cpu_ms": 0.05, "peak_alloc_kib": 16.0}
+# Fixed CPU workload (JSON round trips and string handling, like the stages) that cpu_rel is
+# measured against
+CALIBRATION_DOC = {
+    "items": [{"id": i, "name": f"item-{i}", "tags": ["alpha", "beta", "gamma"]} for i in range(200)]
+}
+
+RESUME_TEXT = (
+    "Jane Doe - Senior Software Engineer\n"
+    + "\n".join(
+        f"- Led project {i}: designed and shipped a Python and FastAPI service handling {i * 1000} req/day"
+        for i in range(1, 25)
+    )
+)
+JOB_DESCRIPTION = "We are hiring a backend engineer. " + " ".join(
+    f"Requirement {i}: experience with distributed systems, Python and cloud infrastructure."
+    for i in range(1, 30)
+)
+
+
+# --- stand-ins -------------------------------------------------------------------------------
+
+
+class StubS3Client:
+    """Just enough of the boto3 S3 client for resume downloads, ETag checks and sidecars."""
+
+    def __init__(self) -> None:
+        self.objects: Dict[tuple, bytes] = {}
+
+    def _missing(self, key: str):
+        from botocore.exceptions import ClientError
+
+        return ClientError({"Error": {"Code": "NoSuchKey", "Message": key}}, "GetObject")
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **kwargs: Any) -> Dict[str, Any]:
+        data = Body if isinstance(Body, bytes) else str(Body).encode("utf-8")
+        self.objects[(Bucket, Key)] = data
+        return {"ETag": f'"{abs(hash(data)):x}"'}
+
+    def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        if (Bucket, Key) not in self.objects:
+            raise self._missing(Key)
+        return {"ETag": f'"{abs(hash(self.objects[(Bucket, Key)])):x}"'}
+
+    def get_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        if (Bucket, Key) not in self.objects:
+            raise self._missing(Key)
+        data = self.objects[(Bucket, Key)]
+        return {"Body": io.BytesIO(data), "ETag": f'"{abs(hash(data)):x}"'}
+
+    def delete_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        self.objects.pop((Bucket, Key), None)
+        return {}
+
+
+class StubUsersCollection:
+    """In-memory users collection: counts the usage writes issued by the pipeline."""
+
+    def __init__(self) -> None:
+        self.writes = 0
+
+    def find_one(self, *args: Any, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        return None
+
+    def find_one_and_update(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        self.writes += 1
+        return {"_id": USER_ID, "generation_credits": 100}
+
+    def update_one(self, *args: Any, **kwargs: Any):
+        self.writes += 1
+        return mock.Mock(matched_count=1, modified_count=1)
+
+
+def _fake_user():
+    from app.models.user import UserResponse
+
+    now = datetime.utcnow()
+    return UserResponse(
+        id=USER_ID,
+        name="Benchmark User",
+        email="benchmark@example.com",
+        isActive=True,
+        isEmailVerified=True,
+        roles=["user"],
+        preferences={
+            "appSettings": {
+                "personalityProfiles": [
+                    {"id": "p1", "name": "Professional", "description": "Clear and concise."}
+                ],
+                "printProperties": {"fontFamily": "Times New Roman", "fontSize": 12, "lineHeight": 1.15},
+            }
+        },
+        dateCreated=now,
+        dateUpdated=now,
+    )
+
+
+def _install_stand_ins(delay: float, pdf_bytes: bytes) -> Dict[str, Any]:
+    server, base_url = start_stub_server(delay=delay)
+    cache_dir = tempfile.mkdtemp(prefix="bench-resume-text-")
+
+    from app.core.config import settings
+
+    settings.XAI_API_BASE_URL = base_url
+    settings.XAI_API_KEY = "stub-key"
+    settings.ENABLE_GENERATION_TIMING_CHART = False
+    settings.AWS_S3_BUCKET = BUCKET
+    settings.RESUME_TEXT_CACHE_DIR = cache_dir
+
+    from app.services import user_service
+    from app.utils import redis_utils, s3_utils
+
+    s3 = StubS3Client()
+    s3.put_object(Bucket=BUCKET, Key=RESUME_KEY, Body=pdf_bytes)
+    s3_utils._s3_client = s3
+
+    users = StubUsersCollection()
+    patches = [
+        mock.patch.object(user_service, "is_connected", return_value=True),
+        mock.patch.object(user_service, "get_collection", return_value=users),
+        mock.patch.object(user_service, "invalidate_principal", lambda user_id: None),
+    ]
+    for p in patches:
+        p.start()
+
+    redis_backend = "none (L1 only)"
+    try:
+        import fakeredis
+
+        redis_utils._redis_client = fakeredis.FakeRedis()
+        redis_backend = "fakeredis"
+    except ImportError:
+        settings.REDIS_HOST = ""
+
+    return {
+        "server": server,
+        "base_url": base_url,
+        "s3": s3,
+        "users": users,
+        "patches": patches,
+        "redis": redis_backend,
+        "cache_dir": cache_dir,
+    }
+
+
+# --- stage micro-benchmarks ------------------------------------------------------------------
+
+
+def _job_kwargs(user, jd_suffix: str) -> Dict[str, Any]:
+    return dict(
+        llm="Grok",
+        date_input="2026-01-15",
+        company_name="Acme",
+        hiring_manager="Pat Smith",
+        ad_source="linkedin",
+        resume=RESUME_TEXT,
+        # Unique JD per request so the result cache never short-circuits the LLM call
+        jd=f"{JOB_DESCRIPTION} #{jd_suffix}",
+        additional_instructions="",
+        tone="Professional",
+        is_plain_text=True,
+        current_user=user,
+    )
+
+
+def _calibration_work() -> int:
+    total = 0
+    for _ in range(10):
+        text = json.dumps(CALIBRATION_DOC)
+        total += len(json.loads(text)["items"])
+        total += sum(len(part.strip()) for part in text.split(","))
+    return total
+
+
+def _measure(fn: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    fn()  # warm-up (imports, lazy singletons, first-use caches)
+    c0 = time.thread_time()
+    fn()
+    # Like timeit: loop sub-millisecond stages so one sample is long enough to time reliably
+    inner = min(1000, max(1, int(SAMPLE_SECONDS / max(time.thread_time() - c0, 1e-6))))
+    cpu, wall = [], []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            c0, w0 = time.thread_time(), time.perf_counter()
+            for _ in range(inner):
+                fn()
+            cpu.append((time.thread_time() - c0) / inner)
+            wall.append((time.perf_counter() - w0) / inner)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # tracemalloc is process-wide, so background-queue threads can inflate a single run;
+    # the smallest peak of a few runs is the stage's own footprint
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(ALLOC_RUNS):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(max(0, peak - base))
+    finally:
+        tracemalloc.stop()
+    return {
+        # The fastest run is the least disturbed by scheduling and frequency scaling
+        "cpu_ms": round(min(cpu) * 1000, 3),
+        "wall_ms": round(statistics.median(wall) * 1000, 3),
+        "peak_alloc_kib": round(min(peaks) / 1024, 1),
+    }
+
+
+def run_stages(
+    iterations: int, pdf_bytes: bytes, rounds: int, only: Optional[List[str]] = None
+) -> Dict[str, Dict[str, float]]:
+    from app.services import cover_letter_service as cls
+    from app.utils import pdf_extraction
+    from app.utils.docx_generator import build_docx_from_generation_result
+
+    user = _fake_user()
+    letter = STUB_LETTER.format(date="January 15, 2026")
+    valid_response = "```json\n" + json.dumps({"content": letter}) + "\n```"
+    # Unterminated string: exercises the repair path (balanced-brace scan + content recovery)
+    truncated_response = '{"content": "' + letter.replace("\n", "\\n") * 3
+    counter = iter(range(10**9))
+
+    def prepare():
+        return cls._prepare_generation(**_job_kwargs(user, f"stage-{next(counter)}"))
+
+    gen = prepare()
+
+    def parse(response: str) -> Callable[[], Any]:
+        def run():
+            with mock.patch.object(cls, "_call_llm", lambda g, on_token=None: response):
+                cls._run_generation(dict(gen, result_cache_key=f"bench:{next(counter)}"))
+
+        return run
+
+    stages: Dict[str, Callable[[], Any]] = {
+        "prompt_build": prepare,
+        "json_parse": parse(valid_response),
+        "json_repair": parse(truncated_response),
+        "docx_build": lambda: build_docx_from_generation_result(
+            content=letter,
+            print_properties={"fontFamily": "Times New Roman", "fontSize": 12},
+            use_plain_text=True,
+        ),
+    }
+    for engine in pdf_extraction.available_engines():
+        stages[f"pdf_extract_{engine}"] = (
+            lambda e=engine: pdf_extraction.extract_text(pdf_bytes, engines=[e], parallel=False)
+        )
+
+    if only:
+        stages = {name: fn for name, fn in stages.items() if name in only}
+
+    # Host speed drifts during a run on shared machines, so each stage is normalized by the
+    # calibration workload timed right before and after it (the faster of the two). The suite
+    # runs several rounds and each stage reports its median round.
+    rounds_by_stage: Dict[str, List[Dict[str, float]]] = {name: [] for name in stages}
+    calibrations = []
+    for _ in range(max(1, rounds)):
+        before = _measure(_calibration_work, iterations)["cpu_ms"]
+        for name, fn in stages.items():
+            r = _measure(fn, iterations)
+            after = _measure(_calibration_work, iterations)["cpu_ms"]
+            calibration = min(before, after)
+            calibrations.append(calibration)
+            before = after
+            r["cpu_rel"] = round(r["cpu_ms"] / calibration, 4)
+            rounds_by_stage[name].append(r)
+    results: Dict[str, Dict[str, float]] = {}
+    for name, measured in rounds_by_stage.items():
+        measured.sort(key=lambda r: r["cpu_rel"])
+        results[name] = dict(
+            measured[len(measured) // 2],
+            peak_alloc_kib=min(r["peak_alloc_kib"] for r in measured),
+        )
+    for name, r in results.items():
+        print(f"  {name:<22} cpu {r['cpu_ms']:>9.3f} ms ({r['cpu_rel']:>7.3f}x)   wall {r['wall_ms']:>9.3f} ms   "
+              f"peak alloc {r['peak_alloc_kib']:>9.1f} KiB")
+    results["calibration"] = {"cpu_ms": min(calibrations)}
+    print(f"  {'calibration':<22} cpu {min(calibrations):>9.3f} ms")
+    return results
+
+
+# --- end-to-end ------------------------------------------------------------------------------
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def _summarize(latencies: List[float], elapsed: float, errors: int) -> Dict[str, float]:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+    }
+
+
+async def _drive(one: Callable[[int], Any], concurrency: int, total: int) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def wrapped(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ok = await one(i)
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += 0 if ok else 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(wrapped(i) for i in range(total)))
+    return _summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def _service_level(concurrency: int, total: int, s3_resume: bool) -> Dict[str, float]:
+    from app.services.cover_letter_service import get_job_info_async
+
+    user = _fake_user()
+    run_id = uuid.uuid4().hex[:8]
+
+    async def one(i: int) -> bool:
+        kwargs = _job_kwargs(user, f"{run_id}-{i}")
+        if s3_resume:
+            kwargs.update(resume=RESUME_KEY, is_plain_text=False, user_id=USER_ID)
+        result = await get_job_info_async(**kwargs)
+        return not str(result.get("content", "")).lower().startswith("error")
+
+    return await _drive(one, concurrency, total)
+
+
+async def _route_level(concurrency: int, total: int) -> Dict[str, float]:
+    import httpx
+
+    from app.core.auth import get_current_user
+    from app.main import app
+
+    user = _fake_user()
+    app.dependency_overrides[get_current_user] = lambda: user
+    run_id = uuid.uuid4().hex[:8]
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def one(i: int) -> bool:
+                body = _job_kwargs(user, f"{run_id}-{i}")
+                body.pop("current_user")
+                body.pop("is_plain_text")
+                response = await client.post("/api/job-info", json=body)
+                return response.status_code == 200 and "docxBase64" in response.json()
+
+            return await _drive(one, concurrency, total)
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+def run_end_to_end(levels: List[int], per_level: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    from app.utils.background_queue import get_background_queue
+
+    scenarios = {
+        "service_text_resume": lambda c: _service_level(c, max(per_level, c), s3_resume=False),
+        "service_s3_resume": lambda c: _service_level(c, max(per_level, c), s3_resume=True),
+        "route_job_info": lambda c: _route_level(c, max(per_level, c)),
+    }
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name, scenario in scenarios.items():
+        results[name] = {}
+        for level in levels:
+            stats = asyncio.run(scenario(level))
+            get_background_queue().drain(timeout=10)
+            results[name][str(level)] = stats
+            print(f"  {name:<20} c={level:<3} {stats['requests']:>4} reqs  {stats['errors']:>3} err  "
+                  f"{stats['throughput_rps']:>8.2f} req/s  p50 {stats['p50_ms']:>8.1f} ms  "
+                  f"p95 {stats['p95_ms']:>8.1f} ms")
+    return results
+
+
+# --- baseline --------------------------------------------------------------------------------
+
+
+def _cpu_limit(before: Dict[str, float], calibration: float, tolerance: float) -> float:
+    # The absolute CPU slack is in ms; express it in calibration units
+    return before["cpu_rel"] * (1 + tolerance) + SLACK["cpu_ms"] / calibration
+
+
+def _slow_stages(stages: Dict[str, Dict[str, float]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Stages whose cpu_rel is over the baseline limit."""
+    calibration = stages["calibration"]["cpu_ms"]
+    slow = []
+    for stage, now in stages.items():
+        before = baseline.get("stages", {}).get(stage)
+        if stage != "calibration" and before and "cpu_rel" in before:
+            if now["cpu_rel"] > _cpu_limit(before, calibration, tolerance):
+                slow.append(stage)
+    return slow
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, strict: bool) -> List[str]:
+    """Return a list of regressions (empty = pass)."""
+    failures = []
+    print(f"\nComparison against baseline (tolerance {tolerance:.0%}):")
+    calibration = current.get("stages", {}).get("calibration", {}).get("cpu_ms")
+    base_calibration = baseline.get("stages", {}).get("calibration", {}).get("cpu_ms")
+    if calibration and base_calibration:
+        print(f"  host speed vs baseline: calibration {base_calibration} -> {calibration} ms")
+    for stage, now in current.get("stages", {}).items():
+        if stage == "calibration":
+            continue
+        before = baseline.get("stages", {}).get(stage)
+        if not before:
+            print(f"  {stage:<22} (new, no baseline)")
+            continue
+        for metric in ("cpu_rel", "peak_alloc_kib"):
+            if metric not in before:
+                print(f"  {stage:<22} {metric:<15} (not in baseline; re-record with --save-baseline)")
+                continue
+            if metric == "cpu_rel":
+                limit = _cpu_limit(before, calibration, tolerance)
+            else:
+                limit = before[metric] * (1 + tolerance) + SLACK[metric]
+            delta = (now[metric] / before[metric] - 1) if before[metric] else 0.0
+            status = "OK"
+            if now[metric] > limit:
+                status = "REGRESSION"
+                failures.append(f"{stage}.{metric}: {now[metric]} > {before[metric]} (+{delta:.0%})")
+            print(f"  {stage:<22} {metric:<15} {before[metric]:>10} -> {now[metric]:>10} ({delta:+.0%}) {status}")
+
+    for scenario, levels in current.get("end_to_end", {}).items():
+        for level, now in levels.items():
+            before = baseline.get("end_to_end", {}).get(scenario, {}).get(level)
+            if not before or not before.get("throughput_rps"):
+                continue
+            delta = now["throughput_rps"] / before["throughput_rps"] - 1
+            status = "OK"
+            if delta < -tolerance:
+                status = "REGRESSION" if strict else "slower"
+                if strict:
+                    failures.append(f"{scenario} c={level} throughput {delta:.0%}")
+            print(f"  {scenario:<20} c={level:<3} throughput {before['throughput_rps']:>8} -> "
+                  f"{now['throughput_rps']:>8} ({delta:+.0%}) {status}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline generation pipeline benchmark")
+    parser.add_argument("--iterations", type=int, default=30, help="Timed runs per stage")
+    parser.add_argument("--rounds", type=int, default=3, help="Stage suite repetitions (median kept)")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated end-to-end levels")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per end-to-end level")
+    parser.add_argument("--delay", type=float, default=0.05, help="Stub LLM latency in seconds")
+    parser.add_argument("--pdf", type=Path, default=DEFAULT_PDF, help="PDF used for extraction and S3")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative regression")
+    parser.add_argument("--strict", action="store_true", help="Also fail on end-to-end throughput")
+    parser.add_argument("--stages-only", action="store_true", help="Skip the end-to-end runs")
+    parser.add_argument("--json", type=Path, help="Also write results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show app logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        # The pipeline logs every step (and S3/Redis fallbacks at ERROR); keep the report readable.
+        logging.disable(logging.CRITICAL)
+        warnings.simplefilter("ignore")
+    os.environ["ENABLE_GENERATION_TIMING_CHART"] = "false"
+
+    baseline = None
+    if not args.save_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+    pdf_bytes = args.pdf.read_bytes()
+    env = _install_stand_ins(args.delay, pdf_bytes)
+    print(f"Stub LLM at {env['base_url']} (delay={args.delay}s), S3 stub, Mongo stub, redis: {env['redis']}")
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "iterations": args.iterations,
+            "rounds": args.rounds,
+            "delay": args.delay,
+            "pdf": args.pdf.name,
+        }
+    }
+    try:
+        print(f"\nStages ({args.rounds} rounds x {args.iterations} iterations; cpu: fastest run, median round):")
+        results["stages"] = run_stages(args.iterations, pdf_bytes, args.rounds)
+        if baseline:
+            # A real regression reproduces; a noisy-neighbour spike usually does not
+            slow = _slow_stages(results["stages"], baseline, args.tolerance)
+            if slow:
+                print(f"\nRe-measuring {', '.join(slow)} to rule out host noise:")
+                retry = run_stages(args.iterations, pdf_bytes, args.rounds, only=slow)
+                for name in slow:
+                    if retry[name]["cpu_rel"] < results["stages"][name]["cpu_rel"]:
+                        results["stages"][name] = retry[name]
+        if not args.stages_only:
+            levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+            print(f"\nEnd-to-end ({args.requests} requests per level):")
+            results["end_to_end"] = run_end_to_end(levels, args.requests)
+            print(f"  usage writes recorded by the Mongo stand-in: {env['users'].writes}")
+    finally:
+        from app.utils.background_queue import shutdown_background_queue
+        from app.utils.llm_clients import close_llm_clients
+        from app.utils.llm_dispatch import shutdown_llm_executor
+
+        shutdown_background_queue(timeout=10)
+        shutdown_llm_executor()
+        close_llm_clients()
+        env["server"].shutdown()
+        for p in env["patches"]:
+            p.stop()
+        shutil.rmtree(env["cache_dir"], ignore_errors=True)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    failures = compare(results, baseline, args.tolerance, args.strict)
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nPASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the site parsers in job_url_analyzer (extract_from_html).
+
+Runs every page in tests/fixtures/job_pages (or --pages DIR, any *.html files; a manifest.json
+there supplies each page's URL so the right site parser is used) through extract_from_html and
+reports the median time per page. For reference it also times building the document tree alone
+with lxml and with BeautifulSoup's "html.parser" backend, which the parsers used before.
+
+The default pages are synthetic (see their manifest), so timings on them only compare parser
+versions against each other; quote speed-ups from a --pages directory of captured pages.
+
+Usage:
+    python scripts/benchmark_job_page_parsing.py
+    python scripts/benchmark_job_page_parsing.py --pages /path/to/captured/pages --repeat 50
+    python scripts/benchmark_job_page_parsing.py --dump results.json
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+# Add parent directory to path to import app modules
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import lxml.html  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+from job_url_analyzer import extract_from_html  # noqa: E402
+
+DEFAULT_PAGES = ROOT / "tests" / "fixtures" / "job_pages"
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1e3
+
+
+def _load_manifest(pages: Path) -> Dict:
+    manifest = pages / "manifest.json"
+    if not manifest.exists():
+        return {"cases": []}
+    return json.loads(manifest.read_text("utf-8"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark job page parsing")
+    parser.add_argument("--pages", type=Path, default=DEFAULT_PAGES, help="Directory of .html pages")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per page")
+    parser.add_argument("--dump", type=Path, help="Write each page's extraction result to this JSON file")
+    args = parser.parse_args()
+
+    # The parsers log every page at INFO
+    logging.disable(logging.INFO)
+    manifest = _load_manifest(args.pages)
+    urls = {c["file"]: c["url"] for c in manifest["cases"]}
+    files = sorted(args.pages.glob("*.html"))
+    corpus = manifest.get("corpus", "unlabelled")
+    print(f"{len(files)} pages ({corpus}), repeat={args.repeat}")
+    print(f"{'page':<30} {'KiB':>6} {'extract(ms)':>12} {'lxml tree(ms)':>14} {'bs4 html.parser(ms)':>20}")
+    totals = [0.0, 0.0, 0.0]
+    results = {}
+    for path in files:
+        html = path.read_text("utf-8", errors="replace")
+        url = urls.get(path.name, f"https://example.com/{path.stem}")
+        extract = _median_ms(lambda: extract_from_html(html, url), args.repeat)
+        tree = _median_ms(lambda: lxml.html.document_fromstring(html), args.repeat)
+        soup = _median_ms(lambda: BeautifulSoup(html, "html.parser"), args.repeat)
+        print(f"{path.name[:30]:<30} {len(html) / 1024:>6.0f} {extract:>12.2f} {tree:>14.2f} {soup:>20.2f}")
+        totals[0] += extract
+        totals[1] += tree
+        totals[2] += soup
+        result = extract_from_html(html, url)
+        results[path.name] = dict(vars(result)) if hasattr(result, "__dict__") else str(result)
+    print(f"{'total':<30} {'':>6} {totals[0]:>12.2f} {totals[1]:>14.2f} {totals[2]:>20.2f}")
+    if args.dump:
+        args.dump.write_text(json.dumps(results, indent=2, ensure_ascii=False), "utf-8")
+        print(f"Results written to {args.dump}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
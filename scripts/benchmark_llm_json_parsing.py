@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark the LLM reply parser (app/utils/streaming_json.py).
+
+Runs every reply in the corpus (tests/fixtures/llm_responses.json by default) through
+parse_llm_json() on the whole text and through StreamingJSONParser fed in provider-sized
+chunks, and reports the median time per reply. For replies that are valid JSON once fences and
+prose are stripped, json.loads on the extracted object is shown as the C-speed reference.
+
+Replies are repeated --scale times inside the content string to approximate long letters and
+DOCX XML payloads.
+
+Usage:
+    python scripts/benchmark_llm_json_parsing.py
+    python scripts/benchmark_llm_json_parsing.py --repeat 2000 --chunk 8 --scale 4
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+# Add parent directory to path to import app modules
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.utils.streaming_json import StreamingJSONParser, parse_llm_json  # noqa: E402
+
+DEFAULT_CORPUS = ROOT / "tests" / "fixtures" / "llm_responses.json"
+
+
+def _median_us(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1e6
+
+
+def _streamed(text: str, chunk: int) -> Callable[[], object]:
+    chunks = [text[i : i + chunk] for i in range(0, len(text), chunk)]
+
+    def run():
+        parser = StreamingJSONParser()
+        for piece in chunks:
+            parser.feed(piece)
+        try:
+            return parser.finish()
+        except json.JSONDecodeError:
+            return None
+
+    return run
+
+
+def _whole(text: str) -> Callable[[], object]:
+    def run():
+        try:
+            return parse_llm_json(text)
+        except json.JSONDecodeError:
+            return None
+
+    return run
+
+
+def _reference(text: str) -> Optional[Callable[[], object]]:
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    candidate = text[start : end + 1]
+    try:
+        json.loads(candidate)
+    except ValueError:
+        return None
+    return lambda: json.loads(candidate)
+
+
+def _scaled(text: str, scale: int) -> str:
+    marker = "Dear Hiring Manager,"
+    if scale <= 1 or marker not in text:
+        return text
+    return text.replace(marker, marker + " " + "Lorem ipsum dolor sit amet. " * (40 * (scale - 1)), 1)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the streaming LLM JSON parser")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=500, help="Timed runs per reply")
+    parser.add_argument("--chunk", type=int, default=16, help="Characters per streamed chunk")
+    parser.add_argument("--scale", type=int, default=1, help="Lengthen letter bodies this many times")
+    args = parser.parse_args()
+
+    cases = json.loads(args.corpus.read_text("utf-8"))["cases"]
+    print(f"{len(cases)} replies, repeat={args.repeat}, chunk={args.chunk}, scale={args.scale}")
+    print(f"{'reply':<34} {'chars':>6} {'whole(us)':>10} {'stream(us)':>11} {'json.loads(us)':>15}")
+    totals = [0.0, 0.0, 0]
+    for case in cases:
+        text = _scaled(case["text"], args.scale)
+        whole = _median_us(_whole(text), args.repeat)
+        streamed = _median_us(_streamed(text, args.chunk), args.repeat)
+        reference = _reference(text)
+        ref = f"{_median_us(reference, args.repeat):>15.1f}" if reference else f"{'-':>15}"
+        print(f"{case['name'][:34]:<34} {len(text):>6} {whole:>10.1f} {streamed:>11.1f} {ref}")
+        totals[0] += whole
+        totals[1] += streamed
+        totals[2] += len(text)
+    print(f"{'total':<34} {totals[2]:>6} {totals[0]:>10.1f} {totals[1]:>11.1f}")
+    print(f"whole: {totals[2] / totals[0]:.1f} chars/us, streamed: {totals[2] / totals[1]:.1f} chars/us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark the PDF text extraction engines (app/utils/pdf_extraction.py).
+
+Runs every available engine over a corpus of PDFs and reports, per engine, the median time
+per document, pages/second and output parity against a reference engine (similarity of the
+whitespace-normalized text, 1.0 = identical). Page-parallel extraction is measured on a
+synthetic long document built by concatenating the corpus.
+
+By default the corpus is every PDF under website/profile and documents/.
+
+Usage:
+    python scripts/benchmark_pdf_extraction.py
+    python scripts/benchmark_pdf_extraction.py --corpus "PDF Resumes" --repeat 10 --reference pypdf2
+"""
+
+import argparse
+import difflib
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+# Add parent directory to path to import app modules
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.utils import pdf_extraction  # noqa: E402
+
+DEFAULT_CORPUS = [ROOT / "website" / "profile", ROOT / "documents"]
+
+
+def _load_corpus(paths: List[Path]) -> List[Tuple[str, bytes]]:
+    docs = []
+    for path in paths:
+        files = [path] if path.is_file() else sorted(path.rglob("*.pdf")) + sorted(path.rglob("*.PDF"))
+        for f in files:
+            docs.append((f.name, f.read_bytes()))
+    return docs
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _parity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, _normalize(a), _normalize(b), autojunk=False).ratio()
+
+
+def _time_engine(engine: str, pdf_bytes: bytes, repeat: int, parallel: bool) -> Tuple[float, str]:
+    timings = []
+    text = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text, _ = pdf_extraction.extract_text(pdf_bytes, engines=[engine], parallel=parallel)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), text
+
+
+def _long_document(docs: List[Tuple[str, bytes]], copies: int) -> Tuple[bytes, int]:
+    if not pdf_extraction.PYMUPDF_AVAILABLE:
+        return b"", 0
+    out = pdf_extraction.pymupdf.open()
+    for _ in range(copies):
+        for _, data in docs:
+            with pdf_extraction.pymupdf.open(stream=data, filetype="pdf") as src:
+                out.insert_pdf(src)
+    pages = out.page_count
+    data = out.tobytes()
+    out.close()
+    return data, pages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction engines")
+    parser.add_argument("--corpus", action="append", help="PDF file or directory (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per document per engine")
+    parser.add_argument("--reference", default="pypdf2", help="Engine used as the parity baseline")
+    parser.add_argument("--long-copies", type=int, default=8, help="Corpus copies in the long document")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    docs = _load_corpus([Path(p) for p in args.corpus] if args.corpus else DEFAULT_CORPUS)
+    if not docs:
+        print("No PDFs found in corpus")
+        return 1
+    engines = pdf_extraction.available_engines()
+    print(f"{len(docs)} documents, engines: {', '.join(engines)}, repeat={args.repeat}")
+    print(f"{'document':<45} {'engine':<8} {'pages':>5} {'median(ms)':>11} {'pages/s':>9} {'parity':>7}")
+
+    totals = {e: [0.0, 0] for e in engines}
+    for name, data in docs:
+        pages = pdf_extraction.ENGINES[engines[0]][1](data)
+        results = {}
+        for engine in engines:
+            try:
+                results[engine] = _time_engine(engine, data, args.repeat, parallel=False)
+            except Exception as e:
+                print(f"{name[:45]:<45} {engine:<8} failed: {e}")
+                continue
+            totals[engine][0] += results[engine][0]
+            totals[engine][1] += pages
+        reference = results.get(args.reference, next(iter(results.values()), (0.0, "")))[1]
+        for engine, (seconds, text) in results.items():
+            print(
+                f"{name[:45]:<45} {engine:<8} {pages:>5} {seconds * 1000:>11.2f} "
+                f"{pages / seconds if seconds else 0:>9.0f} {_parity(reference, text):>7.3f}"
+            )
+
+    print("\nTotals (sequential):")
+    for engine, (seconds, pages) in totals.items():
+        if seconds:
+            print(f"  {engine:<8} {pages} pages in {seconds * 1000:.1f} ms -> {pages / seconds:.0f} pages/s")
+
+    long_pdf, long_pages = _long_document(docs, args.long_copies)
+    if long_pages:
+        print(f"\nLong document: {long_pages} pages, {settings.PDF_PARALLEL_WORKERS} workers")
+        for engine in engines:
+            # Warm the process pool so its startup is not counted
+            pdf_extraction.extract_text(long_pdf, engines=[engine], parallel=True)
+            seq, _ = _time_engine(engine, long_pdf, max(1, args.repeat // 2), parallel=False)
+            par, _ = _time_engine(engine, long_pdf, max(1, args.repeat // 2), parallel=True)
+            print(
+                f"  {engine:<8} sequential {seq * 1000:>8.1f} ms   parallel {par * 1000:>8.1f} ms   "
+                f"speedup {seq / par if par else 0:.2f}x"
+            )
+        pdf_extraction.shutdown_pdf_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
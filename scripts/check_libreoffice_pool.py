@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Check that the LibreOffice conversion pool (app/services/libreoffice_pool.py) reuses warm workers.
+
+Converts a small HTML document --jobs times through convert_to_pdf and prints each job's
+latency followed by the pool stats. In UNO mode the first job on a worker starts soffice and
+every later one is a load/store on the already running process, so process_starts stays at
+most the pool size while jobs grows. In CLI mode every job starts soffice.
+
+Run inside the image to confirm the warm path is active there:
+    docker run --rm <image> python scripts/check_libreoffice_pool.py --require-uno
+
+Usage:
+    python scripts/check_libreoffice_pool.py
+    python scripts/check_libreoffice_pool.py --jobs 10 --require-uno
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.services.libreoffice_pool import (  # noqa: E402
+    convert_to_pdf,
+    get_libreoffice_pool_stats,
+    shutdown_libreoffice_pool,
+)
+
+SAMPLE_HTML = b"<html><body><h1>Pool check</h1><p>Warm worker conversion.</p></body></html>"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check LibreOffice pool warm-worker reuse")
+    parser.add_argument("--jobs", type=int, default=5, help="Conversions to run")
+    parser.add_argument(
+        "--require-uno", action="store_true", help="Exit 1 unless workers run in UNO mode and stay warm"
+    )
+    args = parser.parse_args()
+
+    try:
+        for job in range(args.jobs):
+            started = time.perf_counter()
+            pdf = convert_to_pdf(SAMPLE_HTML, "pool_check.html")
+            elapsed = (time.perf_counter() - started) * 1e3
+            print(f"job {job + 1}: {elapsed:8.1f} ms, {len(pdf)} bytes, pdf={pdf.startswith(b'%PDF')}")
+        stats = get_libreoffice_pool_stats()
+    finally:
+        shutdown_libreoffice_pool()
+    print(json.dumps(stats, indent=2))
+
+    warm = stats["mode"] == "uno" and stats["process_starts"] < stats["jobs"]
+    print("warm workers reused" if warm else "no warm reuse (one soffice start per job)")
+    return 0 if warm or not args.require_uno else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
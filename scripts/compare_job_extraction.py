@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Compare job extraction on raw HTML against the distillation stage (app/utils/job_html_distiller.py).
+
+For every page in tests/fixtures/job_pages/manifest.json (or --pages DIR) this reports:
+    - model input size: raw HTML cut at job_url_analyzer.token_limit vs distilled text
+      (tokens counted with tiktoken when installed, else estimated at 4 characters per token)
+    - recall: how many of the expected description fragments reach the model in each input
+    - path: "json-ld" when structured data answers without an LLM call, else "llm"
+    - for the json-ld path: whether company / title / description match the expectations
+
+With --llm both inputs are sent to the extraction model (needs OPENAI_API_KEY) and the
+extracted fields are scored against the expectations, with the time each call took.
+
+The default pages are synthetic (see the manifest): the savings they show come largely from
+generated padding, so quote numbers only from a --pages directory of captured pages.
+
+Usage:
+    python scripts/compare_job_extraction.py
+    python scripts/compare_job_extraction.py --llm
+    python scripts/compare_job_extraction.py --pages /path/to/captured/pages
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Add parent directory to path to import app modules
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import job_url_analyzer  # noqa: E402
+from app.utils.job_html_distiller import distill_job_html  # noqa: E402
+
+DEFAULT_PAGES = ROOT / "tests" / "fixtures" / "job_pages"
+
+
+def _token_counter() -> Callable[[str], int]:
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception:
+        return lambda text: len(text) // 4
+
+
+def _recall(text: str, fragments: List[str]) -> str:
+    found = sum(1 for f in fragments if f in (text or ""))
+    return f"{found}/{len(fragments)}"
+
+
+def _field_score(result, expected: Dict) -> str:
+    """Matching fields out of company, title, hiring manager, description fragments."""
+    checks = [
+        (result.company or "").strip().casefold() == expected["company"].casefold(),
+        (result.job_title or "").strip().casefold() == expected["job_title"].casefold(),
+        (result.hiring_manager or "").strip().casefold() == expected["hiring_manager"].casefold(),
+        all(f in (result.job_description or "") for f in expected["description_contains"]),
+    ]
+    return f"{sum(checks)}/{len(checks)}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare raw vs distilled job extraction")
+    parser.add_argument("--pages", type=Path, default=DEFAULT_PAGES, help="Directory with manifest.json")
+    parser.add_argument("--llm", action="store_true", help="Also run the extraction model on both inputs")
+    args = parser.parse_args()
+
+    count_tokens = _token_counter()
+    manifest = json.loads((args.pages / "manifest.json").read_text("utf-8"))
+    cases = manifest["cases"]
+    if manifest.get("corpus") == "synthetic":
+        print("Note: synthetic pages - results show behaviour, not real-world savings\n")
+    print(
+        f"{'page':<28} {'raw tok':>8} {'dist tok':>8} {'saved':>6} {'raw recall':>10} "
+        f"{'dist recall':>11} {'path':>7} {'json-ld fields':>14}"
+    )
+    totals = [0, 0]
+    for case in cases:
+        html = (args.pages / case["file"]).read_text("utf-8")
+        expected = case["expected"]
+        fragments = expected["description_contains"]
+        raw_input = html[: job_url_analyzer.token_limit]
+        page = distill_job_html(html)
+        raw_tokens, distilled_tokens = count_tokens(raw_input), count_tokens(page.text)
+        totals[0] += raw_tokens
+        totals[1] += distilled_tokens
+
+        fields = "-"
+        if page.skip_llm:
+            result = job_url_analyzer.JobExtractionResult()
+            result.company = page.posting.get("company")
+            result.job_title = page.posting.get("job_title")
+            result.job_description = page.posting.get("job_description")
+            result.hiring_manager = ""
+            fields = _field_score(result, expected)
+        saved = 1 - distilled_tokens / raw_tokens if raw_tokens else 0.0
+        print(
+            f"{case['file'][:28]:<28} {raw_tokens:>8} {distilled_tokens:>8} {saved:>6.0%} "
+            f"{_recall(raw_input, fragments):>10} {_recall(page.text, fragments):>11} "
+            f"{'json-ld' if page.skip_llm else 'llm':>7} {fields:>14}"
+        )
+    print(f"{'total':<28} {totals[0]:>8} {totals[1]:>8} {1 - totals[1] / max(1, totals[0]):>6.0%}")
+
+    if not args.llm:
+        return 0
+
+    print(f"\n{'page':<28} {'raw fields':>10} {'raw s':>7} {'dist fields':>11} {'dist s':>7} {'dist path':>9}")
+    for case in cases:
+        html = (args.pages / case["file"]).read_text("utf-8")
+        started = time.perf_counter()
+        raw_result = job_url_analyzer.extract_with_chatgpt(html)
+        raw_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        distilled_result = job_url_analyzer.extract_job_fields(html)
+        distilled_seconds = time.perf_counter() - started
+        print(
+            f"{case['file'][:28]:<28} {_field_score(raw_result, case['expected']):>10} {raw_seconds:>7.1f} "
+            f"{_field_score(distilled_result, case['expected']):>11} {distilled_seconds:>7.1f} "
+            f"{distilled_result.method:>9}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
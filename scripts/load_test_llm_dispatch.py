@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Load test for the async LLM dispatch layer.
+
+Starts the local stub LLM server (scripts/stub_llm_server.py), points the Grok/xAI path at
+it, and drives get_job_info concurrently in two modes:
+
+  inline   - get_job_info() called directly inside a coroutine (the old behaviour: blocks the loop)
+  dispatch - get_job_info_async() (bounded executor, loop stays free)
+
+For each mode it reports wall time, generations/second and the worst event-loop lag seen by
+a heartbeat coroutine. No Mongo, Redis or real provider is needed.
+
+Usage:
+    python scripts/load_test_llm_dispatch.py --requests 40 --delay 1.0
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from stub_llm_server import start_stub_server  # noqa: E402
+
+
+def _fake_user():
+    from app.models.user import UserResponse
+
+    now = datetime.utcnow()
+    return UserResponse(
+        id="000000000000000000000001",
+        name="Load Test",
+        email="loadtest@example.com",
+        isActive=True,
+        isEmailVerified=True,
+        roles=["user"],
+        preferences={
+            "appSettings": {
+                "personalityProfiles": [
+                    {"id": "p1", "name": "Professional", "description": "Clear and concise."}
+                ]
+            }
+        },
+        dateCreated=now,
+        dateUpdated=now,
+    )
+
+
+def _job_kwargs(user, run_id: str, i: int, same_job: bool = False) -> dict:
+    return dict(
+        llm="Grok",
+        date_input="2026-01-15",
+        company_name="Acme",
+        hiring_manager="Pat Smith",
+        ad_source="linkedin",
+        resume="Jane Doe - Senior Engineer - 10 years of Python.",
+        # Unique JD per request so the result cache never short-circuits the call,
+        # unless --same-job is testing single-flight coalescing of identical requests
+        jd=f"Backend engineer role #{run_id}" if same_job else f"Backend engineer role #{run_id}-{i}",
+        additional_instructions="",
+        tone="Professional",
+        is_plain_text=True,
+        current_user=user,
+    )
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float, lags: list) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _run_mode(mode: str, count: int, same_job: bool = False) -> dict:
+    from app.services.cover_letter_service import get_job_info, get_job_info_async
+
+    user = _fake_user()
+    run_id = uuid.uuid4().hex[:8]
+
+    async def one(i: int):
+        kwargs = _job_kwargs(user, run_id, i, same_job)
+        if mode == "inline":
+            return get_job_info(**kwargs)
+        return await get_job_info_async(**kwargs)
+
+    stop = asyncio.Event()
+    lags: list = []
+    hb = asyncio.create_task(_heartbeat(stop, 0.05, lags))
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(count)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await hb
+
+    errors = [
+        r
+        for r in results
+        if isinstance(r, Exception)
+        or (isinstance(r, dict) and str(r.get("content", "")).lower().startswith("error"))
+    ]
+    return {
+        "mode": mode,
+        "requests": count,
+        "errors": len(errors),
+        "first_error": str(errors[0].get("content") if isinstance(errors[0], dict) else errors[0])[:200]
+        if errors
+        else "",
+        "wall_seconds": elapsed,
+        "throughput_rps": count / elapsed if elapsed else 0.0,
+        "max_loop_lag_seconds": max(lags) if lags else elapsed,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent throughput test for get_job_info")
+    parser.add_argument("--requests", type=int, default=40, help="Concurrent generations per mode")
+    parser.add_argument("--delay", type=float, default=1.0, help="Stub LLM latency in seconds")
+    parser.add_argument("--workers", type=int, default=32, help="LLM_DISPATCH_MAX_WORKERS")
+    parser.add_argument(
+        "--modes", default="inline,dispatch", help="Comma-separated modes: inline,dispatch"
+    )
+    parser.add_argument(
+        "--same-job",
+        action="store_true",
+        help="Send identical requests (exercises single-flight coalescing)",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show app logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        # The pipeline logs every step; keep the report readable.
+        logging.disable(logging.WARNING)
+
+    server, base_url = start_stub_server(delay=args.delay)
+    os.environ["XAI_API_BASE_URL"] = base_url
+    os.environ["XAI_API_KEY"] = "stub-key"
+    os.environ["LLM_DISPATCH_MAX_WORKERS"] = str(args.workers)
+    os.environ["ENABLE_GENERATION_TIMING_CHART"] = "false"
+
+    # Settings are read at import time, so import the app only after the env is set.
+    from app.core.config import settings
+
+    settings.XAI_API_BASE_URL = base_url
+    settings.XAI_API_KEY = "stub-key"
+    settings.LLM_DISPATCH_MAX_WORKERS = args.workers
+
+    print(f"Stub LLM at {base_url} (delay={args.delay}s), {args.requests} concurrent requests")
+    print(f"{'mode':<10} {'reqs':>5} {'errors':>6} {'wall(s)':>9} {'req/s':>8} {'max lag(s)':>11}")
+    try:
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            stats = asyncio.run(_run_mode(mode, args.requests, args.same_job))
+            print(
+                f"{stats['mode']:<10} {stats['requests']:>5} {stats['errors']:>6} "
+                f"{stats['wall_seconds']:>9.2f} {stats['throughput_rps']:>8.2f} "
+                f"{stats['max_loop_lag_seconds']:>11.3f}"
+            )
+            if stats["first_error"]:
+                print(f"  first error: {stats['first_error']}")
+    finally:
+        from app.utils.llm_clients import close_llm_clients, get_llm_client_stats
+        from app.utils.llm_dispatch import get_llm_dispatch_stats, shutdown_llm_executor
+
+        print(f"dispatch stats: {get_llm_dispatch_stats()}")
+        from app.services.cover_letter_service import get_generation_single_flight_stats
+
+        print(f"xai client stats: {get_llm_client_stats()['xai']}")
+        print(f"single-flight stats: {get_generation_single_flight_stats()}")
+        shutdown_llm_executor()
+        close_llm_clients()
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
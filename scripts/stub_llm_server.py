@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Local stub LLM server for load tests and benchmarks.
+
+Serves an OpenAI-compatible POST /v1/chat/completions (also used for the xAI/Grok path)
+that sleeps for a configurable delay and returns a small cover-letter JSON payload, so the
+generation pipeline can be exercised without calling a real provider. Requests with
+"stream": true get an SSE response: the delay is spent before the first chunk, then the
+completion is sent in small chunks.
+
+Usage:
+    python scripts/stub_llm_server.py --port 8765 --delay 2.0
+
+Then point the app at it, e.g.:
+    XAI_API_BASE_URL=http://127.0.0.1:8765/v1 XAI_API_KEY=stub python scripts/load_test_llm_dispatch.py
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_LETTER = (
+    "Jane Doe\n555-0100\njane@example.com\n\n{date}\n\nDear Hiring Manager,\n\n"
+    "I am excited to apply for this role. My background matches the job description.\n\n"
+    "Sincerely,\nJane Doe"
+)
+
+
+def _completion_body(model: str) -> dict:
+    content = json.dumps({"content": STUB_LETTER.format(date=time.strftime("%B %d, %Y"))})
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        },
+    }
+
+
+def _stream_chunks(model: str, size: int = 16, include_usage: bool = False):
+    body = _completion_body(model)
+    content = body["choices"][0]["message"]["content"]
+    for i in range(0, len(content), size):
+        yield {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": content[i : i + size]}}],
+        }
+    if include_usage:
+        yield {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [],
+            "usage": body["usage"],
+        }
+
+
+def make_handler(delay: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+            return
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b"{}"
+            try:
+                payload = json.loads(raw or b"{}")
+            except json.JSONDecodeError:
+                payload = {}
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            time.sleep(delay)
+            model = str(payload.get("model", "stub"))
+            if payload.get("stream"):
+                include_usage = bool((payload.get("stream_options") or {}).get("include_usage"))
+                self._send_stream(model, include_usage)
+                return
+            body = json.dumps(_completion_body(model)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_stream(self, model: str, include_usage: bool = False) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for chunk in _stream_chunks(model, include_usage=include_usage):
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+    return StubHandler
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, delay: float = 1.0):
+    """
+    Start the stub server on a background thread.
+
+    Returns:
+        (server, base_url) - call server.shutdown() when done
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(delay), bind_and_activate=False)
+    # The default listen backlog (5) drops bursts of concurrent connects; clients then stall
+    # for a SYN retransmit (~1s) or fail
+    server.request_queue_size = 256
+    server.server_bind()
+    server.server_activate()
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True)
+    thread.start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f"http://{bound_host}:{bound_port}/v1"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds to sleep per completion")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.host, args.port, args.delay)
+    print(f"Stub LLM server listening at {base_url} (delay={args.delay}s). Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Tests for the shared job extraction cache (app/utils/job_extraction_cache.py).
+
+Runs against the in-process L1 tier; extract is a fake, so no LLM is called.
+"""
+
+import asyncio
+import uuid
+
+from app.utils.job_extraction_cache import cached_job_extraction
+
+
+def test_client_html_never_answers_other_users():
+    job_id = str(uuid.uuid4().int)[:10]
+    url = f"https://www.linkedin.com/jobs/view/{job_id}"
+    real_page = f"<p>Real posting {job_id}</p>"
+    forged_page = f"<p>Forged posting {job_id}</p>"
+    calls = []
+
+    def extract(html, error):
+        calls.append(html)
+        return {"success": True, "company": "forged" if "Forged" in html else "real"}
+
+    async def fetch():
+        return real_page, None
+
+    async def run():
+        first = await cached_job_extraction(url, fetch, extract, html_content=forged_page)
+        fetched = await cached_job_extraction(url, fetch, extract)
+        again = await cached_job_extraction(url, fetch, extract, html_content=forged_page)
+        same_as_fetched = await cached_job_extraction(url, fetch, extract, html_content=real_page)
+        return first, fetched, again, same_as_fetched
+
+    first, fetched, again, same_as_fetched = asyncio.run(run())
+    assert first["company"] == "forged"
+    assert fetched["company"] == "real"
+    assert again["company"] == "forged"
+    assert same_as_fetched["company"] == "real"
+    # The repeat submission and the fetched-content match are cache hits
+    assert calls == [forged_page, real_page]
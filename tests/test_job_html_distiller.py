@@ -0,0 +1,95 @@
+"""
+Tests for job page distillation (app/utils/job_html_distiller.py).
+
+Runs every synthetic page in tests/fixtures/job_pages/manifest.json through distill_job_html
+and checks that the description survives, non-content markup does not, and that only pages
+with complete JSON-LD skip the LLM.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from app.utils.job_html_distiller import distill_job_html, html_fragment_to_text
+
+PAGES = Path(__file__).parent / "fixtures" / "job_pages"
+CASES = json.loads((PAGES / "manifest.json").read_text("utf-8"))["cases"]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[c["file"] for c in CASES])
+def test_description_survives_distillation(case):
+    html = (PAGES / case["file"]).read_text("utf-8")
+    page = distill_job_html(html)
+    for fragment in case["expected"]["description_contains"]:
+        assert fragment in page.text
+    if case["expected"]["hiring_manager"]:
+        assert case["expected"]["hiring_manager"] in page.text
+    if len(html) > 5000:
+        assert len(page.text) < len(html) / 5
+    for marker in ("<script", "function(", "{margin:", "__NEXT_DATA__", "<div"):
+        assert marker not in page.text
+
+
+@pytest.mark.parametrize("case", CASES, ids=[c["file"] for c in CASES])
+def test_json_ld_skip_llm(case):
+    page = distill_job_html((PAGES / case["file"]).read_text("utf-8"))
+    assert page.skip_llm == case["skip_llm"]
+    if case["skip_llm"]:
+        assert page.posting["company"] == case["expected"]["company"]
+        assert page.posting["job_title"] == case["expected"]["job_title"]
+        for fragment in case["expected"]["description_contains"]:
+            assert fragment in page.posting["job_description"]
+
+
+def test_collapsed_and_data_attribute_text_kept():
+    page = distill_job_html(
+        '<html><body><div style="display:none" aria-expanded="false"><p>Hidden full description '
+        'of the role.</p></div><span data-full-text="' + "Full text from the attribute. " * 4 + '">'
+        "Preview…</span></body></html>"
+    )
+    assert "Hidden full description of the role." in page.text
+    assert "Full text from the attribute." in page.text
+
+
+def test_truncated_preview_dropped_when_full_text_present():
+    full = "We are hiring a platform engineer to run our Kubernetes clusters across three regions."
+    page = distill_job_html(
+        f"<html><body><span>{full[:60]}…</span><div><p>{full}</p></div></body></html>"
+    )
+    assert page.text.count("We are hiring a platform engineer") == 1
+
+
+def test_html_fragment_to_text_unescapes_json_ld_descriptions():
+    text = html_fragment_to_text("&lt;p&gt;Build &amp;amp; ship&lt;/p&gt;&lt;ul&gt;&lt;li&gt;APIs&lt;/li&gt;&lt;/ul&gt;")
+    assert [line for line in text.splitlines() if line] == ["Build & ship", "- APIs"]
+
+
+def test_empty_page():
+    page = distill_job_html("")
+    assert page.text == "" and page.posting == {} and not page.skip_llm
+
+
+def test_xml_declaration_page():
+    page = distill_job_html(
+        '<?xml version="1.0" encoding="iso-8859-1"?><html><body><p>Café barista wanted</p></body></html>'
+    )
+    assert "Café barista wanted" in page.text
+
+
+def test_comment_only_page():
+    page = distill_job_html("<!-- removed by the job board -->")
+    assert page.text == "" and page.posting == {} and not page.skip_llm
+
+
+def test_page_wrapped_in_form_keeps_description():
+    page = distill_job_html(
+        "<html><head><title>Senior Engineer - Acme</title></head><body>"
+        '<form id="form1" method="post"><input type="hidden" name="__VIEWSTATE" value="dDwtMTA4">'
+        "<div><h1>Senior Engineer</h1><p>Acme Corp is hiring a backend engineer.</p></div>"
+        '<select name="location"><option>Remote</option></select><button>Apply now</button>'
+        "</form></body></html>"
+    )
+    assert "Acme Corp is hiring a backend engineer." in page.text
+    assert "## Senior Engineer" in page.text
+    assert "__VIEWSTATE" not in page.text and "Apply now" not in page.text
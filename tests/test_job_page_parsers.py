@@ -0,0 +1,77 @@
+"""
+Tests for the lxml site parsers in job_url_analyzer (extract_from_html).
+
+Uses the synthetic pages in tests/fixtures/job_pages; results must match what the parsers
+extracted from them when they ran on BeautifulSoup.
+"""
+
+import json
+from pathlib import Path
+
+from job_url_analyzer import extract_from_html, extract_job_fields
+
+PAGES = Path(__file__).parent / "fixtures" / "job_pages"
+URLS = {c["file"]: c["url"] for c in json.loads((PAGES / "manifest.json").read_text("utf-8"))["cases"]}
+
+
+def _extract(name):
+    return extract_from_html((PAGES / name).read_text("utf-8"), URLS[name])
+
+
+def test_indeed_json_ld():
+    result = _extract("indeed_json_ld.html")
+    assert result.method == "beautifulsoup-indeed"
+    assert result.ad_source == "indeed"
+    assert result.company == "Northwind Health"
+    assert result.job_title == "Registered Nurse - Cardiac Care"
+    assert result.is_complete
+
+
+def test_generic_page_with_heavy_scripts():
+    result = _extract("generic_heavy_scripts.html")
+    assert result.method == "beautifulsoup-generic"
+    assert result.company == "Initech"
+    assert result.job_title == "Product Designer (Payments)"
+    assert result.hiring_manager == "Priya Raman"
+    assert "<script" not in result.job_description
+
+
+def test_hiring_manager_from_visible_text_only():
+    html = (
+        "<html><body><script>var t = 'Recruiter: Scripted Name';</script>"
+        "<h1>Data Analyst</h1><p>Questions? <br>Recruiter: Dana Whitfield</p>"
+        "</body></html>"
+    )
+    result = extract_from_html(html, "https://example.com/jobs/1")
+    assert result.hiring_manager == "Dana Whitfield"
+
+
+def test_css_class_selectors_match_whole_class_names():
+    html = (
+        '<html><body><div class="jobsearch-InlineCompanyRatingX">Wrong Co</div>'
+        '<div class="card jobsearch-InlineCompanyRating">Right Co</div></body></html>'
+    )
+    result = extract_from_html(html, "https://www.indeed.com/viewjob?jk=1")
+    assert result.company == "Right Co"
+
+
+def test_empty_html():
+    assert extract_from_html("", "https://example.com").method == "beautifulsoup-failed"
+
+
+def test_json_ld_shortcut_keeps_hiring_manager():
+    posting = {
+        "@context": "https://schema.org",
+        "@type": "JobPosting",
+        "title": "Site Reliability Engineer",
+        "hiringOrganization": {"@type": "Organization", "name": "Umbrella Systems"},
+        "description": "Run and automate our production platform. " * 10,
+    }
+    html = (
+        '<html><head><script type="application/ld+json">' + json.dumps(posting) + "</script></head>"
+        "<body><h1>Site Reliability Engineer</h1><p>Recruiter: Morgan Tate</p></body></html>"
+    )
+    result = extract_job_fields(html)
+    assert result.method == "json-ld"
+    assert result.company == "Umbrella Systems"
+    assert result.hiring_manager == "Morgan Tate"
@@ -0,0 +1,82 @@
+"""
+Tests for bounded parallel job URL analysis (app/utils/job_url_batch.py).
+
+analyze is a fake coroutine, so no page is fetched and no LLM is called.
+"""
+
+import asyncio
+
+from app.core.config import settings
+from app.utils.job_url_batch import analyze_job_urls
+
+
+def _collect(urls, analyze, timeout_seconds=None):
+    async def run():
+        return [item async for item in analyze_job_urls(urls, analyze, timeout_seconds)]
+
+    return asyncio.run(run())
+
+
+def test_concurrency_caps(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_URL_BATCH_CONCURRENCY", 3)
+    monkeypatch.setattr(settings, "JOB_URL_BATCH_PER_HOST_LIMIT", 2)
+    running = {"all": 0, "peak": 0, "linkedin.com": 0, "linkedin_peak": 0}
+
+    async def analyze(url):
+        linkedin = "linkedin.com" in url
+        running["all"] += 1
+        running["linkedin.com"] += linkedin
+        running["peak"] = max(running["peak"], running["all"])
+        running["linkedin_peak"] = max(running["linkedin_peak"], running["linkedin.com"])
+        await asyncio.sleep(0.01)
+        running["all"] -= 1
+        running["linkedin.com"] -= linkedin
+        return {"success": True}
+
+    urls = [f"https://www.linkedin.com/jobs/view/{n}" for n in range(6)]
+    urls += [f"https://example{n}.com/job" for n in range(6)]
+    items = _collect(urls, analyze)
+
+    assert running["peak"] == 3
+    assert running["linkedin_peak"] == 2
+    assert sorted(item["index"] for item in items[:-1]) == list(range(12))
+    assert items[-1] == {**items[-1], "type": "summary", "total": 12, "ok": 12, "timeout": 0}
+
+
+def test_results_stream_in_completion_order():
+    async def analyze(url):
+        await asyncio.sleep(0.05 if "slow" in url else 0)
+        return {"success": "bad" not in url}
+
+    items = _collect(["https://a.com/slow", "https://b.com/fast", "https://c.com/bad"], analyze)
+    assert [(i["index"], i["status"]) for i in items[:-1]] == [(1, "ok"), (2, "failed"), (0, "ok")]
+    assert items[0]["result"] == {"success": True}
+
+
+def test_timeout_returns_partial_results():
+    cancelled = []
+
+    async def analyze(url):
+        if "hang" in url:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(url)
+                raise
+        return {"success": True}
+
+    items = _collect(["https://a.com/hang", "https://b.com/quick"], analyze, timeout_seconds=0.05)
+    assert [(i["index"], i["status"]) for i in items[:-1]] == [(1, "ok"), (0, "timeout")]
+    assert items[-1]["ok"] == 1 and items[-1]["timeout"] == 1
+    assert cancelled == ["https://a.com/hang"]
+
+
+def test_errors_are_reported_per_url():
+    async def analyze(url):
+        if "broken" in url:
+            raise RuntimeError("boom")
+        raise ValueError("Invalid URL format")
+
+    items = _collect(["https://a.com/broken", "https://b.com/x"], analyze)
+    assert {i["index"]: i["status"] for i in items[:-1]} == {0: "error", 1: "error"}
+    assert items[-1]["error"] == 2
@@ -0,0 +1,28 @@
+"""
+Tests for bounded model labels (llm_metric_label in app/utils/llm_utils.py).
+
+The llm field of a generation request is free-form, so unknown names must not reach metric
+labels or the router's per-model windows as-is.
+"""
+
+from app.utils.llm_router import LLMRouter
+from app.utils.llm_utils import llm_metric_label
+
+
+def test_known_aliases_keep_their_canonical_name():
+    assert llm_metric_label("ChatGPT") == "gpt-4.1"
+    assert llm_metric_label("Claude") == "claude-sonnet-4-20250514"
+    assert llm_metric_label("gemini-2.5-flash") == "gemini-2.5-flash"
+
+
+def test_unknown_names_share_one_label():
+    assert {llm_metric_label(f"made-up-model-{n}") for n in range(50)} == {"other"}
+    assert llm_metric_label("") == "other"
+
+
+def test_router_windows_are_bounded():
+    router = LLMRouter()
+    for n in range(50):
+        router.record(f"made-up-model-{n}", 0.5)
+    router.record("Claude", 0.2)
+    assert set(router._windows) == {"other", "claude-sonnet-4-20250514"}
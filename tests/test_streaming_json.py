@@ -0,0 +1,84 @@
+"""
+Tests for the incremental LLM reply parser (app/utils/streaming_json.py).
+
+Runs every reply in tests/fixtures/llm_responses.json whole and split into random chunks, and
+fuzzes truncation by cutting well-formed replies at every offset.
+"""
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from app.utils.streaming_json import StreamingJSONParser, parse_llm_json
+
+CORPUS = json.loads((Path(__file__).parent / "fixtures" / "llm_responses.json").read_text("utf-8"))
+CASES = CORPUS["cases"]
+
+
+def _parse_chunked(text, rng, max_chunk=12):
+    fields = []
+    parser = StreamingJSONParser(on_field=lambda name, value: fields.append(name))
+    pos = 0
+    while pos < len(text):
+        size = rng.randint(1, max_chunk)
+        parser.feed(text[pos : pos + size])
+        pos += size
+    return parser, fields
+
+
+@pytest.mark.parametrize("case", CASES, ids=[c["name"] for c in CASES])
+def test_corpus(case):
+    parser = StreamingJSONParser()
+    parser.feed(case["text"])
+    if case.get("error"):
+        with pytest.raises(json.JSONDecodeError):
+            parser.finish()
+        return
+    assert parser.finish() == case["expected"]
+    assert parser.truncated == case["truncated"]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[c["name"] for c in CASES])
+def test_chunked_matches_whole(case):
+    rng = random.Random(case["name"])
+    whole_fields = []
+    try:
+        whole = parse_llm_json(case["text"], on_field=lambda name, value: whole_fields.append(name))
+    except json.JSONDecodeError:
+        whole = None
+    for _ in range(50):
+        parser, fields = _parse_chunked(case["text"], rng)
+        if whole is None:
+            with pytest.raises(json.JSONDecodeError):
+                parser.finish()
+        else:
+            assert parser.finish() == whole
+            assert fields == whole_fields
+
+
+def test_truncation_fuzz():
+    """Any prefix of a well-formed reply parses to a prefix of its fields, or raises JSONDecodeError."""
+    complete = [c for c in CASES if not c.get("error") and not c["truncated"]]
+    for case in complete:
+        full = parse_llm_json(case["text"])
+        for cut in range(len(case["text"])):
+            try:
+                partial = parse_llm_json(case["text"][:cut])
+            except json.JSONDecodeError:
+                continue
+            for name, value in partial.items():
+                assert name in full, (case["name"], cut)
+                if isinstance(value, str) and isinstance(full[name], str):
+                    assert full[name].startswith(value), (case["name"], cut)
+
+
+def test_fields_reported_before_reply_ends():
+    seen = []
+    parser = StreamingJSONParser(on_field=lambda name, value: seen.append((name, value)))
+    parser.feed('```json\n{"document_xml": "<w:document/>", "numbering_xml": "<w:num')
+    assert seen == [("document_xml", "<w:document/>")]
+    parser.feed('bering/>", "styles_xml": {"a": [1, 2]}}\n```')
+    assert seen[1:] == [("numbering_xml", "<w:numbering/>"), ("styles_xml", {"a": [1, 2]})]
+    assert parser.done